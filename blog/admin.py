@@ -1,15 +1,74 @@
+from django.conf import settings
 from django.contrib import admin
-from .models import Articulo, Categoria
+from django.db import router
+from django.utils import timezone
+from .models import Articulo, Categoria, Tarea
+from .sqlite import escritura
+from .tareas import diferidas
 
-class ArticuloAdmin(admin.ModelAdmin):
+
+class EscrituraUnicaAdmin(admin.ModelAdmin):
+    '''
+    Los POST del admin (guardar, borrar, acciones) hacen fila como un solo escritor
+    antes de que el admin abra su transacción (ver blog/sqlite.py) y dejan en la cola
+    el trabajo caro de las señales (ver blog/tareas.py).
+    '''
+
+    def _en_fila(self, vista, request, *args, **kwargs):
+        if request.method != 'POST':
+            return vista(request, *args, **kwargs)
+        with escritura(router.db_for_write(self.model)), diferidas(settings.BLOG_TAREAS['DIFERIR_ADMIN']):
+            return vista(request, *args, **kwargs)
+
+    def changeform_view(self, request, *args, **kwargs):
+        return self._en_fila(super().changeform_view, request, *args, **kwargs)
+
+    def delete_view(self, request, *args, **kwargs):
+        return self._en_fila(super().delete_view, request, *args, **kwargs)
+
+    def changelist_view(self, request, *args, **kwargs):
+        return self._en_fila(super().changelist_view, request, *args, **kwargs)
+
+
+class ArticuloAdmin(EscrituraUnicaAdmin):
     model = Articulo
     list_display = ['titulo', 'fecha_creacion', 'fecha_actualizacion', 'mostrar_categorias']
     search_fields = ['titulo']
     filter_horizontal = ('categorias',)
+    # fecha_creacion está al inicio del índice articulo_fecha_id_idx
+    date_hierarchy = 'fecha_creacion'
+    list_filter = ('fecha_creacion', 'categorias')
+    list_per_page = 100
+
+    def get_queryset(self, request):
+        '''
+        Trae las categorías de toda la página en una sola consulta en vez de una por fila.
+        '''
+        return super().get_queryset(request).prefetch_related('categorias')
 
     def mostrar_categorias(self, obj):
         return ", ".join([c.nombre for c in obj.categorias.all()])
     mostrar_categorias.short_description = 'Categorías'
 
 admin.site.register(Articulo, ArticuloAdmin)
-admin.site.register(Categoria)
\ No newline at end of file
+admin.site.register(Categoria, EscrituraUnicaAdmin)
+
+
+class TareaAdmin(EscrituraUnicaAdmin):
+    list_display = ['tipo', 'objeto_id', 'estado', 'intentos', 'disponible_desde', 'creada']
+    list_filter = ['estado', 'tipo']
+    readonly_fields = ['tipo', 'objeto_id', 'intentos', 'tomada_hasta', 'error', 'creada']
+    actions = ['reintentar']
+
+    @admin.action(description='Reintentar ahora las tareas fallidas seleccionadas')
+    def reintentar(self, request, queryset):
+        # Si ya hay otra pendiente para el mismo artículo, la fallida sobra.
+        for tarea in queryset.filter(estado=Tarea.FALLIDA):
+            if Tarea.objects.filter(tipo=tarea.tipo, objeto_id=tarea.objeto_id, estado=Tarea.PENDIENTE).exists():
+                tarea.delete()
+                continue
+            Tarea.objects.filter(pk=tarea.pk).update(
+                estado=Tarea.PENDIENTE, intentos=0, disponible_desde=timezone.now(),
+            )
+
+admin.site.register(Tarea, TareaAdmin)
@@ -0,0 +1,227 @@
+'''
+Utilidades compartidas por los comandos de benchmark: base de datos desechable,
+datos sintéticos creados con bulk_create y medición de escenarios HTTP.
+'''
+import asyncio
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+from types import ModuleType
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import AsyncClient, Client
+from django.test.utils import (
+    CaptureQueriesContext, override_settings, setup_test_environment, teardown_test_environment,
+)
+from django.urls import include, path
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .busqueda import obtener_backend
+from .contadores import reconciliar
+from .metricas import percentil
+from .models import Articulo, Categoria
+from .registro import registro_categorias
+from .renderizado import actualizar_html, obtener_renderizador
+from .texto import generar_extracto
+from .urls import patrones
+
+VOCABULARIO = (
+    'django python base datos consulta índice caché plantilla vista servidor rendimiento '
+    'latencia memoria proceso hilo red disco archivo página artículo categoría búsqueda '
+    'usuario sesión seguridad despliegue contenedor imagen prueba error registro métrica '
+    'tiempo carga lectura escritura bloqueo transacción réplica cola tarea lote flujo'
+).split()
+
+CACHE_AISLADA = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'benchmark',
+        'OPTIONS': {'MAX_ENTRIES': 1000000},
+    },
+}
+
+
+@contextmanager
+def entorno_aislado():
+    '''
+    Crea una base de datos de prueba y una caché locmem propias para no tocar los
+    datos reales; las destruye al salir. Funciona con SQLite y con PostgreSQL.
+    '''
+    setup_test_environment()
+    nombre_original = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        with override_settings(CACHES=CACHE_AISLADA):
+            registro_categorias.invalidar()
+            yield
+    finally:
+        connection.creation.destroy_test_db(nombre_original, verbosity=0)
+        teardown_test_environment()
+
+
+def _texto(rnd, palabras):
+    return ' '.join(rnd.choice(VOCABULARIO) for _ in range(palabras))
+
+
+def sembrar(articulos, categorias, semilla=0, lote=1000, categorias_por_articulo=3):
+    '''
+    Crea categorías y artículos sintéticos en lotes con bulk_create, enlaza la tabla
+    intermedia también en lote y reconstruye el índice de búsqueda y los contadores
+    al final (bulk_create no dispara señales).
+    '''
+    rnd = random.Random(semilla)
+    Categoria.objects.bulk_create(
+        [Categoria(nombre=f'Categoría {i}', slug=f'categoria-{i}') for i in range(categorias)],
+        batch_size=lote,
+    )
+    ids_categorias = list(Categoria.objects.values_list('id', flat=True))
+    Relacion = Articulo.categorias.through
+    ahora = timezone.now()
+    renderizador = obtener_renderizador()
+
+    for inicio in range(0, articulos, lote):
+        nuevos = []
+        for i in range(inicio, min(inicio + lote, articulos)):
+            titulo = _texto(rnd, 6).capitalize()
+            contenido = _texto(rnd, 200)
+            nuevos.append(Articulo(
+                titulo=titulo,
+                contenido=contenido,
+                slug=f'{slugify(titulo)[:80]}-{i}',
+            ))
+            actualizar_html(nuevos[-1], renderizador)
+            nuevos[-1].extracto = generar_extracto(nuevos[-1].contenido_html)
+        Articulo.objects.bulk_create(nuevos)
+        # auto_now_add pisa las fechas en bulk_create: se reparten después en el tiempo.
+        for articulo in nuevos:
+            articulo.fecha_creacion = articulo.fecha_actualizacion = ahora - timedelta(
+                minutes=rnd.randint(0, 60 * 24 * 365 * 3)
+            )
+        Articulo.objects.bulk_update(nuevos, ['fecha_creacion', 'fecha_actualizacion'])
+        if ids_categorias:
+            Relacion.objects.bulk_create([
+                Relacion(articulo_id=articulo.id, categoria_id=categoria_id)
+                for articulo in nuevos
+                for categoria_id in rnd.sample(ids_categorias, min(categorias_por_articulo, len(ids_categorias)))
+            ], ignore_conflicts=True)
+
+    obtener_backend().reconstruir(lote=lote)
+    reconciliar()
+    registro_categorias.invalidar()
+
+
+def crear_administrador():
+    return User.objects.create_superuser('benchmark', 'benchmark@example.com', 'benchmark')
+
+
+def medir(cliente, urls, peticiones, calentamiento=5):
+    '''
+    Hace `peticiones` GET tomando las URL de forma cíclica y devuelve latencias
+    (ms, percentiles), peticiones por segundo y consultas SQL por petición.
+    '''
+    urls = list(urls)
+    for url in urls[:calentamiento]:
+        cliente.get(url)
+
+    latencias = []
+    consultas = []
+    estados = {}
+    inicio_total = time.perf_counter()
+    for i in range(peticiones):
+        url = urls[i % len(urls)]
+        with CaptureQueriesContext(connection) as capturadas:
+            inicio = time.perf_counter()
+            respuesta = cliente.get(url)
+            latencias.append((time.perf_counter() - inicio) * 1000)
+        consultas.append(len(capturadas))
+        estados[respuesta.status_code] = estados.get(respuesta.status_code, 0) + 1
+    duracion = time.perf_counter() - inicio_total
+
+    return {
+        **_resumen(latencias, duracion, estados),
+        'consultas': {'media': round(statistics.fmean(consultas), 2), 'max': max(consultas)},
+    }
+
+
+def _resumen(latencias, duracion, estados):
+    return {
+        'peticiones': len(latencias),
+        'peticiones_por_segundo': round(len(latencias) / duracion, 2),
+        'latencia_ms': {
+            'media': round(statistics.fmean(latencias), 3),
+            **{f'p{p}': round(percentil(latencias, p), 3) for p in (50, 95, 99)},
+        },
+        'estados': {str(estado): n for estado, n in sorted(estados.items())},
+    }
+
+
+def urlconf_blog(asincronas):
+    '''
+    URLconf con solo las rutas del blog, para usar con override_settings(ROOT_URLCONF=...)
+    y comparar las vistas síncronas con las asíncronas en el mismo proceso.
+    '''
+    modulo = ModuleType(f'blog_urls_{"asgi" if asincronas else "wsgi"}')
+    modulo.urlpatterns = [path('', include((patrones(asincronas), 'blog')))]
+    return modulo
+
+
+def medir_wsgi(urls, peticiones, concurrencia):
+    '''
+    Hace `peticiones` GET con `concurrencia` hilos, cada uno con su cliente, como los
+    hilos de un worker de gunicorn atendiendo las vistas síncronas.
+    '''
+    urls = list(urls)
+    locales = threading.local()
+
+    def pedir(i):
+        if not hasattr(locales, 'cliente'):
+            locales.cliente = Client()
+        inicio = time.perf_counter()
+        respuesta = locales.cliente.get(urls[i % len(urls)])
+        return (time.perf_counter() - inicio) * 1000, respuesta.status_code
+
+    with ThreadPoolExecutor(max_workers=concurrencia) as hilos:
+        list(hilos.map(pedir, range(min(concurrencia, peticiones))))
+        inicio = time.perf_counter()
+        resultados = list(hilos.map(pedir, range(peticiones)))
+        duracion = time.perf_counter() - inicio
+    return _resultados(resultados, duracion)
+
+
+def medir_asgi(urls, peticiones, concurrencia):
+    '''
+    Hace `peticiones` GET por el manejador ASGI con a lo sumo `concurrencia` en vuelo
+    a la vez, todas en un único bucle de eventos.
+    '''
+    urls = list(urls)
+
+    async def recorrer():
+        cliente = AsyncClient()
+        limite = asyncio.Semaphore(concurrencia)
+
+        async def pedir(i):
+            async with limite:
+                inicio = time.perf_counter()
+                respuesta = await cliente.get(urls[i % len(urls)])
+                return (time.perf_counter() - inicio) * 1000, respuesta.status_code
+
+        await asyncio.gather(*[pedir(i) for i in range(min(concurrencia, peticiones))])
+        inicio = time.perf_counter()
+        resultados = await asyncio.gather(*[pedir(i) for i in range(peticiones)])
+        return resultados, time.perf_counter() - inicio
+
+    resultados, duracion = asyncio.run(recorrer())
+    return _resultados(resultados, duracion)
+
+
+def _resultados(resultados, duracion):
+    estados = {}
+    for _, estado in resultados:
+        estados[estado] = estados.get(estado, 0) + 1
+    return _resumen([latencia for latencia, _ in resultados], duracion, estados)
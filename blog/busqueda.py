@@ -0,0 +1,199 @@
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import Case, FloatField, Q, Value, When
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .models import Articulo
+
+TABLA_FTS = 'blog_articulo_fts'
+INDICE_GIN = 'articulo_busqueda_gin'
+
+# Debe coincidir exactamente con la expresión del índice GIN para que PostgreSQL lo use.
+VECTOR_POSTGRES = (
+    "setweight(to_tsvector('spanish', coalesce(titulo, '')), 'A') || "
+    "setweight(to_tsvector('spanish', coalesce(contenido, '')), 'B')"
+)
+
+
+def terminos(texto):
+    '''
+    Separa el texto de búsqueda en palabras, descartando signos y operadores.
+    '''
+    return re.findall(r'\w+', texto or '')
+
+
+class BusquedaBase:
+    '''
+    Interfaz de los motores de búsqueda del blog.
+
+    buscar() filtra el queryset y lo anota con 'relevancia' (mayor es mejor) y filtrar()
+    solo lo filtra; indexar() y eliminar() mantienen el índice sincronizado con los artículos.
+    '''
+
+    def buscar(self, queryset, texto):
+        raise NotImplementedError
+
+    def filtrar(self, queryset, texto):
+        '''
+        Solo las coincidencias, sin calcular la relevancia: para contar o agregar.
+        '''
+        return self.buscar(queryset, texto)
+
+    def vacio(self, queryset):
+        '''
+        Resultado sin coincidencias que aún admite ordenar por relevancia.
+        '''
+        return queryset.annotate(relevancia=Value(0.0, output_field=FloatField())).none()
+
+    def indexar(self, articulos):
+        pass
+
+    def eliminar(self, ids):
+        pass
+
+    def reconstruir(self, lote=1000):
+        return 0
+
+
+class BusquedaSimple(BusquedaBase):
+    '''
+    Motor de respaldo sin índice: LIKE sobre titulo y contenido.
+    Los artículos que coinciden en el título aparecen primero.
+    '''
+
+    def buscar(self, queryset, texto):
+        palabras = terminos(texto)
+        if not palabras:
+            return self.vacio(queryset)
+        for palabra in palabras:
+            queryset = queryset.filter(Q(titulo__icontains=palabra) | Q(contenido__icontains=palabra))
+        return queryset.annotate(relevancia=Case(
+            When(titulo__icontains=palabras[0], then=Value(2.0)),
+            default=Value(1.0),
+            output_field=FloatField(),
+        ))
+
+
+class BusquedaSQLite(BusquedaBase):
+    '''
+    Búsqueda con una tabla virtual FTS5 cuyo rowid es el id del artículo.
+    Ordena por bm25 dando más peso al título que a las categorías y al contenido.
+    '''
+
+    pesos = (10.0, 1.0, 2.0)  # titulo, contenido, categorias
+
+    def _consulta(self, texto):
+        palabras = terminos(texto)
+        return ' '.join('"%s"*' % palabra for palabra in palabras) if palabras else None
+
+    def buscar(self, queryset, texto):
+        consulta = self._consulta(texto)
+        if consulta is None:
+            return self.vacio(queryset)
+        # La tabla FTS se une por rowid en la misma consulta: sin tope de resultados y
+        # con los demás filtros (categoría, cursor) aplicados en SQL.
+        tabla = queryset.model._meta.db_table
+        # bm25 devuelve valores negativos: cuanto menor, más relevante.
+        return queryset.annotate(relevancia=RawSQL(
+            f'-bm25({TABLA_FTS}, %s, %s, %s)', self.pesos, output_field=FloatField(),
+        )).extra(
+            tables=[TABLA_FTS],
+            where=[f'{TABLA_FTS}.rowid = "{tabla}"."id"', f'{TABLA_FTS} MATCH %s'],
+            params=[consulta],
+        )
+
+    def filtrar(self, queryset, texto):
+        consulta = self._consulta(texto)
+        if consulta is None:
+            return queryset.none()
+        # Sin bm25 no hace falta la unión: la subconsulta se evalúa una sola vez y el
+        # planificador no la repite por cada fila de la tabla de categorías.
+        return queryset.filter(id__in=RawSQL(f'SELECT rowid FROM {TABLA_FTS} WHERE {TABLA_FTS} MATCH %s', [consulta]))
+
+    def indexar(self, articulos):
+        articulos = list(articulos)
+        if not articulos:
+            return
+        ids = [articulo.pk for articulo in articulos]
+        nombres = {}
+        relaciones = Articulo.categorias.through.objects.filter(articulo_id__in=ids)
+        for articulo_id, nombre in relaciones.values_list('articulo_id', 'categoria__nombre'):
+            nombres.setdefault(articulo_id, []).append(nombre)
+        filas = [
+            (a.pk, a.titulo, a.contenido, ' '.join(nombres.get(a.pk, [])))
+            for a in articulos
+        ]
+        with connections[router.db_for_write(Articulo)].cursor() as cursor:
+            self._borrar(cursor, ids)
+            cursor.executemany(
+                f'INSERT INTO {TABLA_FTS} (rowid, titulo, contenido, categorias) VALUES (%s, %s, %s, %s)',
+                filas,
+            )
+
+    def eliminar(self, ids):
+        with connections[router.db_for_write(Articulo)].cursor() as cursor:
+            self._borrar(cursor, list(ids))
+
+    def reconstruir(self, lote=1000):
+        with connections[router.db_for_write(Articulo)].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABLA_FTS}')
+        total = 0
+        ultimo_id = 0
+        queryset = Articulo.objects.only('id', 'titulo', 'contenido').order_by('id')
+        while True:
+            articulos = list(queryset.filter(id__gt=ultimo_id)[:lote])
+            if not articulos:
+                return total
+            self.indexar(articulos)
+            total += len(articulos)
+            ultimo_id = articulos[-1].id
+
+    def _borrar(self, cursor, ids):
+        if ids:
+            marcadores = ', '.join(['%s'] * len(ids))
+            cursor.execute(f'DELETE FROM {TABLA_FTS} WHERE rowid IN ({marcadores})', ids)
+
+
+class BusquedaPostgres(BusquedaBase):
+    '''
+    Búsqueda con tsvector sobre titulo (peso A) y contenido (peso B).
+    El índice GIN es de expresión, así que PostgreSQL lo mantiene solo.
+    '''
+
+    def buscar(self, queryset, texto):
+        if not terminos(texto):
+            return self.vacio(queryset)
+        consulta = "websearch_to_tsquery('spanish', %s)"
+        return queryset.annotate(
+            relevancia=RawSQL(f'ts_rank({VECTOR_POSTGRES}, {consulta})', [texto], output_field=FloatField()),
+        ).extra(where=[f'({VECTOR_POSTGRES}) @@ {consulta}'], params=[texto])
+
+    def reconstruir(self, lote=1000):
+        with connections[router.db_for_write(Articulo)].cursor() as cursor:
+            cursor.execute(f'REINDEX INDEX {INDICE_GIN}')
+        return Articulo.objects.count()
+
+
+@lru_cache(maxsize=None)
+def _cargar_backend(ruta, alias):
+    if ruta:
+        return import_string(ruta)()
+    conexion = connections[alias]
+    if conexion.vendor == 'postgresql':
+        return BusquedaPostgres()
+    if conexion.vendor == 'sqlite' and TABLA_FTS in conexion.introspection.table_names():
+        return BusquedaSQLite()
+    return BusquedaSimple()
+
+
+def obtener_backend():
+    '''
+    Devuelve el motor configurado en BLOG_BUSQUEDA_BACKEND o, si no hay ninguno,
+    el más adecuado para el motor de la base de datos.
+    '''
+    ruta = getattr(settings, 'BLOG_BUSQUEDA_BACKEND', None)
+    return _cargar_backend(ruta, router.db_for_write(Articulo))
@@ -0,0 +1,203 @@
+import atexit
+import logging
+import threading
+from collections import Counter
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connections, router, transaction
+from django.db.models import F
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+from .models import EstadisticaCache
+
+logger = logging.getLogger(__name__)
+
+PREFIJO = 'blog'
+PLANTILLA_TARJETA = 'blog/tarjeta_articulo.html'
+
+
+def clave_detalle(slug):
+    return f'{PREFIJO}:detalle:{slug}'
+
+
+def clave_tarjeta(articulo):
+    # fecha_actualizacion cambia con cada guardado; el renderizador, con el extracto que sale
+    # de su HTML; la versión del ETag, con cada despliegue de plantillas.
+    return (
+        f'{PREFIJO}:tarjeta:{settings.BLOG_ETAG_VERSION}:{articulo.pk}:'
+        f'{articulo.fecha_actualizacion.timestamp()}:{articulo.contenido_renderizador}'
+    )
+
+
+EVENTOS = ('aciertos', 'fallos')
+
+
+class EstadisticasCache:
+    '''
+    Aciertos y fallos de las cachés. Cada proceso los suma en memoria y los escribe en
+    EstadisticaCache cada BLOG_CACHE_ESTADISTICAS_VOLCAR eventos y al terminar: el
+    comando estadisticas_cache, que corre en otro proceso, ve los de todos los workers
+    aunque la caché sea locmem, y contar una lectura no cuesta un viaje a la caché.
+    '''
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pendientes = Counter()
+        self._n = 0
+        # Base de datos contra la que se contaron los eventos pendientes.
+        self.base = None
+
+    def _acumular(self, nombre, evento):
+        with self._lock:
+            if self.base is None:
+                self.base = connections[router.db_for_write(EstadisticaCache)].settings_dict['NAME']
+            self._pendientes[nombre, evento] += 1
+            self._n += 1
+            return self._n >= settings.BLOG_CACHE_ESTADISTICAS_VOLCAR
+
+    def contar(self, nombre, evento):
+        if self._acumular(nombre, evento):
+            self.volcar()
+
+    async def acontar(self, nombre, evento):
+        if self._acumular(nombre, evento):
+            await sync_to_async(self.volcar)()
+
+    def descartar(self):
+        with self._lock:
+            self._pendientes = Counter()
+            self._n = 0
+
+    def volcar(self):
+        '''
+        Suma lo pendiente a EstadisticaCache. Si falla vuelve al acumulador.
+        '''
+        with self._lock:
+            eventos, self._pendientes = self._pendientes, Counter()
+            self._n = 0
+        if not eventos:
+            return
+        alias = router.db_for_write(EstadisticaCache)
+        try:
+            with transaction.atomic(using=alias):
+                EstadisticaCache.objects.using(alias).bulk_create(
+                    [EstadisticaCache(nombre=nombre, evento=evento) for nombre, evento in eventos],
+                    ignore_conflicts=True,
+                )
+                for (nombre, evento), n in eventos.items():
+                    EstadisticaCache.objects.using(alias).filter(nombre=nombre, evento=evento).update(
+                        total=F('total') + n,
+                    )
+        except DatabaseError:
+            logger.exception('No se pudieron guardar las estadísticas de caché; se reintentará.')
+            with self._lock:
+                self._pendientes.update(eventos)
+
+    def leer(self, nombres):
+        self.volcar()
+        totales = {
+            (nombre, evento): total
+            for nombre, evento, total in EstadisticaCache.objects.filter(nombre__in=nombres)
+            .values_list('nombre', 'evento', 'total')
+        }
+        return {nombre: {evento: totales.get((nombre, evento), 0) for evento in EVENTOS} for nombre in nombres}
+
+    def reiniciar(self, nombres):
+        self.descartar()
+        EstadisticaCache.objects.filter(nombre__in=nombres).delete()
+
+
+estadisticas_cache = EstadisticasCache()
+
+
+@atexit.register
+def _volcar_al_salir():
+    # Como con las visitas: lo contado contra la base de prueba no debe acabar en la real.
+    if estadisticas_cache.base == connections[router.db_for_write(EstadisticaCache)].settings_dict['NAME']:
+        estadisticas_cache.volcar()
+
+
+def estadisticas(nombres=('detalle',)):
+    '''
+    Devuelve {nombre: {'aciertos': n, 'fallos': n, 'tasa': float}} para cada caché,
+    sumando los de todos los procesos.
+    '''
+    resultado = {}
+    for nombre, datos in estadisticas_cache.leer(nombres).items():
+        total = datos['aciertos'] + datos['fallos']
+        resultado[nombre] = {**datos, 'tasa': datos['aciertos'] / total if total else 0.0}
+    return resultado
+
+
+def reiniciar_estadisticas(nombres=('detalle',)):
+    estadisticas_cache.reiniciar(nombres)
+
+
+def obtener_detalle(slug):
+    '''
+    Devuelve la entrada {'version': ..., 'html': ...} del artículo o None si no está.
+    '''
+    entrada = cache.get(clave_detalle(slug))
+    estadisticas_cache.contar('detalle', 'aciertos' if entrada is not None else 'fallos')
+    return entrada
+
+
+async def aobtener_detalle(slug):
+    entrada = await cache.aget(clave_detalle(slug))
+    await estadisticas_cache.acontar('detalle', 'aciertos' if entrada is not None else 'fallos')
+    return entrada
+
+
+def guardar_detalle(slug, version, html):
+    cache.set(
+        clave_detalle(slug),
+        {'version': version, 'html': html},
+        timeout=settings.BLOG_CACHE_DETALLE_SEGUNDOS,
+    )
+
+
+async def aguardar_detalle(slug, version, html):
+    await cache.aset(
+        clave_detalle(slug),
+        {'version': version, 'html': html},
+        timeout=settings.BLOG_CACHE_DETALLE_SEGUNDOS,
+    )
+
+
+def invalidar_detalle(*slugs):
+    cache.delete_many([clave_detalle(slug) for slug in slugs if slug])
+
+
+def _tarjetas(articulos, guardadas):
+    claves = [clave_tarjeta(articulo) for articulo in articulos]
+    plantilla = get_template(PLANTILLA_TARJETA)
+    nuevas = {
+        clave: plantilla.render({'articulo': articulo})
+        for clave, articulo in zip(claves, articulos) if clave not in guardadas
+    }
+    return [mark_safe(guardadas.get(clave) or nuevas[clave]) for clave in claves], nuevas
+
+
+def tarjetas(articulos):
+    '''
+    HTML de las tarjetas de la lista, en el mismo orden. Las que están en caché se leen
+    con un solo get_many y solo se renderizan las que faltan, que se guardan juntas.
+    '''
+    articulos = list(articulos)
+    guardadas = cache.get_many([clave_tarjeta(articulo) for articulo in articulos])
+    html, nuevas = _tarjetas(articulos, guardadas)
+    if nuevas:
+        cache.set_many(nuevas, timeout=settings.BLOG_CACHE_TARJETA_SEGUNDOS)
+    return html
+
+
+async def atarjetas(articulos):
+    articulos = list(articulos)
+    guardadas = await cache.aget_many([clave_tarjeta(articulo) for articulo in articulos])
+    html, nuevas = _tarjetas(articulos, guardadas)
+    if nuevas:
+        await cache.aset_many(nuevas, timeout=settings.BLOG_CACHE_TARJETA_SEGUNDOS)
+    return html
@@ -0,0 +1,74 @@
+'''
+Compresión de respuestas con Brotli o gzip según el Accept-Encoding del cliente.
+La usan MiddlewareEntrega y el comando benchmark_compresion.
+'''
+import zlib
+
+try:
+    import brotli
+except ImportError:  # Brotli es opcional: sin el paquete solo se ofrece gzip.
+    brotli = None
+
+# En orden de preferencia del servidor.
+CODIFICACIONES = ('br', 'gzip') if brotli else ('gzip',)
+
+
+def negociar(accept_encoding, disponibles=CODIFICACIONES):
+    '''
+    Elige la primera codificación de `disponibles` que el cliente acepta con q > 0,
+    o None si no acepta ninguna.
+    '''
+    aceptadas = {}
+    for parte in accept_encoding.split(','):
+        nombre, _, parametros = parte.partition(';')
+        calidad = 1.0
+        parametros = parametros.strip().lower()
+        if parametros.startswith('q='):
+            try:
+                calidad = float(parametros[2:])
+            except ValueError:
+                calidad = 0.0
+        aceptadas[nombre.strip().lower()] = calidad
+    comodin = aceptadas.get('*', 0.0)
+    for codificacion in disponibles:
+        if aceptadas.get(codificacion, comodin) > 0:
+            return codificacion
+    return None
+
+
+def compresor(codificacion, nivel):
+    '''
+    Devuelve las funciones (procesar, terminar) de un compresor incremental.
+    '''
+    if codificacion == 'br':
+        objeto = brotli.Compressor(quality=nivel, mode=brotli.MODE_TEXT)
+        return objeto.process, objeto.finish
+    # wbits=31: formato gzip (cabecera y CRC) en vez de zlib.
+    objeto = zlib.compressobj(nivel, zlib.DEFLATED, 31)
+    return objeto.compress, objeto.flush
+
+
+def comprimir(contenido, codificacion, nivel):
+    procesar, terminar = compresor(codificacion, nivel)
+    return procesar(contenido) + terminar()
+
+
+def comprimir_trozos(trozos, codificacion, nivel):
+    '''
+    Comprime un cuerpo en streaming; emite cada trozo en cuanto el compresor lo suelta.
+    '''
+    procesar, terminar = compresor(codificacion, nivel)
+    for trozo in trozos:
+        datos = procesar(trozo)
+        if datos:
+            yield datos
+    yield terminar()
+
+
+async def acomprimir_trozos(trozos, codificacion, nivel):
+    procesar, terminar = compresor(codificacion, nivel)
+    async for trozo in trozos:
+        datos = procesar(trozo)
+        if datos:
+            yield datos
+    yield terminar()
@@ -0,0 +1,111 @@
+'''
+Contadores desnormalizados: artículos por categoría (Categoria.num_articulos) y por
+mes de creación (ArchivoMensual). Las señales los ajustan en cada cambio con UPDATE
+... SET n = n + delta, y reconciliar() los recalcula desde cero.
+'''
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, ExtractMonth, ExtractYear
+from django.utils import timezone
+
+from .models import ArchivoMensual, Articulo, Categoria
+
+
+def mes_de(fecha):
+    fecha = timezone.localtime(fecha) if timezone.is_aware(fecha) else fecha
+    return fecha.year, fecha.month
+
+
+def ajustar_categorias(deltas):
+    '''
+    Recibe {categoria_id: delta} y aplica un UPDATE por cada delta distinto.
+    '''
+    ahora = timezone.now()
+    por_delta = {}
+    for categoria_id, delta in deltas.items():
+        if delta:
+            por_delta.setdefault(delta, []).append(categoria_id)
+    for delta, ids in por_delta.items():
+        Categoria.objects.filter(pk__in=ids).update(
+            num_articulos=F('num_articulos') + delta, ultima_modificacion=ahora,
+        )
+
+
+def tocar_categorias(articulo):
+    '''
+    Marca como modificadas las categorías de un artículo editado: su página cambia.
+    '''
+    Categoria.objects.filter(articulos=articulo).update(ultima_modificacion=timezone.now())
+
+
+def tocar_articulos(ids):
+    '''
+    Marca como modificadas las listas que muestran estos artículos (su mes y sus
+    categorías) cuando cambian sus tarjetas sin que cambie su fecha_actualizacion.
+    '''
+    fechas = Articulo.objects.filter(pk__in=ids).values_list('fecha_creacion', flat=True)
+    ajustar_meses({mes_de(fecha): 0 for fecha in fechas})
+    Categoria.objects.filter(articulos__in=ids).update(ultima_modificacion=timezone.now())
+
+
+def ajustar_meses(deltas):
+    '''
+    Recibe {(anio, mes): delta}; un delta 0 solo actualiza la fecha de modificación.
+    '''
+    ahora = timezone.now()
+    for (anio, mes), delta in deltas.items():
+        with transaction.atomic():
+            ArchivoMensual.objects.get_or_create(anio=anio, mes=mes)
+            ArchivoMensual.objects.filter(anio=anio, mes=mes).update(
+                num_articulos=F('num_articulos') + delta, ultima_modificacion=ahora,
+            )
+
+
+def sumar_articulos(articulos, relaciones):
+    '''
+    Cuenta artículos recién creados en bloque (bulk_create no envía señales) junto con
+    las filas de la tabla intermedia que los enlazan a sus categorías.
+    '''
+    ajustar_meses(Counter(mes_de(articulo.fecha_creacion) for articulo in articulos))
+    ajustar_categorias(Counter(relacion.categoria_id for relacion in relaciones))
+
+
+def reconciliar():
+    '''
+    Recalcula todos los contadores desde los artículos y devuelve cuántas categorías
+    y cuántos meses estaban desajustados.
+    '''
+    Relacion = Articulo.categorias.through
+    antes = dict(Categoria.objects.values_list('id', 'num_articulos'))
+    por_categoria = Relacion.objects.filter(categoria_id=OuterRef('pk')).order_by().values('categoria_id')
+    with transaction.atomic():
+        Categoria.objects.update(
+            num_articulos=Coalesce(
+                Subquery(por_categoria.annotate(n=Count('id')).values('n')), Value(0),
+                output_field=IntegerField(),
+            ),
+            ultima_modificacion=Subquery(
+                por_categoria.annotate(ultima=Max('articulo__fecha_actualizacion')).values('ultima')
+            ),
+        )
+    despues = dict(Categoria.objects.values_list('id', 'num_articulos'))
+    categorias = sum(1 for id_, n in despues.items() if antes.get(id_) != n)
+
+    meses = (
+        Articulo.objects.annotate(anio=ExtractYear('fecha_creacion'), mes=ExtractMonth('fecha_creacion'))
+        .values('anio', 'mes').order_by()
+        .annotate(num_articulos=Count('id'), ultima_modificacion=Max('fecha_actualizacion'))
+    )
+    nuevos = {(fila['anio'], fila['mes']): fila for fila in meses}
+    antes = {(anio, mes): n for anio, mes, n in ArchivoMensual.objects.values_list('anio', 'mes', 'num_articulos')}
+    with transaction.atomic():
+        ArchivoMensual.objects.all().delete()
+        ArchivoMensual.objects.bulk_create([ArchivoMensual(**fila) for fila in nuevos.values()])
+    claves = antes.keys() | nuevos.keys()
+    meses = sum(
+        1 for clave in claves
+        if antes.get(clave, 0) != (nuevos[clave]['num_articulos'] if clave in nuevos else 0)
+    )
+    return categorias, meses
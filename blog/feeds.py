@@ -0,0 +1,82 @@
+'''
+Serialización de los feeds Atom y JSON Feed por trozos, para enviarlos con
+StreamingHttpResponse: cada entrada se escribe en cuanto se serializa.
+'''
+import json
+import re
+from xml.sax.saxutils import escape, quoteattr
+
+TITULO = 'Mi Rincón'
+
+# Caracteres que XML 1.0 no admite aunque vayan escapados.
+_NO_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+# El contenido va como el HTML ya saneado de la página, no como el Markdown de origen.
+CAMPOS = ('id', 'titulo', 'slug', 'extracto', 'contenido_html', 'fecha_creacion', 'fecha_actualizacion')
+
+
+def _texto(valor):
+    return escape(_NO_XML.sub('', valor or ''))
+
+
+def atom(titulo, url_html, url_feed, actualizado, entradas):
+    '''
+    Genera el documento Atom. `entradas` son pares (url_absoluta, articulo).
+    '''
+    yield (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        '<feed xmlns="http://www.w3.org/2005/Atom" xml:lang="es">\n'
+        f'<title>{_texto(titulo)}</title>\n'
+        f'<id>{_texto(url_feed)}</id>\n'
+        f'<link rel="alternate" type="text/html" href={quoteattr(url_html)}/>\n'
+        f'<link rel="self" type="application/atom+xml" href={quoteattr(url_feed)}/>\n'
+        f'<updated>{actualizado.isoformat() if actualizado else ""}</updated>\n'
+        f'<author><name>{_texto(TITULO)}</name></author>\n'
+    )
+    for url, articulo in entradas:
+        yield (
+            '<entry>\n'
+            f'<title>{_texto(articulo.titulo)}</title>\n'
+            f'<id>{_texto(url)}</id>\n'
+            f'<link rel="alternate" type="text/html" href={quoteattr(url)}/>\n'
+            f'<published>{articulo.fecha_creacion.isoformat()}</published>\n'
+            f'<updated>{articulo.fecha_actualizacion.isoformat()}</updated>\n'
+            f'<summary type="text">{_texto(articulo.extracto)}</summary>\n'
+            f'<content type="html">{_texto(articulo.contenido_html)}</content>\n'
+            '</entry>\n'
+        )
+    yield '</feed>\n'
+
+
+def json_feed(titulo, url_html, url_feed, actualizado, entradas):
+    '''
+    Genera el documento JSON Feed 1.1 con las mismas entradas que atom().
+    '''
+    cabecera = json.dumps({
+        'version': 'https://jsonfeed.org/version/1.1',
+        'title': titulo,
+        'home_page_url': url_html,
+        'feed_url': url_feed,
+        'language': 'es',
+        'authors': [{'name': TITULO}],
+    }, ensure_ascii=False)
+    yield cabecera[:-1] + ', "items": ['
+    separador = ''
+    for url, articulo in entradas:
+        yield separador + json.dumps({
+            'id': url,
+            'url': url,
+            'title': articulo.titulo,
+            'summary': articulo.extracto,
+            'content_html': articulo.contenido_html,
+            'date_published': articulo.fecha_creacion.isoformat(),
+            'date_modified': articulo.fecha_actualizacion.isoformat(),
+        }, ensure_ascii=False)
+        separador = ', '
+    yield ']}\n'
+
+
+FORMATOS = {
+    'atom': (atom, 'application/atom+xml; charset=utf-8'),
+    'json': (json_feed, 'application/feed+json; charset=utf-8'),
+}
@@ -0,0 +1,107 @@
+import json
+import platform
+import random
+import time
+from urllib.parse import urlencode
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.benchmark import VOCABULARIO, entorno_aislado, medir_asgi, medir_wsgi, sembrar, urlconf_blog
+from blog.models import Articulo, Categoria
+
+MODOS = {
+    'wsgi': (False, medir_wsgi),
+    'asgi': (True, medir_asgi),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara el rendimiento con peticiones concurrentes de las vistas síncronas '
+        '(WSGI, un hilo por petición como gunicorn) y las asíncronas (ASGI, un bucle de '
+        'eventos) sobre datos sintéticos en una base de datos desechable.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--articulos', type=int, default=2000)
+        parser.add_argument('--categorias', type=int, default=50)
+        parser.add_argument('--peticiones', type=int, default=400, help='Peticiones por escenario y nivel.')
+        parser.add_argument(
+            '--concurrencia', default='1,10,50',
+            help='Peticiones simultáneas, separadas por comas (por ejemplo 1,10,50).',
+        )
+        parser.add_argument('--semilla', type=int, default=0)
+        parser.add_argument('--salida', help='Archivo JSON donde guardar los resultados.')
+
+    def handle(self, *args, **options):
+        try:
+            niveles = [int(nivel) for nivel in options['concurrencia'].split(',')]
+        except ValueError:
+            raise CommandError('--concurrencia debe ser una lista de enteros separados por comas.')
+        if any(nivel < 1 for nivel in niveles):
+            raise CommandError('--concurrencia debe ser al menos 1.')
+
+        with entorno_aislado():
+            inicio = time.perf_counter()
+            sembrar(options['articulos'], options['categorias'], semilla=options['semilla'])
+            self.stdout.write(
+                f"Datos sembrados: {options['articulos']} artículos, {options['categorias']} categorías "
+                f'en {time.perf_counter() - inicio:.1f} s.'
+            )
+            resultados = {}
+            for modo, (asincronas, medir) in MODOS.items():
+                with override_settings(ROOT_URLCONF=urlconf_blog(asincronas)):
+                    escenarios = self._escenarios(options['peticiones'], random.Random(options['semilla']))
+                    for nombre, urls in escenarios.items():
+                        for nivel in niveles:
+                            datos = medir(urls, options['peticiones'], nivel)
+                            resultados.setdefault(nombre, {}).setdefault(str(nivel), {})[modo] = datos
+                            self._imprimir(nombre, modo, nivel, datos)
+            motor = connection.vendor
+
+        self._comparar(resultados)
+        if options['salida']:
+            informe = {
+                'fecha': timezone.now().isoformat(),
+                'motor': motor,
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'articulos': options['articulos'],
+                'categorias': options['categorias'],
+                'escenarios': resultados,
+            }
+            with open(options['salida'], 'w') as archivo:
+                json.dump(informe, archivo, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Resultados guardados en {options['salida']}"))
+
+    def _escenarios(self, peticiones, rnd):
+        lista = reverse('blog:lista_articulos')
+        slugs = list(Articulo.objects.order_by('?').values_list('slug', flat=True)[:peticiones])
+        categorias = list(Categoria.objects.order_by('?').values_list('slug', flat=True)[:50])
+        return {
+            'lista': [lista],
+            'busqueda': [f'{lista}?{urlencode({"q": rnd.choice(VOCABULARIO)})}' for _ in range(20)],
+            'categoria': [f'{lista}?{urlencode({"categoria": slug})}' for slug in categorias],
+            'detalle': [reverse('blog:detalle_articulo', kwargs={'slug': slug}) for slug in slugs],
+        }
+
+    def _imprimir(self, nombre, modo, nivel, datos):
+        latencia = datos['latencia_ms']
+        self.stdout.write(
+            f"{nombre:<12}{modo:<6}x{nivel:<5}{datos['peticiones_por_segundo']:>10.1f} req/s  "
+            f"p50 {latencia['p50']:>8.2f} ms  p95 {latencia['p95']:>8.2f} ms  p99 {latencia['p99']:>8.2f} ms"
+        )
+
+    def _comparar(self, resultados):
+        self.stdout.write('\nASGI respecto a WSGI:')
+        for nombre, niveles in resultados.items():
+            for nivel, modos in niveles.items():
+                wsgi, asgi = modos['wsgi'], modos['asgi']
+                rps = asgi['peticiones_por_segundo'] / wsgi['peticiones_por_segundo'] - 1
+                p95 = asgi['latencia_ms']['p95'] / wsgi['latencia_ms']['p95'] - 1
+                self.stdout.write(f'{nombre:<12}x{nivel:<5} req/s {rps:+.1%}  p95 {p95:+.1%}')
@@ -0,0 +1,103 @@
+import json
+import platform
+import random
+import time
+from urllib.parse import urlencode
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.benchmark import VOCABULARIO, crear_administrador, entorno_aislado, medir, sembrar
+from blog.models import Articulo, Categoria
+from blog.paginacion import codificar_cursor
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide rendimiento (peticiones/s, percentiles de latencia y consultas) de las vistas '
+        'del blog sobre datos sintéticos en una base de datos desechable.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--articulos', type=int, default=10000)
+        parser.add_argument('--categorias', type=int, default=200)
+        parser.add_argument('--peticiones', type=int, default=200, help='Peticiones por escenario.')
+        parser.add_argument('--semilla', type=int, default=0)
+        parser.add_argument('--salida', help='Archivo JSON donde guardar los resultados.')
+        parser.add_argument('--comparar', help='JSON de una ejecución anterior para mostrar diferencias.')
+
+    def handle(self, *args, **options):
+        with entorno_aislado():
+            inicio = time.perf_counter()
+            sembrar(options['articulos'], options['categorias'], semilla=options['semilla'])
+            self.stdout.write(
+                f"Datos sembrados: {options['articulos']} artículos, {options['categorias']} categorías "
+                f'en {time.perf_counter() - inicio:.1f} s.'
+            )
+            escenarios = self._escenarios(options['peticiones'], random.Random(options['semilla']))
+            resultados = {}
+            for nombre, (cliente, urls) in escenarios.items():
+                resultados[nombre] = medir(cliente, urls, options['peticiones'])
+                self._imprimir(nombre, resultados[nombre])
+            motor = connection.vendor
+
+        informe = {
+            'fecha': timezone.now().isoformat(),
+            'motor': motor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'articulos': options['articulos'],
+            'categorias': options['categorias'],
+            'escenarios': resultados,
+        }
+        if options['salida']:
+            with open(options['salida'], 'w') as archivo:
+                json.dump(informe, archivo, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Resultados guardados en {options['salida']}"))
+        if options['comparar']:
+            self._comparar(options['comparar'], informe)
+
+    def _escenarios(self, peticiones, rnd):
+        lista = reverse('blog:lista_articulos')
+        anonimo = Client()
+        admin = Client()
+        admin.force_login(crear_administrador())
+
+        total = Articulo.objects.count()
+        profundo = Articulo.objects.order_by('-fecha_creacion', '-id')[int(total * 0.9)]
+        cursor = codificar_cursor('sig', [profundo.fecha_creacion.isoformat(), profundo.id])
+        slugs = list(Articulo.objects.order_by('?').values_list('slug', flat=True)[:peticiones])
+        categorias = list(Categoria.objects.order_by('?').values_list('slug', flat=True)[:50])
+
+        return {
+            'lista': (anonimo, [lista]),
+            'lista_profunda': (anonimo, [f'{lista}?{urlencode({"cursor": cursor})}']),
+            'busqueda': (anonimo, [f'{lista}?{urlencode({"q": rnd.choice(VOCABULARIO)})}' for _ in range(20)]),
+            'categoria': (anonimo, [f'{lista}?{urlencode({"categoria": slug})}' for slug in categorias]),
+            'detalle': (anonimo, [reverse('blog:detalle_articulo', kwargs={'slug': slug}) for slug in slugs]),
+            'admin_listado': (admin, [reverse('admin:blog_articulo_changelist')]),
+        }
+
+    def _imprimir(self, nombre, datos):
+        latencia = datos['latencia_ms']
+        self.stdout.write(
+            f"{nombre:<16}{datos['peticiones_por_segundo']:>10.1f} req/s  "
+            f"p50 {latencia['p50']:>8.2f} ms  p95 {latencia['p95']:>8.2f} ms  p99 {latencia['p99']:>8.2f} ms  "
+            f"consultas {datos['consultas']['media']:>5.1f} (máx {datos['consultas']['max']})"
+        )
+
+    def _comparar(self, ruta, actual):
+        with open(ruta) as archivo:
+            anterior = json.load(archivo)
+        self.stdout.write(f'\nDiferencias respecto a {ruta}:')
+        for nombre, datos in actual['escenarios'].items():
+            previo = anterior.get('escenarios', {}).get(nombre)
+            if not previo:
+                continue
+            rps = datos['peticiones_por_segundo'] / previo['peticiones_por_segundo'] - 1
+            p95 = datos['latencia_ms']['p95'] / previo['latencia_ms']['p95'] - 1
+            self.stdout.write(f'{nombre:<16} req/s {rps:+.1%}  p95 {p95:+.1%}')
@@ -0,0 +1,112 @@
+import json
+import platform
+import time
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from blog import compresion
+from blog.benchmark import entorno_aislado, sembrar
+from blog.models import Articulo, Categoria
+
+
+def _niveles(valor, opcion):
+    try:
+        return [int(nivel) for nivel in valor.split(',') if nivel]
+    except ValueError:
+        raise CommandError(f'{opcion} debe ser una lista de enteros separados por comas.')
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide, para páginas reales del blog sobre datos sintéticos, los bytes que viajan '
+        'y el tiempo de CPU por respuesta sin comprimir, con gzip y con Brotli a varios '
+        'niveles, incluido un cuerpo por debajo de BLOG_COMPRESION["MINIMO_BYTES"].'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--articulos', type=int, default=500)
+        parser.add_argument('--categorias', type=int, default=20)
+        parser.add_argument('--repeticiones', type=int, default=200, help='Compresiones por página y nivel.')
+        parser.add_argument('--niveles-gzip', default='1,6,9')
+        parser.add_argument('--niveles-brotli', default='1,4,5,11')
+        parser.add_argument('--semilla', type=int, default=0)
+        parser.add_argument('--salida', help='Archivo JSON donde guardar los resultados.')
+
+    def handle(self, *args, **options):
+        variantes = [('identity', 0)]
+        variantes += [('gzip', nivel) for nivel in _niveles(options['niveles_gzip'], '--niveles-gzip')]
+        if 'br' in compresion.CODIFICACIONES:
+            variantes += [('br', nivel) for nivel in _niveles(options['niveles_brotli'], '--niveles-brotli')]
+        else:
+            self.stdout.write(self.style.WARNING('El paquete Brotli no está instalado: solo se mide gzip.'))
+
+        inicio = time.perf_counter()
+        with entorno_aislado():
+            sembrar(options['articulos'], options['categorias'], semilla=options['semilla'])
+            cuerpos = self._cuerpos()
+        # Un cuerpo justo bajo el umbral: lo que el middleware deja sin comprimir.
+        cuerpos['pequeño'] = cuerpos['lista'][:settings.BLOG_COMPRESION['MINIMO_BYTES'] - 1]
+
+        resultados = {}
+        for nombre, cuerpo in cuerpos.items():
+            for codificacion, nivel in variantes:
+                datos = self._medir(cuerpo, codificacion, nivel, options['repeticiones'])
+                clave = codificacion if codificacion == 'identity' else f'{codificacion}-{nivel}'
+                resultados.setdefault(nombre, {})[clave] = datos
+                self.stdout.write(
+                    f'{nombre:<10}{clave:<10}{datos["bytes"]:>9} B  {datos["proporcion"]:>6.1%}  '
+                    f'{datos["cpu_us"]:>9.1f} µs CPU'
+                )
+
+        if options['salida']:
+            informe = {
+                'fecha': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'articulos': options['articulos'],
+                'repeticiones': options['repeticiones'],
+                'paginas': resultados,
+            }
+            with open(options['salida'], 'w') as archivo:
+                json.dump(informe, archivo, indent=2)
+            self.stdout.write(f"Resultados guardados en {options['salida']}")
+        self.stdout.write(self.style.SUCCESS(f'Benchmark completado en {time.perf_counter() - inicio:.1f} s.'))
+
+    def _cuerpos(self):
+        '''
+        Cuerpos sin comprimir de las páginas más pedidas (el cliente de pruebas no envía
+        Accept-Encoding, así que el middleware no los comprime).
+        '''
+        cliente = Client()
+        articulo = Articulo.objects.order_by('-fecha_creacion').first()
+        categoria = Categoria.objects.order_by('-num_articulos').first()
+        urls = {
+            'lista': reverse('blog:lista_articulos'),
+            'detalle': articulo.get_absolute_url(),
+            'categoria': reverse('blog:categoria', kwargs={'slug': categoria.slug}),
+            'feed': reverse('blog:feed_atom'),
+            'sitemap': reverse('blog:sitemap'),
+        }
+        cuerpos = {}
+        for nombre, url in urls.items():
+            respuesta = cliente.get(url)
+            cuerpos[nombre] = b''.join(respuesta.streaming_content) if respuesta.streaming else respuesta.content
+        return cuerpos
+
+    def _medir(self, cuerpo, codificacion, nivel, repeticiones):
+        if codificacion == 'identity':
+            return {'bytes': len(cuerpo), 'proporcion': 1.0, 'cpu_us': 0.0}
+        inicio = time.process_time()
+        for _ in range(repeticiones):
+            comprimido = compresion.comprimir(cuerpo, codificacion, nivel)
+        cpu = (time.process_time() - inicio) / repeticiones
+        return {
+            'bytes': len(comprimido),
+            'proporcion': round(len(comprimido) / len(cuerpo), 4),
+            'cpu_us': round(cpu * 1e6, 1),
+        }
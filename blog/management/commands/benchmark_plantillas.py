@@ -0,0 +1,161 @@
+import json
+import platform
+import statistics
+import time
+from datetime import timedelta
+
+import django
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.template import Context, Engine, Template
+from django.template.loader import get_template
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from blog import cache as cache_blog
+from blog.benchmark import CACHE_AISLADA, VOCABULARIO
+from blog.models import Articulo
+from blog.rutas import ruta_slug
+from blog.texto import generar_extracto
+
+# La tarjeta como estaba en lista_articulos.html: dos {% url %} por artículo.
+TARJETAS_ANTES = '''{% for articulo in articulos %}
+        <div class="col">
+        <div class="card h-100">
+            <div class="card-body d-flex flex-column">
+            <h5 class="card-title">
+                <a href="{% url 'blog:detalle_articulo' slug=articulo.slug %}" class="text-decoration-none">
+                {{ articulo.titulo }}
+                </a>
+            </h5>
+            <h6 class="card-subtitle mb-2 text-muted">
+                Publicado el {{ articulo.fecha_creacion|date:"d M Y" }}
+            </h6>
+            <p class="card-text">
+                {{ articulo.extracto|linebreaksbr }}
+            </p>
+            <a href="{% url 'blog:detalle_articulo' slug=articulo.slug %}" class="btn btn-sm btn-outline-primary mt-auto">Leer más</a>
+            </div>
+        </div>
+        </div>
+{% endfor %}'''
+
+
+def _articulos(n):
+    # En memoria: la medición no incluye la base de datos.
+    ahora = timezone.now()
+    articulos = []
+    for i in range(1, n + 1):
+        palabras = [VOCABULARIO[(i * 7 + j) % len(VOCABULARIO)] for j in range(40)]
+        articulos.append(Articulo(
+            id=i,
+            titulo=' '.join(palabras[:6]).capitalize(),
+            slug=f'articulo-de-prueba-{i}',
+            extracto=generar_extracto(' '.join(palabras)),
+            fecha_creacion=ahora - timedelta(hours=i),
+            fecha_actualizacion=ahora - timedelta(hours=i),
+        ))
+    return articulos
+
+
+def _mediana_ms(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return round(statistics.median(tiempos), 3)
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide el render de las tarjetas de la lista con 25, 100 y 1000 artículos: la '
+        'plantilla anterior con {% url %}, las tarjetas con rutas memorizadas y los '
+        'fragmentos en caché en frío y en caliente; además, cargar la plantilla con y sin '
+        'el cargador en caché y reverse() frente a la ruta memorizada.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tarjetas', type=int, nargs='+', default=[25, 100, 1000])
+        parser.add_argument('--repeticiones', type=int, default=20)
+        parser.add_argument('--salida', help='Archivo JSON donde guardar los resultados.')
+
+    def handle(self, *args, **options):
+        if options['repeticiones'] < 1 or min(options['tarjetas']) < 1:
+            raise CommandError('--tarjetas y --repeticiones deben ser positivos.')
+        repeticiones = options['repeticiones']
+        inicio = time.perf_counter()
+        resultados = {'tarjetas': {}}
+
+        with override_settings(CACHES=CACHE_AISLADA):
+            antes = Template(TARJETAS_ANTES)
+            for n in options['tarjetas']:
+                articulos = _articulos(n)
+
+                def en_frio():
+                    cache.clear()
+                    cache_blog.tarjetas(articulos)
+
+                cache_blog.tarjetas(articulos)
+                fila = {
+                    'antes_url': _mediana_ms(lambda: antes.render(Context({'articulos': articulos})), repeticiones),
+                    'sin_cache': _mediana_ms(lambda: cache_blog._tarjetas(articulos, {}), repeticiones),
+                    'frio': _mediana_ms(en_frio, repeticiones),
+                    'caliente': _mediana_ms(lambda: cache_blog.tarjetas(articulos), repeticiones),
+                }
+                resultados['tarjetas'][n] = fila
+                self.stdout.write(
+                    f"{n:>5} tarjetas  antes (url) {fila['antes_url']:>9.3f} ms  sin caché {fila['sin_cache']:>9.3f} ms  "
+                    f"frío {fila['frio']:>9.3f} ms  caliente {fila['caliente']:>9.3f} ms"
+                )
+
+        resultados['carga_plantilla_ms'] = self._carga(repeticiones)
+        resultados['ruta_us'] = self._rutas(repeticiones)
+        carga, ruta = resultados['carga_plantilla_ms'], resultados['ruta_us']
+        self.stdout.write(
+            f"get_template de la lista: sin caché {carga['sin_cache']:.3f} ms, con caché {carga['cacheado']:.3f} ms"
+        )
+        self.stdout.write(f"URL de un artículo: reverse() {ruta['reverse']:.2f} µs, ruta memorizada {ruta['memorizada']:.2f} µs")
+
+        duracion = time.perf_counter() - inicio
+        if options['salida']:
+            informe = {
+                'fecha': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'repeticiones': repeticiones,
+                **resultados,
+            }
+            with open(options['salida'], 'w') as archivo:
+                json.dump(informe, archivo, indent=2)
+            self.stdout.write(f"Resultados guardados en {options['salida']}")
+        self.stdout.write(self.style.SUCCESS(f'Benchmark completado en {duracion:.2f}s.'))
+
+    def _carga(self, repeticiones):
+        # Django envuelve los cargadores en el de caché si no se indican: se pasan sin él.
+        sin_cache = Engine(loaders=[
+            'django.template.loaders.filesystem.Loader', 'django.template.loaders.app_directories.Loader',
+        ])
+        get_template('blog/lista_articulos.html')
+        return {
+            'sin_cache': _mediana_ms(lambda: sin_cache.get_template('blog/lista_articulos.html'), repeticiones),
+            'cacheado': _mediana_ms(lambda: get_template('blog/lista_articulos.html'), repeticiones),
+        }
+
+    def _rutas(self, repeticiones, n=1000):
+        slugs = [f'articulo-de-prueba-{i}' for i in range(n)]
+        ruta_slug('blog:detalle_articulo', slugs[0])
+
+        def con_reverse():
+            for slug in slugs:
+                reverse('blog:detalle_articulo', kwargs={'slug': slug})
+
+        def memorizada():
+            for slug in slugs:
+                ruta_slug('blog:detalle_articulo', slug)
+
+        return {
+            'reverse': round(_mediana_ms(con_reverse, repeticiones) * 1000 / n, 3),
+            'memorizada': round(_mediana_ms(memorizada, repeticiones) * 1000 / n, 3),
+        }
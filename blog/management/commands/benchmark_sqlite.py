@@ -0,0 +1,192 @@
+import json
+import multiprocessing
+import os
+import platform
+import random
+import statistics
+import tempfile
+import time
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.benchmark import VOCABULARIO, entorno_aislado, sembrar
+from blog.metricas import percentil
+from blog.models import Articulo, Categoria
+from blog.sqlite import escritura
+from blog.visitas import contador_visitas
+
+# Configuración de Django por defecto frente a la de config/settings.py.
+MODOS = {
+    'antes': {
+        'BLOG_SQLITE': {'PRAGMAS': {'journal_mode': 'delete'}, 'ESCRITOR_UNICO': False},
+        'transaction_mode': None,
+    },
+    'despues': {
+        'BLOG_SQLITE': {
+            'PRAGMAS': {
+                'journal_mode': 'wal', 'synchronous': 'normal', 'mmap_size': 256 * 1024 * 1024,
+                'cache_size': -64 * 1024, 'busy_timeout': 5000, 'temp_store': 'memory',
+            },
+            'ESCRITOR_UNICO': True,
+        },
+        'transaction_mode': 'IMMEDIATE',
+    },
+}
+
+SIN_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+def _leer(cliente, rnd, urls):
+    respuesta = cliente.get(rnd.choice(urls))
+    if respuesta.status_code != 200:
+        raise OperationalError(f'HTTP {respuesta.status_code}')
+
+
+def _escribir(_, rnd, ids):
+    # Como un guardado del admin: lee el artículo y lo escribe en la misma transacción.
+    with escritura('default'):
+        articulo = Articulo.objects.get(pk=rnd.choice(ids))
+        articulo.contenido = ' '.join(rnd.choice(VOCABULARIO) for _ in range(200))
+        articulo.save()
+
+
+def _trabajador(rol, modo, segundos, semilla, datos, cola):
+    '''
+    Proceso lector o escritor: repite su operación durante `segundos` y envía a la cola
+    las latencias de las que terminaron y cuántas fallaron.
+    '''
+    ajustes = MODOS[modo]
+    opciones = dict(connection.settings_dict['OPTIONS'])
+    opciones.pop('transaction_mode', None)
+    if ajustes['transaction_mode']:
+        opciones['transaction_mode'] = ajustes['transaction_mode']
+    connection.settings_dict['OPTIONS'] = opciones
+
+    rnd = random.Random(semilla)
+    operacion = _leer if rol == 'lector' else _escribir
+    cliente = Client()
+    latencias, errores = [], 0
+    with override_settings(BLOG_SQLITE=ajustes['BLOG_SQLITE'], CACHES=SIN_CACHE):
+        fin = time.perf_counter() + segundos
+        while time.perf_counter() < fin:
+            inicio = time.perf_counter()
+            try:
+                operacion(cliente, rnd, datos)
+            except OperationalError:
+                errores += 1
+                continue
+            latencias.append((time.perf_counter() - inicio) * 1000)
+    contador_visitas.descartar()
+    connections.close_all()
+    cola.put((rol, latencias, errores))
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide lecturas y escrituras por segundo con N procesos lectores (páginas del blog) '
+        'y M escritores (guardados de artículos) sobre un archivo SQLite, con la '
+        'configuración por defecto de Django y con la de blog/sqlite.py.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lectores', type=int, default=4)
+        parser.add_argument('--escritores', type=int, default=2)
+        parser.add_argument('--segundos', type=float, default=10)
+        parser.add_argument('--articulos', type=int, default=2000)
+        parser.add_argument('--categorias', type=int, default=20)
+        parser.add_argument('--semilla', type=int, default=0)
+        parser.add_argument('--salida', help='Archivo JSON donde guardar los resultados.')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Este benchmark solo tiene sentido con SQLite.')
+        if options['lectores'] < 0 or options['escritores'] < 0 or options['lectores'] + options['escritores'] == 0:
+            raise CommandError('Hace falta al menos un lector o un escritor.')
+
+        resultados = {}
+        with tempfile.TemporaryDirectory() as directorio:
+            # Un archivo de verdad: la base de prueba en memoria no se comparte entre procesos.
+            connection.settings_dict['TEST'] = {**connection.settings_dict['TEST'], 'NAME': os.path.join(directorio, 'benchmark.sqlite3')}
+            with entorno_aislado():
+                sembrar(options['articulos'], options['categorias'], semilla=options['semilla'])
+                ids = list(Articulo.objects.values_list('id', flat=True))
+                urls = [reverse('blog:lista_articulos')]
+                urls += [reverse('blog:detalle_articulo', kwargs={'slug': slug}) for slug in Articulo.objects.values_list('slug', flat=True)[:200]]
+                urls += [c.get_absolute_url() for c in Categoria.objects.all()]
+                for modo in MODOS:
+                    resultados[modo] = self._medir(modo, options, urls, ids)
+                    self._imprimir(modo, resultados[modo])
+
+        self._comparar(resultados)
+        if options['salida']:
+            informe = {
+                'fecha': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'lectores': options['lectores'],
+                'escritores': options['escritores'],
+                'segundos': options['segundos'],
+                'modos': resultados,
+            }
+            with open(options['salida'], 'w') as archivo:
+                json.dump(informe, archivo, indent=2)
+            self.stdout.write(f"Resultados guardados en {options['salida']}")
+        self.stdout.write(self.style.SUCCESS('Benchmark completado.'))
+
+    def _medir(self, modo, options, urls, ids):
+        # Los hijos abren sus propias conexiones: no se hereda una abierta por fork.
+        connections.close_all()
+        contexto = multiprocessing.get_context('fork')
+        cola = contexto.Queue()
+        roles = ['lector'] * options['lectores'] + ['escritor'] * options['escritores']
+        procesos = [
+            contexto.Process(
+                target=_trabajador,
+                args=(rol, modo, options['segundos'], options['semilla'] + i, urls if rol == 'lector' else ids, cola),
+            )
+            for i, rol in enumerate(roles)
+        ]
+        for proceso in procesos:
+            proceso.start()
+        partes = [cola.get() for _ in procesos]
+        for proceso in procesos:
+            proceso.join()
+
+        resultado = {}
+        for rol in ('lector', 'escritor'):
+            latencias = [latencia for r, lista, _ in partes if r == rol for latencia in lista]
+            errores = sum(e for r, _, e in partes if r == rol)
+            resultado[rol] = {
+                'operaciones': len(latencias),
+                'por_segundo': round(len(latencias) / options['segundos'], 2),
+                'errores': errores,
+                'latencia_ms': {
+                    'media': round(statistics.fmean(latencias), 3) if latencias else 0.0,
+                    **{f'p{p}': round(percentil(latencias, p), 3) for p in (50, 95, 99)},
+                },
+            }
+        return resultado
+
+    def _imprimir(self, modo, resultado):
+        for rol, datos in resultado.items():
+            latencia = datos['latencia_ms']
+            self.stdout.write(
+                f"{modo:<8}{rol:<9}{datos['por_segundo']:>9.1f} op/s  errores {datos['errores']:>5}  "
+                f"p50 {latencia['p50']:>8.2f} ms  p95 {latencia['p95']:>8.2f} ms  p99 {latencia['p99']:>8.2f} ms"
+            )
+
+    def _comparar(self, resultados):
+        self.stdout.write('\nDespués respecto a antes:')
+        for rol in ('lector', 'escritor'):
+            antes, despues = resultados['antes'][rol], resultados['despues'][rol]
+            if antes['por_segundo']:
+                cambio = despues['por_segundo'] / antes['por_segundo'] - 1
+                self.stdout.write(
+                    f"{rol:<9} op/s {cambio:+.1%}  errores {antes['errores']} -> {despues['errores']}"
+                )
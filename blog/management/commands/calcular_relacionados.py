@@ -0,0 +1,31 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.relacionados import calcular
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcula desde cero los artículos relacionados (texto TF-IDF y categorías en '
+        'común) repartiendo los lotes entre varios procesos. Pensado para ejecutarse de '
+        'noche: entre ejecuciones, las señales actualizan los artículos que se guardan.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--procesos', type=int, default=os.cpu_count() or 1,
+            help='Procesos del pool (por defecto, uno por CPU; 1 lo hace todo en este proceso).',
+        )
+        parser.add_argument('--lote', type=int, help='Artículos por lote (por defecto BLOG_RELACIONADOS["LOTE"]).')
+
+    def handle(self, *args, **options):
+        if options['procesos'] < 1:
+            raise CommandError('--procesos debe ser al menos 1.')
+        inicio = time.perf_counter()
+        articulos, cambiados = calcular(procesos=options['procesos'], lote=options['lote'])
+        duracion = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f'{articulos} artículos procesados, {cambiados} con relacionados nuevos, en {duracion:.2f} s.'
+        ))
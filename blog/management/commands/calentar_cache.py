@@ -0,0 +1,124 @@
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+
+from blog.metricas import percentil
+from blog.models import Articulo, Categoria
+from blog.paginacion import PaginadorCursor
+from blog.views import VistaListaArticulos
+
+
+def inventario(paginas, articulos=None):
+    '''
+    URL a calentar, de las más visitadas a las menos: las primeras `paginas` páginas
+    de la lista, la primera de cada categoría y el detalle de los artículos, de los
+    más recientes a los más antiguos (solo los `articulos` primeros si se indica).
+    '''
+    lista = reverse('blog:lista_articulos')
+    urls = []
+    # Los cursores salen del mismo paginador que usa la vista, leyendo solo las claves de orden.
+    paginador = PaginadorCursor(
+        Articulo.objects.only('id', 'fecha_creacion'), VistaListaArticulos.ordering, VistaListaArticulos.paginate_by,
+    )
+    token = None
+    for _ in range(paginas):
+        urls.append(f'{lista}?cursor={token}' if token else lista)
+        token = paginador.pagina(token).cursor_siguiente
+        if token is None:
+            break
+    urls += [categoria.get_absolute_url() for categoria in Categoria.objects.only('slug').order_by('nombre')]
+    recientes = Articulo.objects.only('slug').order_by(*VistaListaArticulos.ordering)
+    if articulos is not None:
+        recientes = recientes[:articulos]
+    urls += [articulo.get_absolute_url() for articulo in recientes.iterator()]
+    return urls
+
+
+def _host():
+    # El cliente de pruebas usa "testserver", que ALLOWED_HOSTS rechaza fuera de las pruebas.
+    for host in settings.ALLOWED_HOSTS:
+        if host != '*':
+            return host.lstrip('.')
+    return 'localhost'
+
+
+class Command(BaseCommand):
+    help = (
+        'Recorre las páginas más visitadas del blog (lista, categorías y artículos) con '
+        'varios hilos para llenar la caché configurada y las páginas de la base de datos '
+        'después de un despliegue, y muestra cuánto tardó cada URL.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hilos', type=int, default=4, help='Peticiones en paralelo.')
+        parser.add_argument('--paginas', type=int, default=3, help='Páginas de la lista principal.')
+        parser.add_argument('--articulos', type=int, help='Solo los N artículos más recientes.')
+        parser.add_argument('--lentas', type=int, default=10, help='URL más lentas que se listan.')
+        parser.add_argument('--host', default=None, help='Cabecera Host de las peticiones.')
+        parser.add_argument('--salida', help='Archivo JSON donde guardar el tiempo de cada URL.')
+
+    def handle(self, *args, **options):
+        if options['hilos'] < 1:
+            raise CommandError('--hilos debe ser al menos 1.')
+        if isinstance(caches['default'], LocMemCache):
+            self.stderr.write(self.style.WARNING(
+                'La caché es locmem, propia de cada proceso: solo se calientan la base de '
+                'datos y el disco, no la caché de los workers.'
+            ))
+
+        inicio = time.perf_counter()
+        urls = inventario(options['paginas'], options['articulos'])
+        host = options['host'] or _host()
+        locales = threading.local()
+
+        def pedir(url):
+            if not hasattr(locales, 'cliente'):
+                locales.cliente = Client(HTTP_HOST=host)
+            # HEAD renderiza y guarda en caché como un GET, pero no cuenta como visita.
+            inicio_url = time.perf_counter()
+            respuesta = locales.cliente.head(url)
+            return url, respuesta.status_code, (time.perf_counter() - inicio_url) * 1000
+
+        with ThreadPoolExecutor(max_workers=options['hilos']) as hilos:
+            resultados = list(hilos.map(pedir, urls))
+        duracion = time.perf_counter() - inicio
+
+        if options['verbosity'] > 1:
+            for url, estado, ms in resultados:
+                self.stdout.write(f'{ms:>9.1f} ms  {estado}  {url}')
+        fallidas = [(url, estado) for url, estado, _ in resultados if estado != 200]
+        for url, estado in fallidas:
+            self.stderr.write(self.style.ERROR(f'{estado}  {url}'))
+
+        latencias = [ms for _, _, ms in resultados]
+        if latencias:
+            self.stdout.write(
+                f'{len(latencias)} URL: media {statistics.fmean(latencias):.1f} ms, '
+                f'p50 {percentil(latencias, 50):.1f} ms, p95 {percentil(latencias, 95):.1f} ms, '
+                f'máx {max(latencias):.1f} ms'
+            )
+            self.stdout.write(f"Las {min(options['lentas'], len(resultados))} más lentas:")
+            for url, estado, ms in sorted(resultados, key=lambda r: r[2], reverse=True)[:options['lentas']]:
+                self.stdout.write(f'{ms:>9.1f} ms  {estado}  {url}')
+
+        if options['salida']:
+            with open(options['salida'], 'w') as archivo:
+                json.dump(
+                    [{'url': url, 'estado': estado, 'ms': round(ms, 3)} for url, estado, ms in resultados],
+                    archivo, indent=2,
+                )
+            self.stdout.write(f"Tiempos guardados en {options['salida']}")
+
+        mensaje = f'{len(resultados)} URL calentadas en {duracion:.2f}s con {options["hilos"]} hilos.'
+        if fallidas:
+            raise CommandError(f'{mensaje} {len(fallidas)} no respondieron 200.')
+        self.stdout.write(self.style.SUCCESS(mensaje))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from blog.cache import estadisticas, reiniciar_estadisticas
+
+
+class Command(BaseCommand):
+    help = 'Muestra los aciertos y fallos acumulados de las cachés del blog.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reiniciar', action='store_true', help='Pone los contadores a cero después de mostrarlos.')
+
+    def handle(self, *args, **options):
+        for nombre, datos in estadisticas().items():
+            self.stdout.write(
+                f"{nombre}: {datos['aciertos']} aciertos, {datos['fallos']} fallos, "
+                f"tasa de aciertos {datos['tasa']:.1%}"
+            )
+        if options['reiniciar']:
+            reiniciar_estadisticas()
+            self.stdout.write(self.style.SUCCESS('Contadores reiniciados.'))
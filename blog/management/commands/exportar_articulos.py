@@ -0,0 +1,67 @@
+import csv
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Prefetch
+
+from blog.models import Articulo, Categoria
+
+CAMPOS = ['titulo', 'slug', 'contenido', 'fecha_creacion', 'fecha_actualizacion', 'categorias']
+SEPARADOR_CATEGORIAS = '|'
+
+
+class Command(BaseCommand):
+    help = 'Exporta los artículos a NDJSON o CSV leyendo la tabla por bloques, en memoria constante.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('salida', nargs='?', default='-', help="Archivo de destino ('-' para la salida estándar).")
+        parser.add_argument('--formato', choices=['ndjson', 'csv'], help='Por defecto se deduce de la extensión.')
+        parser.add_argument('--lote', type=int, default=1000, help='Filas leídas por consulta.')
+
+    def handle(self, *args, **options):
+        salida = options['salida']
+        formato = options['formato'] or ('csv' if salida.endswith('.csv') else 'ndjson')
+        if salida == '-':
+            self._exportar(sys.stdout, formato, options['lote'])
+        else:
+            with open(salida, 'w', encoding='utf-8', newline='') as archivo:
+                self._exportar(archivo, formato, options['lote'])
+
+    def _exportar(self, archivo, formato, lote):
+        articulos = (
+            Articulo.objects
+            .only(*CAMPOS[:-1])
+            .order_by('id')
+            .prefetch_related(Prefetch('categorias', queryset=Categoria.objects.only('nombre')))
+            .iterator(chunk_size=lote)
+        )
+        escritor = csv.DictWriter(archivo, fieldnames=CAMPOS) if formato == 'csv' else None
+        if escritor:
+            escritor.writeheader()
+
+        inicio = time.perf_counter()
+        total = 0
+        for articulo in articulos:
+            fila = {
+                'titulo': articulo.titulo,
+                'slug': articulo.slug,
+                'contenido': articulo.contenido,
+                'fecha_creacion': articulo.fecha_creacion.isoformat(),
+                'fecha_actualizacion': articulo.fecha_actualizacion.isoformat(),
+                'categorias': [categoria.nombre for categoria in articulo.categorias.all()],
+            }
+            if escritor:
+                if any(SEPARADOR_CATEGORIAS in nombre for nombre in fila['categorias']):
+                    raise CommandError(f"Una categoría de '{articulo.slug}' contiene '{SEPARADOR_CATEGORIAS}'; use NDJSON.")
+                fila['categorias'] = SEPARADOR_CATEGORIAS.join(fila['categorias'])
+                escritor.writerow(fila)
+            else:
+                archivo.write(json.dumps(fila, ensure_ascii=False) + '\n')
+            total += 1
+
+        duracion = time.perf_counter() - inicio
+        self.stderr.write(self.style.SUCCESS(
+            f'{total} artículos exportados en {duracion:.2f} s ({total / duracion if duracion else 0:.0f} filas/s).'
+        ))
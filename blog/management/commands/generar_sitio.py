@@ -0,0 +1,62 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from blog import sitio
+
+
+class Command(BaseCommand):
+    help = (
+        'Pre-renderiza la lista, las páginas de categoría y cada artículo como HTML estático '
+        'en BLOG_SITIO_DIR, regenerando solo las páginas que cambiaron desde la última vez. '
+        'De las listas se genera la primera página: la paginación y la búsqueda enlazan '
+        'con las vistas dinámicas.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--directorio', default=settings.BLOG_SITIO_DIR, help='Carpeta de destino.')
+        parser.add_argument('--procesos', type=int, default=1, help='Procesos para renderizar en paralelo.')
+        parser.add_argument('--lote', type=int, default=200, help='Páginas por tarea enviada al pool.')
+        parser.add_argument('--completo', action='store_true', help='Ignora el manifiesto y renderiza todo.')
+
+    def handle(self, *args, **options):
+        directorio = options['directorio']
+        inicio = time.perf_counter()
+        paginas = sitio.inventario()
+        anterior = {} if options['completo'] else sitio.leer_manifiesto(directorio)
+
+        pendientes = [
+            (ruta, tipo, argumento)
+            for ruta, (tipo, argumento, huella) in paginas.items()
+            if anterior.get(ruta) != huella
+        ]
+        obsoletas = [ruta for ruta in anterior if ruta not in paginas]
+
+        renderizadas = self._renderizar(directorio, pendientes, options['procesos'], options['lote'])
+        sitio.eliminar(directorio, obsoletas)
+        sitio.guardar_manifiesto(directorio, {ruta: datos[2] for ruta, datos in paginas.items()})
+
+        duracion = time.perf_counter() - inicio
+        if (renderizadas or obsoletas) and not getattr(settings, 'WHITENOISE_AUTOREFRESH', settings.DEBUG):
+            self.stderr.write(self.style.WARNING(
+                'WhiteNoise solo lee los archivos estáticos al arrancar: reinicie los workers '
+                '(kill -HUP al master de gunicorn) para servir las páginas nuevas o modificadas.'
+            ))
+        self.stdout.write(self.style.SUCCESS(
+            f'{renderizadas} páginas renderizadas, {len(paginas) - len(pendientes)} sin cambios, '
+            f'{len(obsoletas)} eliminadas en {duracion:.2f} s.'
+        ))
+
+    def _renderizar(self, directorio, pendientes, procesos, lote):
+        if procesos <= 1 or len(pendientes) <= lote:
+            return sitio.renderizar_lote(directorio, pendientes)
+
+        # Las conexiones abiertas no deben heredarse en los procesos hijos.
+        connections.close_all()
+        lotes = [pendientes[i:i + lote] for i in range(0, len(pendientes), lote)]
+        with ProcessPoolExecutor(max_workers=procesos, initializer=django.setup) as pool:
+            return sum(pool.map(sitio.renderizar_lote, [directorio] * len(lotes), lotes))
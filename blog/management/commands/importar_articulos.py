@@ -0,0 +1,137 @@
+import csv
+import json
+import sys
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from blog import contadores
+from blog.busqueda import obtener_backend
+from blog.models import Articulo, Categoria
+from blog.registro import registro_categorias
+from blog.renderizado import actualizar_html, obtener_renderizador
+from blog.slugs import asignar_slugs
+from blog.texto import generar_extracto
+
+from .exportar_articulos import SEPARADOR_CATEGORIAS
+
+
+class Command(BaseCommand):
+    help = (
+        'Importa artículos desde NDJSON o CSV por lotes con bulk_create, reservando slugs '
+        'libres en bloque y enlazando categorías en bloque.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('entrada', help="Archivo de origen ('-' para la entrada estándar).")
+        parser.add_argument('--formato', choices=['ndjson', 'csv'], help='Por defecto se deduce de la extensión.')
+        parser.add_argument('--lote', type=int, default=500, help='Artículos insertados por lote.')
+
+    def handle(self, *args, **options):
+        entrada = options['entrada']
+        formato = options['formato'] or ('csv' if entrada.endswith('.csv') else 'ndjson')
+        if entrada == '-':
+            self._importar(sys.stdin, formato, options['lote'])
+        else:
+            with open(entrada, encoding='utf-8', newline='') as archivo:
+                self._importar(archivo, formato, options['lote'])
+
+    def _filas(self, archivo, formato):
+        if formato == 'csv':
+            csv.field_size_limit(sys.maxsize)
+            for fila in csv.DictReader(archivo):
+                nombres = fila.get('categorias') or ''
+                fila['categorias'] = [n for n in nombres.split(SEPARADOR_CATEGORIAS) if n]
+                yield fila
+            return
+        for numero, linea in enumerate(archivo, start=1):
+            if linea.strip():
+                try:
+                    yield json.loads(linea)
+                except ValueError as error:
+                    raise CommandError(f'Línea {numero}: JSON inválido ({error}).')
+
+    def _importar(self, archivo, formato, lote):
+        filas = self._filas(archivo, formato)
+        self.categorias = {}
+        inicio = time.perf_counter()
+        total = 0
+        while True:
+            bloque = list(islice(filas, lote))
+            if not bloque:
+                break
+            with transaction.atomic():
+                self._importar_lote(bloque)
+            total += len(bloque)
+            duracion = time.perf_counter() - inicio
+            self.stderr.write(f'{total} artículos importados ({total / duracion:.0f} filas/s)')
+
+        registro_categorias.invalidar()
+        duracion = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f'{total} artículos importados en {duracion:.2f} s ({total / duracion if duracion else 0:.0f} filas/s).'
+        ))
+
+    def _importar_lote(self, bloque):
+        for fila in bloque:
+            if not fila.get('titulo'):
+                raise CommandError(f'Fila sin título: {fila!r}')
+        ids_categorias = self._resolver_categorias({n for fila in bloque for n in fila.get('categorias') or []})
+        slugs = asignar_slugs(Articulo, [fila.get('slug') or fila['titulo'] for fila in bloque])
+
+        articulos = [
+            Articulo(
+                titulo=fila['titulo'],
+                contenido=fila.get('contenido') or '',
+                slug=slug,
+            )
+            for fila, slug in zip(bloque, slugs)
+        ]
+        renderizador = obtener_renderizador()
+        for articulo in articulos:
+            actualizar_html(articulo, renderizador)
+            articulo.extracto = generar_extracto(articulo.contenido_html)
+        Articulo.objects.bulk_create(articulos)
+
+        # bulk_create aplica auto_now/auto_now_add: se restauran las fechas del archivo.
+        con_fechas = []
+        for articulo, fila in zip(articulos, bloque):
+            creacion = parse_datetime(fila.get('fecha_creacion') or '')
+            actualizacion = parse_datetime(fila.get('fecha_actualizacion') or '')
+            if creacion or actualizacion:
+                articulo.fecha_creacion = creacion or articulo.fecha_creacion
+                articulo.fecha_actualizacion = actualizacion or articulo.fecha_actualizacion
+                con_fechas.append(articulo)
+        if con_fechas:
+            Articulo.objects.bulk_update(con_fechas, ['fecha_creacion', 'fecha_actualizacion'])
+
+        Relacion = Articulo.categorias.through
+        relaciones = [
+            Relacion(articulo_id=articulo.id, categoria_id=ids_categorias[nombre])
+            for articulo, fila in zip(articulos, bloque)
+            for nombre in set(fila.get('categorias') or [])
+        ]
+        Relacion.objects.bulk_create(relaciones, ignore_conflicts=True)
+
+        # Sin señales en bulk_create: el índice de búsqueda y los contadores se actualizan por lote.
+        obtener_backend().indexar(articulos)
+        contadores.sumar_articulos(articulos, relaciones)
+
+    def _resolver_categorias(self, nombres):
+        '''
+        Devuelve {nombre: id}, creando en bloque las categorías que no existan.
+        '''
+        faltantes = nombres - self.categorias.keys()
+        if faltantes:
+            self.categorias.update(Categoria.objects.filter(nombre__in=faltantes).values_list('nombre', 'id'))
+            nuevas = faltantes - self.categorias.keys()
+            if nuevas:
+                slugs = asignar_slugs(Categoria, sorted(nuevas))
+                Categoria.objects.bulk_create([
+                    Categoria(nombre=nombre, slug=slug) for nombre, slug in zip(sorted(nuevas), slugs)
+                ])
+                self.categorias.update(Categoria.objects.filter(nombre__in=nuevas).values_list('nombre', 'id'))
+        return {nombre: self.categorias[nombre] for nombre in nombres}
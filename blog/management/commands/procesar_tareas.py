@@ -0,0 +1,57 @@
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from blog.tareas import procesar
+
+
+class Command(BaseCommand):
+    help = (
+        'Procesa la cola de tareas del blog (índice de búsqueda, relacionados...) por '
+        'lotes, con reintentos. Sin --una-vez se queda esperando tareas nuevas hasta '
+        'recibir SIGTERM o Ctrl+C, y termina el lote en curso antes de salir.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, help='Tareas por vuelta (por defecto BLOG_TAREAS["LOTE"]).')
+        parser.add_argument('--intervalo', type=float, help='Segundos de espera con la cola vacía.')
+        parser.add_argument('--una-vez', action='store_true', help='Vacía la cola disponible y termina.')
+
+    def handle(self, *args, **options):
+        config = settings.BLOG_TAREAS
+        lote = options['lote'] or config['LOTE']
+        intervalo = options['intervalo'] if options['intervalo'] is not None else config['INTERVALO']
+        if lote < 1:
+            raise CommandError('--lote debe ser al menos 1.')
+
+        self._detener = False
+        if not options['una_vez']:
+            signal.signal(signal.SIGTERM, self._parar)
+            signal.signal(signal.SIGINT, self._parar)
+
+        inicio = time.perf_counter()
+        total_hechas = total_fallidas = 0
+        while not self._detener:
+            # Un proceso de larga vida: se descartan las conexiones caídas o vencidas.
+            close_old_connections()
+            hechas, fallidas = procesar(lote)
+            total_hechas += hechas
+            total_fallidas += fallidas
+            if hechas or fallidas:
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'{hechas} tareas hechas, {fallidas} con error.')
+                continue
+            if options['una_vez']:
+                break
+            time.sleep(intervalo)
+
+        duracion = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f'{total_hechas} tareas hechas y {total_fallidas} con error en {duracion:.2f} s.'
+        ))
+
+    def _parar(self, *args):
+        self._detener = True
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.contadores import reconciliar
+from blog.registro import registro_categorias
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcula desde los artículos los contadores por categoría y el archivo mensual, '
+        'por si quedaron desajustados (por ejemplo tras cargas con bulk_create o SQL directo).'
+    )
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        categorias, meses = reconciliar()
+        registro_categorias.invalidar()
+        duracion = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f'{categorias} categorías y {meses} meses corregidos en {duracion:.2f} s.'
+        ))
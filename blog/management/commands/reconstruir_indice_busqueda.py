@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.busqueda import obtener_backend
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye desde cero el índice de búsqueda de los artículos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=1000, help='Artículos indexados por lote.')
+
+    def handle(self, *args, **options):
+        backend = obtener_backend()
+        inicio = time.perf_counter()
+        total = backend.reconstruir(lote=options['lote'])
+        duracion = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f'{backend.__class__.__name__}: {total} artículos indexados en {duracion:.2f} s.'
+        ))
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.models import Articulo
+from blog.texto import generar_extracto
+
+
+class Command(BaseCommand):
+    help = 'Calcula el extracto de los artículos que no lo tienen (o de todos con --todos).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=500, help='Artículos actualizados por consulta.')
+        parser.add_argument('--todos', action='store_true', help='Recalcula también los extractos existentes.')
+
+    def handle(self, *args, **options):
+        queryset = Articulo.objects.only('id', 'contenido_html').order_by('id')
+        if not options['todos']:
+            queryset = queryset.filter(extracto='')
+
+        inicio = time.perf_counter()
+        total = 0
+        ultimo_id = 0
+        while True:
+            lote = list(queryset.filter(id__gt=ultimo_id)[:options['lote']])
+            if not lote:
+                break
+            for articulo in lote:
+                articulo.extracto = generar_extracto(articulo.contenido_html)
+            # bulk_update no llama a save() ni dispara señales: solo cambia el extracto.
+            Articulo.objects.bulk_update(lote, ['extracto'])
+            total += len(lote)
+            ultimo_id = lote[-1].id
+
+        duracion = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(f'{total} extractos actualizados en {duracion:.2f} s.'))
@@ -0,0 +1,75 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog import contadores
+from blog.cache import invalidar_detalle
+from blog.models import Articulo
+from blog.renderizado import CAMPOS, RenderizadorTexto, obtener_renderizador, renderizar_lotes
+from blog.texto import generar_extracto
+
+
+class Command(BaseCommand):
+    help = (
+        'Regenera el HTML guardado de los artículos renderizados con otra versión del '
+        'renderizador (o de todos con --todos), repartiendo los lotes entre varios procesos.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--procesos', type=int, default=os.cpu_count() or 1,
+            help='Procesos del pool (por defecto, uno por CPU; 1 lo hace todo en este proceso).',
+        )
+        parser.add_argument('--lote', type=int, default=200, help='Artículos por lote.')
+        parser.add_argument('--todos', action='store_true', help='Regenera también los que ya están al día.')
+        parser.add_argument(
+            '--convertir', action='store_true',
+            help='Pasa también al renderizador actual los artículos escritos en texto plano.',
+        )
+
+    def handle(self, *args, **options):
+        if options['procesos'] < 1:
+            raise CommandError('--procesos debe ser al menos 1.')
+        renderizador = obtener_renderizador()
+        queryset = Articulo.objects.order_by('id')
+        if not options['todos']:
+            queryset = queryset.exclude(contenido_renderizador=renderizador.version)
+        if not options['convertir'] and renderizador.version != RenderizadorTexto.version:
+            # Los de texto plano siguen con RenderizadorTexto (ver blog/renderizado.py).
+            queryset = queryset.exclude(contenido_renderizador=RenderizadorTexto.version)
+        filas = queryset.values_list('id', 'contenido').iterator(chunk_size=options['lote'])
+
+        inicio = time.perf_counter()
+        total = 0
+        for resultados in renderizar_lotes(filas, renderizador, options['procesos'], options['lote']):
+            articulos = [
+                Articulo(
+                    id=id_, contenido_html=html, contenido_hash=huella, extracto=generar_extracto(html),
+                    contenido_renderizador=renderizador.version,
+                )
+                for id_, html, huella in resultados
+            ]
+            anteriores = {
+                id_: (slug, extracto, html)
+                for id_, slug, extracto, html in Articulo.objects.filter(id__in=[a.id for a in articulos])
+                .values_list('id', 'slug', 'extracto', 'contenido_html')
+            }
+            # bulk_update no pasa por save() ni auto_now, y así debe ser: nadie editó estos
+            # artículos. El renderizador forma parte del ETag del detalle y de la clave de
+            # las tarjetas; las listas y los feeds que muestran un extracto o un HTML que
+            # cambia (también la de los más leídos) se marcan con sus contadores.
+            Articulo.objects.bulk_update(articulos, [*CAMPOS, 'extracto'])
+            invalidar_detalle(*(slug for slug, _, _ in anteriores.values()))
+            cambiados = [
+                a.id for a in articulos
+                if a.id in anteriores and (a.extracto, a.contenido_html) != anteriores[a.id][1:]
+            ]
+            if cambiados:
+                contadores.tocar_articulos(cambiados)
+            total += len(articulos)
+
+        duracion = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f'{total} artículos renderizados con {renderizador.version} en {duracion:.2f} s.'
+        ))
@@ -0,0 +1,39 @@
+import json
+import shutil
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.metricas import CAMPOS, leer_volcados, resumir
+
+
+class Command(BaseCommand):
+    help = 'Muestra p50/p95/p99 por vista a partir de las muestras de la instrumentación.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--directorio', default=settings.BLOG_INSTRUMENTACION['DIRECTORIO'],
+            help='Carpeta con los volcados de cada proceso.',
+        )
+        parser.add_argument('--json', action='store_true', help='Escribe el resumen en JSON.')
+        parser.add_argument('--limpiar', action='store_true', help='Borra los volcados después de leerlos.')
+
+    def handle(self, *args, **options):
+        resumen = resumir(leer_volcados(options['directorio'], settings.BLOG_INSTRUMENTACION['RETENCION']))
+
+        if options['json']:
+            self.stdout.write(json.dumps(resumen, indent=2, sort_keys=True))
+        elif not resumen:
+            self.stdout.write('No hay muestras registradas.')
+        else:
+            encabezado = f"{'vista':<32}{'n':>7}" + ''.join(f'{campo + " p50/p95/p99":>30}' for campo in CAMPOS)
+            self.stdout.write(encabezado)
+            for nombre, datos in sorted(resumen.items()):
+                fila = f"{nombre:<32}{datos['n']:>7}"
+                for campo in CAMPOS:
+                    p = datos[campo]
+                    fila += f"{p['p50']:>10.1f}{p['p95']:>10.1f}{p['p99']:>10.1f}"
+                self.stdout.write(fila)
+
+        if options['limpiar']:
+            shutil.rmtree(options['directorio'], ignore_errors=True)
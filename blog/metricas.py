@@ -0,0 +1,125 @@
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+CAMPOS = ('consultas', 'db', 'plantilla', 'total')
+
+
+def percentil(valores, p):
+    '''
+    Percentil p (0-100) con interpolación lineal entre los dos valores más cercanos.
+    '''
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    posicion = (len(ordenados) - 1) * p / 100
+    inferior = int(posicion)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (posicion - inferior)
+
+
+def resumir(muestras):
+    '''
+    Recibe {nombre: [muestra, ...]} con muestras {'consultas', 'db', 'plantilla', 'total'}
+    y devuelve {nombre: {'n': ..., campo: {'p50', 'p95', 'p99'}}}.
+    '''
+    resumen = {}
+    for nombre, lista in muestras.items():
+        resumen[nombre] = {'n': len(lista)}
+        for campo in CAMPOS:
+            valores = [muestra[campo] for muestra in lista]
+            resumen[nombre][campo] = {f'p{p}': round(percentil(valores, p), 3) for p in (50, 95, 99)}
+    return resumen
+
+
+class AgregadorMetricas:
+    '''
+    Guarda en memoria las últimas muestras de cada vista (cola acotada) y cada cierto
+    número de muestras las vuelca a un archivo JSON por proceso, que luego el comando
+    reporte_rendimiento combina. Al terminar el proceso vuelca lo que quede pendiente.
+    '''
+
+    def __init__(self, directorio, muestras_por_vista=1000, volcar_cada=100):
+        self.directorio = Path(directorio)
+        self.muestras_por_vista = muestras_por_vista
+        self.volcar_cada = volcar_cada
+        self._lock = threading.Lock()
+        self._muestras = {}
+        self._pendientes = 0
+        atexit.register(self.al_salir)
+
+    def al_salir(self):
+        if self._pendientes:
+            self.volcar()
+
+    def cerrar(self):
+        '''
+        Vuelca lo pendiente y deja de hacerlo al salir (cuando se reemplaza el agregador).
+        '''
+        atexit.unregister(self.al_salir)
+        self.al_salir()
+
+    def registrar(self, nombre, muestra):
+        with self._lock:
+            cola = self._muestras.get(nombre)
+            if cola is None:
+                cola = self._muestras[nombre] = deque(maxlen=self.muestras_por_vista)
+            cola.append(muestra)
+            self._pendientes += 1
+            volcar = self._pendientes >= self.volcar_cada
+        if volcar:
+            self.volcar()
+
+    def muestras(self):
+        with self._lock:
+            return {nombre: list(cola) for nombre, cola in self._muestras.items()}
+
+    def volcar(self):
+        datos = self.muestras()
+        with self._lock:
+            self._pendientes = 0
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        destino = self.directorio / f'{os.getpid()}.json'
+        temporal = destino.with_suffix('.tmp')
+        temporal.write_text(json.dumps(datos))
+        os.replace(temporal, destino)
+
+
+def _vivo(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def leer_volcados(directorio, retencion=None):
+    '''
+    Combina las muestras volcadas por todos los procesos en {nombre: [muestra, ...]}.
+
+    Con retencion (segundos) borra y no cuenta los volcados de procesos que ya no
+    existen escritos hace más de ese tiempo: los workers que reinicia gunicorn dejan
+    de pesar en los percentiles y la carpeta no crece sin límite.
+    '''
+    combinadas = {}
+    limite = time.time() - retencion if retencion is not None else None
+    for archivo in sorted(Path(directorio).glob('*.json')):
+        try:
+            if (
+                limite is not None and archivo.stem.isdigit()
+                and archivo.stat().st_mtime < limite and not _vivo(int(archivo.stem))
+            ):
+                archivo.unlink()
+                continue
+            datos = json.loads(archivo.read_text())
+        except (OSError, ValueError):
+            continue
+        for nombre, lista in datos.items():
+            combinadas.setdefault(nombre, []).extend(lista)
+    return combinadas
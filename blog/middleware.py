@@ -0,0 +1,342 @@
+import random
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.signals import setting_changed
+from django.db import connections
+from django.dispatch import receiver
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from . import compresion, replicas
+from .metricas import AgregadorMetricas
+
+_agregador = None
+
+
+def obtener_agregador():
+    global _agregador
+    if _agregador is None:
+        config = settings.BLOG_INSTRUMENTACION
+        _agregador = AgregadorMetricas(
+            config['DIRECTORIO'],
+            muestras_por_vista=config['MUESTRAS_POR_VISTA'],
+            volcar_cada=config['VOLCAR_CADA'],
+        )
+    return _agregador
+
+
+@receiver(setting_changed)
+def reiniciar_agregador(setting, **kwargs):
+    global _agregador
+    if setting == 'BLOG_INSTRUMENTACION' and _agregador is not None:
+        _agregador.cerrar()
+        _agregador = None
+
+
+class MiddlewareMixto:
+    '''
+    Base de los middlewares del blog, que sirven en cadenas síncronas y asíncronas.
+
+    Bajo ASGI Django solo arma la cadena asíncrona si todos los middlewares la aceptan;
+    con uno solo síncrono, cada petición pasa por async_to_sync en un hilo y las vistas
+    asíncronas pierden lo que ganaban. Las subclases implementan __call__ (síncrono) y
+    __acall__; aquí se elige uno según get_response.
+    '''
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.asincrono = iscoroutinefunction(get_response)
+        if self.asincrono:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.asincrono:
+            return self.__acall__(request)
+        return self.sincrono(request)
+
+    def sincrono(self, request):
+        raise NotImplementedError
+
+    async def __acall__(self, request):
+        raise NotImplementedError
+
+
+class MiddlewareEstaticos(MiddlewareMixto, WhiteNoiseMiddleware):
+    '''
+    WhiteNoiseMiddleware que también acepta la cadena asíncrona (el de WhiteNoise 6 solo
+    es síncrono). Buscar el archivo es una consulta a un diccionario; abrirlo y leerlo
+    van a un hilo, y el cuerpo se entrega con un iterador asíncrono para que Django no
+    tenga que cargarlo entero en memoria.
+    '''
+
+    def __init__(self, get_response):
+        WhiteNoiseMiddleware.__init__(self, get_response)
+        MiddlewareMixto.__init__(self, get_response)
+
+    def sincrono(self, request):
+        return WhiteNoiseMiddleware.__call__(self, request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            # Con autorefresh se mira el disco: solo vale el salto a un hilo bajo sus prefijos.
+            ruta = request.path_info
+            estatica = any(ruta.startswith(prefijo) for _, prefijo in self.directories)
+            archivo = await sync_to_async(self.find_file)(ruta) if estatica else None
+        else:
+            archivo = self.files.get(request.path_info)
+        if archivo is None:
+            return await self.get_response(request)
+        respuesta = await sync_to_async(self.serve)(archivo, request)
+        if respuesta.file_to_stream is not None:
+            respuesta.streaming_content = _leer_trozos(respuesta.file_to_stream, respuesta.block_size)
+        return respuesta
+
+
+async def _leer_trozos(archivo, tamano):
+    # FileResponse cierra el archivo al terminar la respuesta.
+    while trozo := await sync_to_async(archivo.read)(tamano):
+        yield trozo
+
+
+class Medicion:
+    '''
+    Tiempos de una petición: consultas SQL, tiempo en la base de datos y en la plantilla.
+    '''
+
+    def __init__(self):
+        self.consultas = 0
+        self.db = 0.0
+        self.plantilla = 0.0
+        self._inicio_plantilla = None
+
+    def envoltorio_sql(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += time.perf_counter() - inicio
+            self.consultas += 1
+
+    def empezar_plantilla(self):
+        self._inicio_plantilla = time.perf_counter()
+
+    def terminar_plantilla(self, respuesta):
+        if self._inicio_plantilla is not None:
+            self.plantilla += time.perf_counter() - self._inicio_plantilla
+            self._inicio_plantilla = None
+
+
+class MiddlewareInstrumentacion(MiddlewareMixto):
+    '''
+    Mide consultas, tiempo de base de datos, de plantilla y total de una muestra de
+    las peticiones. Los envía en la cabecera Server-Timing y los acumula por nombre
+    de URL para calcular p50/p95/p99 (ver el comando reporte_rendimiento).
+
+    Se activa con BLOG_INSTRUMENTACION['ACTIVA']; MUESTREO es la fracción de
+    peticiones medidas, de modo que el resto no paga ningún costo extra.
+    '''
+
+    def __init__(self, get_response):
+        config = settings.BLOG_INSTRUMENTACION
+        if not config['ACTIVA']:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        self.muestreo = config['MUESTREO']
+
+    def sincrono(self, request):
+        if random.random() >= self.muestreo:
+            return self.get_response(request)
+        medicion = request._medicion = Medicion()
+        inicio = time.perf_counter()
+        with self._medir_sql(medicion):
+            respuesta = self.get_response(request)
+        return self._registrar(request, respuesta, medicion, time.perf_counter() - inicio)
+
+    async def __acall__(self, request):
+        if random.random() >= self.muestreo:
+            return await self.get_response(request)
+        medicion = request._medicion = Medicion()
+        inicio = time.perf_counter()
+        # Las consultas corren en el hilo de sync_to_async, pero con las mismas conexiones
+        # del contexto de la petición: los envoltorios también las ven.
+        with self._medir_sql(medicion):
+            respuesta = await self.get_response(request)
+        return self._registrar(request, respuesta, medicion, time.perf_counter() - inicio)
+
+    def _medir_sql(self, medicion):
+        pila = ExitStack()
+        for conexion in connections.all():
+            pila.enter_context(conexion.execute_wrapper(medicion.envoltorio_sql))
+        return pila
+
+    def _registrar(self, request, respuesta, medicion, total):
+        respuesta['Server-Timing'] = (
+            f'db;dur={medicion.db * 1000:.2f};desc="{medicion.consultas} consultas", '
+            f'tpl;dur={medicion.plantilla * 1000:.2f}, '
+            f'total;dur={total * 1000:.2f}'
+        )
+        coincidencia = getattr(request, 'resolver_match', None)
+        nombre = coincidencia.view_name if coincidencia else 'sin_ruta'
+        obtener_agregador().registrar(nombre, {
+            'consultas': medicion.consultas,
+            'db': medicion.db * 1000,
+            'plantilla': medicion.plantilla * 1000,
+            'total': total * 1000,
+        })
+        return respuesta
+
+    def process_template_response(self, request, response):
+        # El render ocurre justo después de esta llamada; el callback marca el final.
+        medicion = getattr(request, '_medicion', None)
+        if medicion is not None:
+            medicion.empezar_plantilla()
+            response.add_post_render_callback(medicion.terminar_plantilla)
+        return response
+
+
+class MiddlewareReplicas(MiddlewareMixto):
+    '''
+    Deja que las vistas públicas del blog lean de las réplicas de BLOG_REPLICAS.
+
+    Si durante la petición se escribe un artículo o una categoría, responde con la
+    cookie blog_primaria; mientras dure, ese navegador lee de la primaria y ve sus
+    propios cambios aunque las réplicas vayan atrasadas.
+    '''
+
+    def __init__(self, get_response):
+        if not settings.BLOG_REPLICAS:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def sincrono(self, request):
+        tokens = replicas.iniciar_peticion()
+        try:
+            respuesta = self.get_response(request)
+            escribio = replicas.hubo_escritura()
+        finally:
+            replicas.restaurar(tokens)
+        return self._pegar(respuesta, escribio)
+
+    async def __acall__(self, request):
+        # sync_to_async devuelve al contexto de la petición las variables que cambian en
+        # su hilo, así que las escrituras de la vista también se ven aquí.
+        tokens = replicas.iniciar_peticion()
+        try:
+            respuesta = await self.get_response(request)
+            escribio = replicas.hubo_escritura()
+        finally:
+            replicas.restaurar(tokens)
+        return self._pegar(respuesta, escribio)
+
+    def _pegar(self, respuesta, escribio):
+        if escribio:
+            respuesta.set_cookie(
+                replicas.COOKIE, '1', max_age=settings.BLOG_REPLICAS_PEGADO_SEGUNDOS,
+                httponly=True, samesite='Lax',
+            )
+        return respuesta
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.resolver_match.namespace == 'blog' and replicas.COOKIE not in request.COOKIES:
+            replicas.permitir_replicas()
+
+
+class MiddlewareEntrega(MiddlewareMixto):
+    '''
+    Prepara las respuestas para el viaje: aplica la política Cache-Control de la vista
+    (BLOG_CACHE_CONTROL, por nombre de URL) y comprime con Brotli o gzip los cuerpos de
+    texto según Accept-Encoding, salvo los de menos de BLOG_COMPRESION['MINIMO_BYTES'].
+
+    Solo se comprimen las vistas con política, que son públicas: sus páginas no llevan
+    secretos (token CSRF, datos de la sesión) que un atacante pueda ir adivinando por el
+    tamaño comprimido (BREACH). El admin y el resto salen sin comprimir. En esas vistas
+    Vary: Accept-Encoding va también en los 304 y en los cuerpos pequeños, para que una
+    caché intermedia no confunda la variante comprimida con la que no lo está.
+
+    Al comprimir, el ETag pasa a ser débil: el cuerpo ya no es idéntico byte a byte,
+    pero If-None-Match se compara en forma débil y los 304 siguen funcionando.
+    '''
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        config = settings.BLOG_COMPRESION
+        self.minimo = config['MINIMO_BYTES']
+        self.tipos = frozenset(config['TIPOS'])
+        self.niveles = {'br': config['NIVEL_BROTLI'], 'gzip': config['NIVEL_GZIP']}
+        self.politicas = settings.BLOG_CACHE_CONTROL
+
+    def sincrono(self, request):
+        respuesta = self.get_response(request)
+        self.aplicar_politica(request, respuesta)
+        return self.comprimir(request, respuesta)
+
+    async def __acall__(self, request):
+        respuesta = await self.get_response(request)
+        self.aplicar_politica(request, respuesta)
+        return self.comprimir(request, respuesta)
+
+    def politica(self, request):
+        coincidencia = getattr(request, 'resolver_match', None)
+        return self.politicas.get(coincidencia.view_name) if coincidencia else None
+
+    def aplicar_politica(self, request, respuesta):
+        politica = self.politica(request)
+        # Una respuesta con cookies no puede guardarse en una caché compartida.
+        if (
+            politica is None
+            or request.method not in ('GET', 'HEAD')
+            or respuesta.status_code not in (200, 304)
+            or respuesta.has_header('Cache-Control')
+            or respuesta.cookies
+        ):
+            return
+        patch_cache_control(respuesta, **politica)
+
+    def comprimir(self, request, respuesta):
+        if self.politica(request) is None:
+            return respuesta
+        tipo = respuesta.get('Content-Type', '').partition(';')[0].strip()
+        # El 304 no trae Content-Type, pero sustituye a una respuesta que sí se comprime.
+        if respuesta.status_code == 304 or tipo in self.tipos:
+            patch_vary_headers(respuesta, ('Accept-Encoding',))
+        if (
+            tipo not in self.tipos
+            or respuesta.has_header('Content-Encoding')
+            or (not respuesta.streaming and len(respuesta.content) < self.minimo)
+        ):
+            return respuesta
+
+        codificacion = compresion.negociar(request.headers.get('Accept-Encoding', ''))
+        if codificacion is None:
+            return respuesta
+        nivel = self.niveles[codificacion]
+
+        if respuesta.streaming:
+            if respuesta.is_async:
+                respuesta.streaming_content = compresion.acomprimir_trozos(
+                    respuesta.streaming_content, codificacion, nivel,
+                )
+            else:
+                respuesta.streaming_content = compresion.comprimir_trozos(
+                    respuesta.streaming_content, codificacion, nivel,
+                )
+            del respuesta.headers['Content-Length']
+        else:
+            comprimido = compresion.comprimir(respuesta.content, codificacion, nivel)
+            if len(comprimido) >= len(respuesta.content):
+                return respuesta
+            respuesta.content = comprimido
+            respuesta.headers['Content-Length'] = str(len(comprimido))
+
+        etag = respuesta.get('ETag')
+        if etag and etag.startswith('"'):
+            respuesta.headers['ETag'] = 'W/' + etag
+        respuesta.headers['Content-Encoding'] = codificacion
+        return respuesta
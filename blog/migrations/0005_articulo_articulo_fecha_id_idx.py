@@ -0,0 +1,17 @@
+# Generated by Django 5.1 on 2026-10-17 15:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_alter_articulo_categorias'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='articulo',
+            index=models.Index(fields=['-fecha_creacion', '-id'], name='articulo_fecha_id_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+from django.db import migrations
+
+TABLA_FTS = 'blog_articulo_fts'
+INDICE_GIN = 'articulo_busqueda_gin'
+VECTOR_POSTGRES = (
+    "setweight(to_tsvector('spanish', coalesce(titulo, '')), 'A') || "
+    "setweight(to_tsvector('spanish', coalesce(contenido, '')), 'B')"
+)
+
+
+def crear_indice(apps, schema_editor):
+    conexion = schema_editor.connection
+    if conexion.vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {INDICE_GIN} ON blog_articulo USING GIN (({VECTOR_POSTGRES}))'
+        )
+    elif conexion.vendor == 'sqlite':
+        with conexion.cursor() as cursor:
+            cursor.execute('PRAGMA compile_options')
+            if 'ENABLE_FTS5' not in {fila[0] for fila in cursor.fetchall()}:
+                return
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {TABLA_FTS} USING fts5('
+            "titulo, contenido, categorias, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            f'INSERT INTO {TABLA_FTS} (rowid, titulo, contenido, categorias) '
+            'SELECT a.id, a.titulo, a.contenido, coalesce(('
+            '  SELECT group_concat(c.nombre, \' \') FROM blog_articulo_categorias ac '
+            '  JOIN blog_categoria c ON c.id = ac.categoria_id WHERE ac.articulo_id = a.id'
+            "), '') FROM blog_articulo a"
+        )
+
+
+def eliminar_indice(apps, schema_editor):
+    conexion = schema_editor.connection
+    if conexion.vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {INDICE_GIN}')
+    elif conexion.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {TABLA_FTS}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_articulo_articulo_fecha_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indice, eliminar_indice),
+    ]
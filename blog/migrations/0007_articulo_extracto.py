@@ -0,0 +1,41 @@
+# Generated by Django 5.1 on 2026-10-17 15:55
+
+from django.db import migrations, models
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+
+def generar_extracto(contenido):
+    # Copia congelada del blog.texto de entonces: la migración no depende del código actual.
+    return Truncator(strip_tags(contenido or '')).words(25, truncate=' …')
+
+
+def rellenar_extractos(apps, schema_editor):
+    Articulo = apps.get_model('blog', 'Articulo')
+    ultimo_id = 0
+    while True:
+        lote = list(
+            Articulo.objects.filter(id__gt=ultimo_id).order_by('id').only('id', 'contenido')[:500]
+        )
+        if not lote:
+            return
+        for articulo in lote:
+            articulo.extracto = generar_extracto(articulo.contenido)
+        Articulo.objects.bulk_update(lote, ['extracto'])
+        ultimo_id = lote[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_indice_busqueda'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='articulo',
+            name='extracto',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(rellenar_extractos, migrations.RunPython.noop),
+    ]
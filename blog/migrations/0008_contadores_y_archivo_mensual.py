@@ -0,0 +1,62 @@
+# Generated by Django 5.1 on 2026-10-17 17:18
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def calcular_contadores(apps, schema_editor):
+    Articulo = apps.get_model('blog', 'Articulo')
+    Categoria = apps.get_model('blog', 'Categoria')
+    ArchivoMensual = apps.get_model('blog', 'ArchivoMensual')
+    Relacion = Articulo.categorias.through
+
+    por_categoria = Relacion.objects.values('categoria_id').order_by().annotate(
+        total=Count('id'), ultima=Max('articulo__fecha_actualizacion'),
+    )
+    for fila in por_categoria:
+        Categoria.objects.filter(pk=fila['categoria_id']).update(
+            num_articulos=fila['total'], ultima_modificacion=fila['ultima'],
+        )
+
+    meses = (
+        Articulo.objects.annotate(anio=ExtractYear('fecha_creacion'), mes=ExtractMonth('fecha_creacion'))
+        .values('anio', 'mes').order_by()
+        .annotate(num_articulos=Count('id'), ultima_modificacion=Max('fecha_actualizacion'))
+    )
+    ArchivoMensual.objects.bulk_create([ArchivoMensual(**fila) for fila in meses])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_articulo_extracto'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='categoria',
+            name='num_articulos',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='categoria',
+            name='ultima_modificacion',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.CreateModel(
+            name='ArchivoMensual',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('anio', models.PositiveSmallIntegerField()),
+                ('mes', models.PositiveSmallIntegerField()),
+                ('num_articulos', models.IntegerField(default=0)),
+                ('ultima_modificacion', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-anio', '-mes'],
+                'constraints': [models.UniqueConstraint(fields=('anio', 'mes'), name='archivo_anio_mes_unico')],
+            },
+        ),
+        migrations.RunPython(calcular_contadores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.1 on 2026-10-17 17:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_contadores_y_archivo_mensual'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FrecuenciaTermino',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('termino', models.CharField(max_length=64, unique=True)),
+                ('documentos', models.IntegerField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArticuloRelacionado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('puntuacion', models.FloatField()),
+                ('posicion', models.PositiveSmallIntegerField()),
+                ('articulo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='relaciones', to='blog.articulo')),
+                ('relacionado', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='relaciones_entrantes', to='blog.articulo')),
+            ],
+            options={
+                'ordering': ['articulo', 'posicion'],
+                'constraints': [models.UniqueConstraint(fields=('articulo', 'posicion'), name='relacionado_posicion_unica')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TerminoArticulo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('termino', models.CharField(max_length=64)),
+                ('peso', models.FloatField()),
+                ('articulo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='terminos', to='blog.articulo')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['termino', '-peso'], name='termino_peso_idx')],
+                'constraints': [models.UniqueConstraint(fields=('articulo', 'termino'), name='termino_articulo_unico')],
+            },
+        ),
+    ]
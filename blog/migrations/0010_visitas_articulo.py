@@ -0,0 +1,24 @@
+# Generated by Django 5.1 on 2026-10-17 17:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_relacionados'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VisitasArticulo',
+            fields=[
+                ('articulo', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='visitas', serialize=False, to='blog.articulo')),
+                ('total', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-total'], name='visitas_total_idx')],
+            },
+        ),
+    ]
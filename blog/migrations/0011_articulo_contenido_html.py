@@ -0,0 +1,59 @@
+# Generated by Django 5.1 on 2026-10-17 18:10
+
+import hashlib
+
+from django.db import migrations, models
+from django.utils.html import escape
+from django.utils.text import normalize_newlines
+
+# Copia congelada de RenderizadorTexto: los artículos que ya existen se escribieron como
+# texto plano y se siguen mostrando como con linebreaksbr. No se importa blog.renderizado,
+# que puede cambiar (y elegir Markdown) después de escribir esta migración.
+VERSION_TEXTO = 'texto-1'
+
+
+def renderizar_texto(texto):
+    return escape(normalize_newlines(texto or '')).replace('\n', '<br>')
+
+
+def renderizar_contenido(apps, schema_editor):
+    Articulo = apps.get_model('blog', 'Articulo')
+    ultimo_id = 0
+    while True:
+        lote = list(
+            Articulo.objects.filter(id__gt=ultimo_id).order_by('id').only('id', 'contenido')[:500]
+        )
+        if not lote:
+            return
+        for articulo in lote:
+            articulo.contenido_html = renderizar_texto(articulo.contenido)
+            articulo.contenido_hash = hashlib.sha256((articulo.contenido or '').encode()).hexdigest()
+            articulo.contenido_renderizador = VERSION_TEXTO
+        Articulo.objects.bulk_update(lote, ['contenido_html', 'contenido_hash', 'contenido_renderizador'])
+        ultimo_id = lote[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_visitas_articulo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='articulo',
+            name='contenido_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='articulo',
+            name='contenido_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='articulo',
+            name='contenido_renderizador',
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+        migrations.RunPython(renderizar_contenido, migrations.RunPython.noop),
+    ]
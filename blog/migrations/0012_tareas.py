@@ -0,0 +1,32 @@
+# Generated by Django 5.1 on 2026-10-17 17:49
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_articulo_contenido_html'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tarea',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(max_length=40)),
+                ('objeto_id', models.BigIntegerField()),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('en_curso', 'En curso'), ('fallida', 'Fallida')], default='pendiente', max_length=20)),
+                ('intentos', models.PositiveSmallIntegerField(default=0)),
+                ('disponible_desde', models.DateTimeField(default=django.utils.timezone.now)),
+                ('tomada_hasta', models.DateTimeField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('creada', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['estado', 'disponible_desde'], name='tarea_estado_disponible_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('estado', 'pendiente')), fields=('tipo', 'objeto_id'), name='tarea_pendiente_unica')],
+            },
+        ),
+    ]
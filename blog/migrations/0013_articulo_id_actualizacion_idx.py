@@ -0,0 +1,17 @@
+# Generated by Django 5.1 on 2026-10-17 18:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_tareas'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='articulo',
+            index=models.Index(fields=['id', 'fecha_actualizacion'], name='articulo_id_actualizacion_idx'),
+        ),
+    ]
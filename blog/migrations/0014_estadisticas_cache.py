@@ -0,0 +1,25 @@
+# Generated by Django 5.1 on 2026-10-17 18:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_articulo_id_actualizacion_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstadisticaCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=40)),
+                ('evento', models.CharField(max_length=20)),
+                ('total', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('nombre', 'evento'), name='estadistica_cache_unica')],
+            },
+        ),
+    ]
@@ -1,6 +1,14 @@
-from django.db import models
-from django.utils.text import slugify
+from datetime import date
+
+from django.db import models, router
 from django.urls import reverse
+from django.utils import timezone
+
+from .renderizado import CAMPOS as CAMPOS_HTML, actualizar_html
+from .rutas import ruta_slug
+from .slugs import asignar_slug
+from .sqlite import escritura
+from .texto import generar_extracto
 
 
 class Articulo(models.Model):
@@ -10,6 +18,20 @@ class Articulo(models.Model):
     fecha_actualizacion = models.DateTimeField(auto_now=True)
     categorias = models.ManyToManyField('Categoria', related_name='articulos', blank=True)
     slug = models.SlugField(max_length=100,unique=True,db_index=True,blank=True)
+    # se calcula en save() para no recortar el contenido en cada render de la lista
+    extracto = models.TextField(blank=True, editable=False)
+    # HTML ya saneado del contenido; se regenera solo si cambian la huella o el renderizador
+    contenido_html = models.TextField(blank=True, editable=False)
+    contenido_hash = models.CharField(max_length=64, blank=True, editable=False)
+    contenido_renderizador = models.CharField(max_length=100, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # soporta el orden (-fecha_creacion, -id) de la paginación por cursor
+            models.Index(fields=['-fecha_creacion', '-id'], name='articulo_fecha_id_idx'),
+            # versión de cada shard del sitemap: total y última edición de un rango de ids
+            models.Index(fields=['id', 'fecha_actualizacion'], name='articulo_id_actualizacion_idx'),
+        ]
 
     def __str__(self):
         return self.titulo
@@ -17,23 +39,38 @@ class Articulo(models.Model):
     def save(self, *args, **kwargs): 
         '''
         Sobrescribe el método save original.
-        Crea un slug automaticamente si no existe uno al guardar el articulo.
+        Crea un slug automaticamente si no existe uno al guardar el articulo
+        (con sufijo -2, -3... si ya está usado) y recalcula el HTML a partir del
+        contenido y el extracto a partir del HTML.
         '''
-        if not self.slug: 
-            self.slug = slugify(self.titulo)
-        super().save(*args, **kwargs) 
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'contenido' in update_fields:
+            actualizar_html(self)
+            self.extracto = generar_extracto(self.contenido_html)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'extracto', *CAMPOS_HTML}
+        # la reserva del slug y el INSERT van en la misma transacción
+        with escritura(kwargs.get('using') or router.db_for_write(Articulo, instance=self)):
+            if not self.slug: 
+                self.slug = asignar_slug(Articulo, self.titulo)
+            super().save(*args, **kwargs) 
 
     def get_absolute_url(self):
         '''
         Devuelve la URL absoluta para una instancia de Articulo.
         '''
         
-        return reverse('blog:detalle_articulo', kwargs={'slug': self.slug})
+        return ruta_slug('blog:detalle_articulo', self.slug)
     
 class Categoria(models.Model):
     
     nombre = models.CharField(max_length=50, unique=True)
     slug = models.SlugField(max_length=60, unique=True, blank=True)
+    # contadores desnormalizados: solo los cambian las señales (ver blog/contadores.py)
+    num_articulos = models.IntegerField(default=0, editable=False)
+    ultima_modificacion = models.DateTimeField(null=True, blank=True, editable=False)
+
+    CONTADORES = ('num_articulos', 'ultima_modificacion')
 
     def __str__(self):
         return self.nombre
@@ -41,15 +78,153 @@ class Categoria(models.Model):
     def save(self, *args, **kwargs): 
         '''
         Crea un slug automaticamente si no existe uno al guardar el articulo.
+        Al actualizar no escribe los contadores, que en memoria pueden estar atrasados.
         '''
-        if not self.slug: 
-            self.slug = slugify(self.nombre)
-        super().save(*args, **kwargs)
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                campo.name for campo in self._meta.concrete_fields
+                if not campo.primary_key and campo.name not in self.CONTADORES
+            ]
+        with escritura(kwargs.get('using') or router.db_for_write(Categoria, instance=self)):
+            if not self.slug: 
+                self.slug = asignar_slug(Categoria, self.nombre)
+            super().save(*args, **kwargs)
     
-# esto es para despues
     def get_absolute_url(self):
         '''
         Devuelve la URL absoluta para una instancia de Categoria.
         '''
         
-        return reverse('blog:categoria', kwargs={'slug': self.slug})
+        return ruta_slug('blog:categoria', self.slug)
+
+
+class ArchivoMensual(models.Model):
+    '''
+    Número de artículos creados en cada mes. Lo mantienen las señales y lo corrige
+    el comando reconciliar_contadores.
+    '''
+    anio = models.PositiveSmallIntegerField()
+    mes = models.PositiveSmallIntegerField()
+    num_articulos = models.IntegerField(default=0)
+    ultima_modificacion = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-anio', '-mes']
+        constraints = [
+            models.UniqueConstraint(fields=['anio', 'mes'], name='archivo_anio_mes_unico'),
+        ]
+
+    def __str__(self):
+        return f'{self.anio}-{self.mes:02d}'
+
+    @property
+    def fecha(self):
+        return date(self.anio, self.mes, 1)
+
+    def get_absolute_url(self):
+        return reverse('blog:archivo_mes', kwargs={'anio': self.anio, 'mes': self.mes})
+
+
+class TerminoArticulo(models.Model):
+    '''
+    Vector TF-IDF podado de un artículo: sus términos de mayor peso, normalizados.
+    Es el índice invertido con el que blog/relacionados.py busca candidatos.
+    '''
+    articulo = models.ForeignKey(Articulo, on_delete=models.CASCADE, related_name='terminos')
+    termino = models.CharField(max_length=64)
+    peso = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['articulo', 'termino'], name='termino_articulo_unico'),
+        ]
+        indexes = [
+            models.Index(fields=['termino', '-peso'], name='termino_peso_idx'),
+        ]
+
+
+class FrecuenciaTermino(models.Model):
+    '''
+    En cuántos artículos aparece cada término (para el IDF). La escribe el comando
+    calcular_relacionados; entre dos ejecuciones las actualizaciones la usan tal cual.
+    '''
+    termino = models.CharField(max_length=64, unique=True)
+    documentos = models.IntegerField()
+
+
+class ArticuloRelacionado(models.Model):
+    '''
+    Los K artículos más parecidos a cada artículo, en orden de posición.
+    '''
+    articulo = models.ForeignKey(Articulo, on_delete=models.CASCADE, related_name='relaciones')
+    relacionado = models.ForeignKey(Articulo, on_delete=models.CASCADE, related_name='relaciones_entrantes')
+    puntuacion = models.FloatField()
+    posicion = models.PositiveSmallIntegerField()
+
+    class Meta:
+        ordering = ['articulo', 'posicion']
+        constraints = [
+            models.UniqueConstraint(fields=['articulo', 'posicion'], name='relacionado_posicion_unica'),
+        ]
+
+
+class VisitasArticulo(models.Model):
+    '''
+    Visitas acumuladas de cada artículo. Solo la escribe blog/visitas.py, por lotes.
+    '''
+    articulo = models.OneToOneField(Articulo, on_delete=models.CASCADE, primary_key=True, related_name='visitas')
+    total = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # lista de los más leídos
+            models.Index(fields=['-total'], name='visitas_total_idx'),
+        ]
+
+
+class EstadisticaCache(models.Model):
+    '''
+    Aciertos y fallos acumulados de cada caché del blog. Los workers los suman en
+    memoria y los escriben por lotes (ver EstadisticasCache en blog/cache.py).
+    '''
+    nombre = models.CharField(max_length=40)
+    evento = models.CharField(max_length=20)
+    total = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['nombre', 'evento'], name='estadistica_cache_unica'),
+        ]
+
+
+class Tarea(models.Model):
+    '''
+    Trabajo pendiente sobre un artículo que ejecuta el comando procesar_tareas (ver
+    blog/tareas.py). Solo puede haber una pendiente de cada tipo por artículo.
+    '''
+    PENDIENTE, EN_CURSO, FALLIDA = 'pendiente', 'en_curso', 'fallida'
+    ESTADOS = [(PENDIENTE, 'Pendiente'), (EN_CURSO, 'En curso'), (FALLIDA, 'Fallida')]
+
+    tipo = models.CharField(max_length=40)
+    # id del artículo, sin clave foránea: la tarea se procesa aunque ya no exista
+    objeto_id = models.BigIntegerField()
+    estado = models.CharField(max_length=20, choices=ESTADOS, default=PENDIENTE)
+    intentos = models.PositiveSmallIntegerField(default=0)
+    disponible_desde = models.DateTimeField(default=timezone.now)
+    # si el proceso que la tomó muere, otro la retoma al pasar esta fecha
+    tomada_hasta = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    creada = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['tipo', 'objeto_id'], condition=models.Q(estado='pendiente'), name='tarea_pendiente_unica',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['estado', 'disponible_desde'], name='tarea_estado_disponible_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.tipo} {self.objeto_id} ({self.estado})'
@@ -0,0 +1,155 @@
+import base64
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+
+class CursorInvalido(Exception):
+    '''
+    Se lanza cuando el token de paginación no se puede decodificar.
+    '''
+
+
+def codificar_cursor(direccion, valores):
+    '''
+    Convierte la dirección y los valores de orden en un token opaco para la URL.
+    '''
+    datos = json.dumps([direccion, valores], separators=(',', ':'), default=str)
+    return base64.urlsafe_b64encode(datos.encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(token):
+    '''
+    Operación inversa de codificar_cursor. Lanza CursorInvalido si el token no es válido.
+    '''
+    try:
+        relleno = '=' * (-len(token) % 4)
+        direccion, valores = json.loads(base64.urlsafe_b64decode(token + relleno))
+    except (ValueError, TypeError):
+        raise CursorInvalido(token)
+    if direccion not in ('sig', 'ant') or not isinstance(valores, list):
+        raise CursorInvalido(token)
+    return direccion, valores
+
+
+class PaginaCursor:
+    '''
+    Página de resultados con los tokens para ir a la página siguiente y a la anterior.
+    Expone la misma interfaz básica que django.core.paginator.Page para las plantillas.
+    '''
+
+    def __init__(self, object_list, cursor_siguiente=None, cursor_anterior=None):
+        self.object_list = object_list
+        self.cursor_siguiente = cursor_siguiente
+        self.cursor_anterior = cursor_anterior
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.cursor_siguiente is not None
+
+    def has_previous(self):
+        return self.cursor_anterior is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class PaginadorCursor:
+    '''
+    Paginación por keyset: en vez de OFFSET filtra por los valores de orden del
+    último elemento visto, así el costo de una página no depende de su profundidad.
+
+    El orden debe terminar en un campo único (por ejemplo 'id') para que el cursor
+    identifique una posición exacta.
+    '''
+
+    def __init__(self, queryset, orden, por_pagina):
+        self.queryset = queryset
+        self.orden = list(orden)
+        self.por_pagina = por_pagina
+        self.campos = [campo.lstrip('-') for campo in self.orden]
+
+    def pagina(self, token=None):
+        consulta, direccion, primera = self._consulta(token)
+        return self._construir(list(consulta), direccion, primera)
+
+    async def apagina(self, token=None):
+        '''
+        Igual que pagina() pero evaluando la consulta con el ORM asíncrono.
+        '''
+        consulta, direccion, primera = self._consulta(token)
+        return self._construir([obj async for obj in consulta], direccion, primera)
+
+    def _consulta(self, token):
+        '''
+        Devuelve el queryset ya filtrado, ordenado y recortado a por_pagina + 1 filas
+        (la fila extra indica si hay más), junto con la dirección del recorrido.
+        '''
+        if not token:
+            return self.queryset.order_by(*self.orden)[:self.por_pagina + 1], 'sig', True
+
+        direccion, valores = decodificar_cursor(token)
+        if len(valores) != len(self.campos):
+            raise CursorInvalido(token)
+        valores = [self._a_python(campo, valor) for campo, valor in zip(self.campos, valores)]
+
+        if direccion == 'sig':
+            queryset = self.queryset.filter(self._filtro(valores, invertir=False))
+            return queryset.order_by(*self.orden)[:self.por_pagina + 1], direccion, False
+        orden_inverso = [campo[1:] if campo.startswith('-') else '-' + campo for campo in self.orden]
+        queryset = self.queryset.filter(self._filtro(valores, invertir=True))
+        return queryset.order_by(*orden_inverso)[:self.por_pagina + 1], direccion, False
+
+    def _construir(self, filas, direccion, primera):
+        hay_mas = len(filas) > self.por_pagina
+        filas = filas[:self.por_pagina]
+        if direccion == 'sig':
+            return PaginaCursor(
+                filas,
+                cursor_siguiente=self._cursor('sig', filas[-1]) if hay_mas else None,
+                cursor_anterior=self._cursor('ant', filas[0]) if filas and not primera else None,
+            )
+        # Hacia atrás la consulta va en orden inverso: se da vuelta para mostrarla.
+        filas = filas[::-1]
+        return PaginaCursor(
+            filas,
+            cursor_siguiente=self._cursor('sig', filas[-1]) if filas else None,
+            cursor_anterior=self._cursor('ant', filas[0]) if hay_mas else None,
+        )
+
+    def _filtro(self, valores, invertir):
+        '''
+        Construye (a < x) OR (a = x AND b < y) OR ... respetando la dirección de cada campo.
+        '''
+        condiciones = []
+        for i, campo in enumerate(self.orden):
+            descendente = campo.startswith('-')
+            if invertir:
+                descendente = not descendente
+            operador = 'lt' if descendente else 'gt'
+            iguales = {nombre: valor for nombre, valor in zip(self.campos[:i], valores[:i])}
+            iguales[f'{self.campos[i]}__{operador}'] = valores[i]
+            condiciones.append(Q(**iguales))
+        return reduce(or_, condiciones)
+
+    def _cursor(self, direccion, obj):
+        valores = [getattr(obj, campo) for campo in self.campos]
+        return codificar_cursor(direccion, [v.isoformat() if hasattr(v, 'isoformat') else v for v in valores])
+
+    def _a_python(self, campo, valor):
+        try:
+            field = self.queryset.model._meta.get_field(campo)
+        except FieldDoesNotExist:
+            return valor
+        try:
+            return field.to_python(valor)
+        except (ValidationError, TypeError):
+            raise CursorInvalido(valor)
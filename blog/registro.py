@@ -0,0 +1,116 @@
+import hashlib
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Categoria
+
+
+class RegistroCategorias:
+    '''
+    Copia en memoria del proceso de todas las categorías, indexadas por slug, con
+    su contador num_articulos.
+
+    Se carga una vez con una sola consulta y se recarga cuando cambia la marca
+    guardada en la caché compartida (las señales la renuevan). Si la caché no se
+    comparte entre workers (locmem), BLOG_CATEGORIAS_TTL acota cuánto puede quedar
+    desactualizado cada proceso.
+
+    version() es una huella de las categorías cargadas, no la marca: dos workers con
+    las mismas categorías dan el mismo ETag y uno que recarga tras el TTL lo cambia.
+    '''
+
+    clave_marca = 'blog:categorias:marca'
+    # Lo que muestran las páginas; ultima_modificacion cambia con cada edición y no se ve.
+    campos_huella = ('id', 'nombre', 'slug', 'num_articulos')
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._marca = None
+        self._huella = None
+        self._cargado_en = 0.0
+        self._lista = []
+        self._por_slug = {}
+
+    def _marca_actual(self):
+        marca = cache.get(self.clave_marca)
+        if marca is None:
+            cache.add(self.clave_marca, uuid.uuid4().hex, timeout=None)
+            marca = cache.get(self.clave_marca)
+        return marca
+
+    async def _amarca_actual(self):
+        marca = await cache.aget(self.clave_marca)
+        if marca is None:
+            await cache.aadd(self.clave_marca, uuid.uuid4().hex, timeout=None)
+            marca = await cache.aget(self.clave_marca)
+        return marca
+
+    def version(self):
+        self._asegurar()
+        return self._huella
+
+    async def aversion(self):
+        await self._aasegurar()
+        return self._huella
+
+    def _vigente(self, marca):
+        return (
+            marca == self._marca
+            and time.monotonic() - self._cargado_en <= settings.BLOG_CATEGORIAS_TTL
+        )
+
+    def _consulta(self):
+        return Categoria.objects.order_by('id')
+
+    def _cargar(self, lista, marca):
+        filas = '\n'.join('|'.join(str(getattr(c, campo)) for campo in self.campos_huella) for c in lista)
+        with self._lock:
+            self._lista = lista
+            self._por_slug = {categoria.slug: categoria for categoria in lista}
+            self._huella = hashlib.sha1(filas.encode()).hexdigest()
+            self._marca = marca
+            self._cargado_en = time.monotonic()
+
+    def _asegurar(self):
+        marca = self._marca_actual()
+        if self._vigente(marca):
+            return
+        with self._lock:
+            if self._vigente(marca):
+                return
+            self._cargar(list(self._consulta()), marca)
+
+    async def _aasegurar(self):
+        marca = await self._amarca_actual()
+        if not self._vigente(marca):
+            self._cargar([categoria async for categoria in self._consulta()], marca)
+
+    def todas(self):
+        self._asegurar()
+        return self._lista
+
+    def por_slug(self, slug):
+        '''
+        Devuelve la categoría con ese slug o None si no existe.
+        '''
+        self._asegurar()
+        return self._por_slug.get(slug)
+
+    async def atodas(self):
+        await self._aasegurar()
+        return self._lista
+
+    async def apor_slug(self, slug):
+        await self._aasegurar()
+        return self._por_slug.get(slug)
+
+    def invalidar(self):
+        cache.set(self.clave_marca, uuid.uuid4().hex, timeout=None)
+        self._marca = None
+
+
+registro_categorias = RegistroCategorias()
@@ -0,0 +1,320 @@
+'''
+Artículos relacionados: combina el parecido del texto (coseno entre vectores TF-IDF de
+titulo + contenido) con el solapamiento de categorías (Jaccard) y guarda los K mejores
+de cada artículo en ArticuloRelacionado, para que el detalle los lea en una consulta.
+
+calcular() lo rehace todo por lotes repartidos en un pool de procesos (comando
+calcular_relacionados). Entre dos ejecuciones, las señales llaman a actualizar() o a
+relacionar() para el artículo que cambia, con las frecuencias de la última ejecución.
+'''
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.utils.html import strip_tags
+
+from . import cache
+from .models import Articulo, ArticuloRelacionado, FrecuenciaTermino, TerminoArticulo
+
+_PALABRA = re.compile(r'\w+')
+
+
+def tokens(titulo, contenido):
+    '''
+    Cuenta los términos del artículo, en minúsculas; el título cuenta doble.
+    '''
+    texto = f'{titulo} {titulo} {strip_tags(contenido or "")}'.lower()
+    return Counter(
+        palabra[:64] for palabra in _PALABRA.findall(texto)
+        if len(palabra) > 2 and not palabra.isdigit()
+    )
+
+
+def vector(conteos, frecuencias, total, terminos):
+    '''
+    Vector TF-IDF (tf sublineal) con solo los `terminos` de mayor peso, normalizado.
+    `frecuencias` es {termino: documentos}; un término que no está cuenta como raro.
+    '''
+    pesos = {
+        termino: (1 + math.log(n)) * math.log((1 + total) / (1 + frecuencias.get(termino, 1)))
+        for termino, n in conteos.items()
+    }
+    # Un término presente en todos los artículos pesa 0: no distingue a ninguno.
+    mejores = heapq.nlargest(terminos, ((t, p) for t, p in pesos.items() if p > 0), key=lambda par: par[1])
+    norma = math.sqrt(sum(peso * peso for _, peso in mejores)) or 1.0
+    return {termino: peso / norma for termino, peso in mejores}
+
+
+class Modelo:
+    '''
+    Lo necesario para puntuar: índice invertido {termino: [(articulo_id, peso)]},
+    categorías de cada artículo y artículos más recientes de cada categoría.
+    '''
+
+    def __init__(self, indice, categorias_de, por_categoria):
+        config = settings.BLOG_RELACIONADOS
+        self.k = config['K']
+        self.peso_categorias = config['PESO_CATEGORIAS']
+        self.indice = indice
+        self.categorias_de = categorias_de
+        self.por_categoria = por_categoria
+
+    def relacionados(self, articulo_id, vector_, categorias):
+        '''
+        Devuelve [(articulo_id, puntuacion)] con los K mejores, de mayor a menor.
+        '''
+        similitud = defaultdict(float)
+        for termino, peso in vector_.items():
+            for otro, peso_otro in self.indice.get(termino, ()):
+                similitud[otro] += peso * peso_otro
+        # Del texto solo compiten los más parecidos; de las categorías, los recientes.
+        candidatos = heapq.nlargest(self.k * 10, similitud, key=similitud.__getitem__)
+        comunes = defaultdict(int)
+        for categoria in categorias:
+            for otro in self.por_categoria.get(categoria, ()):
+                comunes[otro] += 1
+        for otro in candidatos:
+            if otro not in comunes:
+                comunes[otro] = len(categorias & self.categorias_de.get(otro, frozenset()))
+        comunes.pop(articulo_id, None)
+
+        puntuaciones = []
+        for otro, n in comunes.items():
+            union = len(categorias) + len(self.categorias_de.get(otro, ())) - n
+            jaccard = n / union if union else 0.0
+            puntuacion = (1 - self.peso_categorias) * similitud.get(otro, 0.0) + self.peso_categorias * jaccard
+            if puntuacion > 0:
+                puntuaciones.append((puntuacion, otro))
+        return [(otro, puntuacion) for puntuacion, otro in heapq.nlargest(self.k, puntuaciones)]
+
+
+def relacionados_de(articulo_id):
+    '''
+    Los artículos relacionados, en orden, con una sola consulta.
+    '''
+    return (
+        Articulo.objects.filter(relaciones_entrantes__articulo_id=articulo_id)
+        .order_by('relaciones_entrantes__posicion')
+        .only('titulo', 'slug', 'extracto')
+    )
+
+
+def huella(filas):
+    '''
+    Huella de una lista de relacionados [(id, fecha_actualizacion, renderizador), ...]
+    en su orden: cambia si cambia la lista y si se edita, se vuelve a renderizar o se
+    borra alguno de sus artículos.
+    '''
+    return ','.join(f'{id_}:{fecha.timestamp()}:{renderizador}' for id_, fecha, renderizador in filas)
+
+
+def guardar(listas):
+    '''
+    Escribe {articulo_id: [(relacionado_id, puntuacion)]} y devuelve cuántas listas
+    cambiaron; solo se reescriben esas y se invalida la caché de su página de detalle.
+    '''
+    anteriores = defaultdict(list)
+    for articulo_id, relacionado_id in (
+        ArticuloRelacionado.objects.filter(articulo_id__in=listas).values_list('articulo_id', 'relacionado_id')
+    ):
+        anteriores[articulo_id].append(relacionado_id)
+    cambiadas = [
+        articulo_id for articulo_id, lista in listas.items()
+        if [relacionado_id for relacionado_id, _ in lista] != anteriores[articulo_id]
+    ]
+    if not cambiadas:
+        return 0
+    with transaction.atomic():
+        ArticuloRelacionado.objects.filter(articulo_id__in=cambiadas).delete()
+        ArticuloRelacionado.objects.bulk_create([
+            ArticuloRelacionado(articulo_id=articulo_id, relacionado_id=relacionado_id, puntuacion=puntuacion, posicion=i)
+            for articulo_id in cambiadas
+            for i, (relacionado_id, puntuacion) in enumerate(listas[articulo_id])
+        ])
+    cache.invalidar_detalle(*Articulo.objects.filter(pk__in=cambiadas).values_list('slug', flat=True))
+    return len(cambiadas)
+
+
+# --- Cálculo completo ---
+
+# Modelo de cada proceso del pool, fijado al arrancarlo.
+_modelo = None
+
+
+def _iniciar_proceso(modelo):
+    global _modelo
+    _modelo = modelo
+
+
+def _tokenizar_lote(filas):
+    return [(id_, tokens(titulo, contenido)) for id_, titulo, contenido in filas]
+
+
+def _puntuar_lote(lote):
+    return {id_: _modelo.relacionados(id_, vector_, categorias) for id_, vector_, categorias in lote}
+
+
+def _lotes(iterable, tamano):
+    iterador = iter(iterable)
+    while lote := list(islice(iterador, tamano)):
+        yield lote
+
+
+def _mapear(funcion, lotes, procesos, modelo=None):
+    '''
+    Aplica la función a cada lote en un pool de `procesos` procesos, o aquí mismo si
+    es 1. Los procesos no usan la base de datos: reciben y devuelven datos.
+    '''
+    if procesos <= 1:
+        _iniciar_proceso(modelo)
+        yield from map(funcion, lotes)
+        return
+    with ProcessPoolExecutor(procesos, initializer=_iniciar_proceso, initargs=(modelo,)) as pool:
+        yield from pool.map(funcion, lotes)
+
+
+def calcular(procesos=1, lote=None):
+    '''
+    Recalcula vectores, frecuencias y relacionados de todos los artículos.
+    Devuelve (articulos, cambiados): los procesados y los que cambiaron de lista.
+    '''
+    config = settings.BLOG_RELACIONADOS
+    lote = lote or config['LOTE']
+
+    filas = Articulo.objects.order_by('id').values_list('id', 'titulo', 'contenido').iterator(chunk_size=lote)
+    conteos = {}
+    for resultado in _mapear(_tokenizar_lote, _lotes(filas, lote), procesos):
+        conteos.update(resultado)
+    total = len(conteos)
+    frecuencias = Counter(termino for conteo in conteos.values() for termino in conteo)
+    vectores = {id_: vector(conteo, frecuencias, total, config['TERMINOS']) for id_, conteo in conteos.items()}
+    del conteos
+
+    indice = defaultdict(list)
+    for id_, vector_ in vectores.items():
+        for termino, peso in vector_.items():
+            indice[termino].append((id_, peso))
+    for termino, lista in indice.items():
+        # Los términos muy comunes solo aportan sus artículos de mayor peso.
+        if len(lista) > config['CANDIDATOS_TERMINO']:
+            indice[termino] = heapq.nlargest(config['CANDIDATOS_TERMINO'], lista, key=lambda par: par[1])
+
+    categorias_de = defaultdict(set)
+    por_categoria = defaultdict(list)
+    relaciones = Articulo.categorias.through.objects.order_by('-articulo_id').values_list('articulo_id', 'categoria_id')
+    for articulo_id, categoria_id in relaciones.iterator(chunk_size=10000):
+        categorias_de[articulo_id].add(categoria_id)
+        if len(por_categoria[categoria_id]) < config['CANDIDATOS_CATEGORIA']:
+            por_categoria[categoria_id].append(articulo_id)
+    categorias_de = {id_: frozenset(categorias) for id_, categorias in categorias_de.items()}
+
+    with transaction.atomic():
+        FrecuenciaTermino.objects.all().delete()
+        FrecuenciaTermino.objects.bulk_create(
+            (FrecuenciaTermino(termino=termino, documentos=n) for termino, n in frecuencias.items()),
+            batch_size=5000,
+        )
+        TerminoArticulo.objects.all().delete()
+        TerminoArticulo.objects.bulk_create(
+            (
+                TerminoArticulo(articulo_id=id_, termino=termino, peso=peso)
+                for id_, vector_ in vectores.items() for termino, peso in vector_.items()
+            ),
+            batch_size=5000,
+        )
+
+    modelo = Modelo(dict(indice), categorias_de, dict(por_categoria))
+    trabajo = ((id_, vector_, categorias_de.get(id_, frozenset())) for id_, vector_ in vectores.items())
+    cambiados = 0
+    for listas in _mapear(_puntuar_lote, _lotes(trabajo, lote), procesos, modelo):
+        cambiados += guardar(listas)
+    return len(vectores), cambiados
+
+
+# --- Actualización incremental ---
+
+def actualizar(articulo):
+    '''
+    Rehace el vector de un artículo recién guardado y después su lista.
+    '''
+    conteos = tokens(articulo.titulo, articulo.contenido)
+    frecuencias = dict(FrecuenciaTermino.objects.filter(termino__in=list(conteos)).values_list('termino', 'documentos'))
+    vector_ = vector(conteos, frecuencias, Articulo.objects.count(), settings.BLOG_RELACIONADOS['TERMINOS'])
+    with transaction.atomic():
+        TerminoArticulo.objects.filter(articulo_id=articulo.pk).delete()
+        TerminoArticulo.objects.bulk_create([
+            TerminoArticulo(articulo_id=articulo.pk, termino=termino, peso=peso) for termino, peso in vector_.items()
+        ])
+    relacionar(articulo.pk, vector_)
+
+
+def relacionar(articulo_id, vector_=None):
+    '''
+    Recalcula la lista de un artículo leyendo solo sus candidatos, y lo añade a la
+    lista de cada relacionado en la que ahora entraría (la puntuación es simétrica).
+    '''
+    config = settings.BLOG_RELACIONADOS
+    Relacion = Articulo.categorias.through
+    if vector_ is None:
+        vector_ = dict(TerminoArticulo.objects.filter(articulo_id=articulo_id).values_list('termino', 'peso'))
+
+    indice = defaultdict(list)
+    if vector_:
+        # Como en calcular(): de cada término, solo los artículos de mayor peso.
+        filas = (
+            TerminoArticulo.objects.filter(termino__in=list(vector_)).exclude(articulo_id=articulo_id)
+            .annotate(fila=Window(RowNumber(), partition_by=F('termino'), order_by=F('peso').desc()))
+            .filter(fila__lte=config['CANDIDATOS_TERMINO'])
+            .values_list('termino', 'articulo_id', 'peso')
+        )
+        for termino, otro, peso in filas:
+            indice[termino].append((otro, peso))
+
+    categorias = frozenset(Relacion.objects.filter(articulo_id=articulo_id).values_list('categoria_id', flat=True))
+    por_categoria = defaultdict(list)
+    if categorias:
+        recientes = (
+            Relacion.objects.filter(categoria_id__in=categorias)
+            .annotate(fila=Window(RowNumber(), partition_by=F('categoria_id'), order_by=F('articulo_id').desc()))
+            .filter(fila__lte=config['CANDIDATOS_CATEGORIA'])
+            .values_list('categoria_id', 'articulo_id')
+        )
+        for categoria_id, otro in recientes:
+            por_categoria[categoria_id].append(otro)
+    candidatos = {otro for lista in indice.values() for otro, _ in lista}
+    candidatos.update(otro for lista in por_categoria.values() for otro in lista)
+    categorias_de = defaultdict(set)
+    for otro, categoria_id in Relacion.objects.filter(articulo_id__in=candidatos).values_list('articulo_id', 'categoria_id'):
+        categorias_de[otro].add(categoria_id)
+
+    modelo = Modelo(
+        indice, {otro: frozenset(categorias_otro) for otro, categorias_otro in categorias_de.items()}, por_categoria,
+    )
+    lista = modelo.relacionados(articulo_id, vector_, categorias)
+
+    listas = {articulo_id: lista}
+    actuales = defaultdict(list)
+    for otro, relacionado_id, puntuacion in (
+        ArticuloRelacionado.objects.filter(articulo_id__in=[otro for otro, _ in lista])
+        .values_list('articulo_id', 'relacionado_id', 'puntuacion')
+    ):
+        if relacionado_id != articulo_id:
+            actuales[otro].append((relacionado_id, puntuacion))
+    for otro, puntuacion in lista:
+        nueva = sorted([*actuales[otro], (articulo_id, puntuacion)], key=lambda par: par[1], reverse=True)
+        listas[otro] = nueva[:modelo.k]
+    guardar(listas)
+
+
+def olvidar(articulo):
+    '''
+    Antes de borrar un artículo: las páginas que lo enlazan como relacionado cambian.
+    '''
+    cache.invalidar_detalle(*Articulo.objects.filter(relaciones__relacionado=articulo).values_list('slug', flat=True))
@@ -0,0 +1,188 @@
+'''
+HTML del contenido de los artículos. Se genera en Articulo.save() y se guarda junto a
+la huella del contenido y la versión del renderizador, así el detalle no procesa
+Markdown en cada petición y un guardado que no toca el contenido no vuelve a
+renderizar. Si cambia la versión (otro renderizador, otra versión de markdown o de
+nh3), el comando renderizar_contenido regenera en bloque los artículos afectados.
+
+Los artículos escritos como texto plano, antes de Markdown, se siguen renderizando con
+RenderizadorTexto: como Markdown perderían los saltos de línea y cualquier * o # se
+tomaría como marcado. renderizar_contenido --convertir los pasa al renderizador actual.
+'''
+import hashlib
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.template.defaultfilters import linebreaksbr
+from django.utils.module_loading import import_string
+
+try:
+    import markdown
+    import nh3
+except ImportError:  # sin ellos solo está disponible RenderizadorTexto
+    markdown = nh3 = None
+
+# Campos de Articulo que escribe actualizar_html().
+CAMPOS = ('contenido_html', 'contenido_hash', 'contenido_renderizador')
+
+
+def huella(contenido):
+    return hashlib.sha256((contenido or '').encode()).hexdigest()
+
+
+class RenderizadorBase:
+    '''
+    Interfaz de los renderizadores de contenido.
+
+    renderizar() devuelve HTML ya saneado, que la plantilla inserta tal cual; version
+    identifica la salida y debe cambiar cuando cambie el HTML que produce.
+    '''
+
+    version = None
+
+    def renderizar(self, texto):
+        raise NotImplementedError
+
+
+class RenderizadorTexto(RenderizadorBase):
+    '''
+    Lo que hacía la plantilla con linebreaksbr: texto escapado y saltos de línea como <br>.
+    '''
+
+    version = 'texto-1'
+
+    def renderizar(self, texto):
+        return str(linebreaksbr(texto or '', autoescape=True))
+
+
+class RenderizadorMarkdown(RenderizadorBase):
+    '''
+    Markdown (con tablas, bloques de código y notas al pie) saneado con nh3: el HTML
+    que escriba el autor solo conserva las etiquetas y atributos de abajo.
+    '''
+
+    EXTENSIONES = ('extra', 'sane_lists')
+    ETIQUETAS = {
+        'p', 'br', 'hr', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'blockquote', 'pre', 'code',
+        'em', 'strong', 'del', 'ins', 'sub', 'sup', 'abbr', 'a', 'img', 'ul', 'ol', 'li',
+        'dl', 'dt', 'dd', 'table', 'thead', 'tbody', 'tr', 'th', 'td', 'div',
+    }
+    ATRIBUTOS = {
+        'a': {'href', 'title'},
+        'img': {'src', 'alt', 'title'},
+        'abbr': {'title'},
+        'code': {'class'},
+        'th': {'align'},
+        'td': {'align'},
+        # anclas de las notas al pie
+        'sup': {'id'},
+        'li': {'id'},
+        'div': {'class'},
+    }
+    ESQUEMAS = {'http', 'https', 'mailto'}
+
+    def __init__(self):
+        if markdown is None or nh3 is None:
+            raise ImproperlyConfigured('RenderizadorMarkdown necesita los paquetes markdown y nh3.')
+        self.version = f'markdown-1:{markdown.__version__}:{nh3.__version__}'
+        self._local = threading.local()
+
+    def __getstate__(self):
+        # Se envía a los procesos del pool sin el parser, que no se puede serializar.
+        return {'version': self.version}
+
+    def __setstate__(self, estado):
+        self.version = estado['version']
+        self._local = threading.local()
+
+    def _parser(self):
+        # Crear el parser con sus extensiones cuesta más que convertir un artículo:
+        # se reutiliza uno por hilo.
+        parser = getattr(self._local, 'parser', None)
+        if parser is None:
+            parser = self._local.parser = markdown.Markdown(extensions=list(self.EXTENSIONES))
+        return parser.reset()
+
+    def renderizar(self, texto):
+        html = self._parser().convert(texto or '')
+        return nh3.clean(html, tags=self.ETIQUETAS, attributes=self.ATRIBUTOS, url_schemes=self.ESQUEMAS)
+
+
+@lru_cache(maxsize=None)
+def _cargar_renderizador(ruta):
+    if ruta:
+        return import_string(ruta)()
+    if markdown is not None and nh3 is not None:
+        return RenderizadorMarkdown()
+    return RenderizadorTexto()
+
+
+def obtener_renderizador():
+    '''
+    Devuelve el renderizador de BLOG_RENDERIZADOR o, si no hay ninguno, Markdown
+    cuando están instalados markdown y nh3 y texto plano si no.
+    '''
+    return _cargar_renderizador(getattr(settings, 'BLOG_RENDERIZADOR', None))
+
+
+def renderizador_de(articulo):
+    '''
+    Devuelve RenderizadorTexto para los artículos en texto plano y el configurado para
+    los demás.
+    '''
+    if articulo.contenido_renderizador == RenderizadorTexto.version:
+        return _cargar_renderizador(f'{__name__}.RenderizadorTexto')
+    return obtener_renderizador()
+
+
+def actualizar_html(articulo, renderizador=None):
+    '''
+    Regenera articulo.contenido_html si cambió el contenido o el renderizador.
+    No guarda: devuelve True si hubo que renderizar.
+    '''
+    renderizador = renderizador or renderizador_de(articulo)
+    huella_ = huella(articulo.contenido)
+    if articulo.contenido_hash == huella_ and articulo.contenido_renderizador == renderizador.version:
+        return False
+    articulo.contenido_html = renderizador.renderizar(articulo.contenido)
+    articulo.contenido_hash = huella_
+    articulo.contenido_renderizador = renderizador.version
+    return True
+
+
+# --- Renderizado en bloque (comando renderizar_contenido) ---
+
+_renderizador = None
+
+
+def _iniciar_proceso(renderizador):
+    global _renderizador
+    _renderizador = renderizador
+
+
+def _renderizar_lote(filas):
+    return [(id_, _renderizador.renderizar(contenido), huella(contenido)) for id_, contenido in filas]
+
+
+def _lotes(iterable, tamano):
+    iterador = iter(iterable)
+    while lote := list(islice(iterador, tamano)):
+        yield lote
+
+
+def renderizar_lotes(filas, renderizador, procesos=1, lote=200):
+    '''
+    Renderiza filas (id, contenido) en lotes y produce listas de (id, html, huella).
+    Con más de un proceso reparte los lotes en un pool; los procesos no usan la base
+    de datos: reciben y devuelven texto.
+    '''
+    if procesos <= 1:
+        _iniciar_proceso(renderizador)
+        yield from map(_renderizar_lote, _lotes(filas, lote))
+        return
+    with ProcessPoolExecutor(procesos, initializer=_iniciar_proceso, initargs=(renderizador,)) as pool:
+        yield from pool.map(_renderizar_lote, _lotes(filas, lote))
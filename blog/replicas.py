@@ -0,0 +1,82 @@
+'''
+Reparto de lecturas entre la base de datos primaria y sus réplicas de solo lectura.
+
+Solo las vistas públicas del blog leen de las réplicas (MiddlewareReplicas lo habilita
+por petición); el admin, los comandos y todas las escrituras van a la primaria. Tras
+una escritura, el resto de la petición y las siguientes del mismo navegador durante
+BLOG_REPLICAS_PEGADO_SEGUNDOS leen de la primaria para ver sus propios cambios.
+'''
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+
+PRIMARIA = 'default'
+COOKIE = 'blog_primaria'
+
+_replicas_permitidas = ContextVar('blog_replicas_permitidas', default=False)
+_hubo_escritura = ContextVar('blog_hubo_escritura', default=False)
+
+
+def permitir_replicas():
+    '''
+    Habilita leer de las réplicas en el contexto actual (la petición en curso).
+    '''
+    _replicas_permitidas.set(True)
+
+
+def marcar_escritura():
+    _hubo_escritura.set(True)
+
+
+def hubo_escritura():
+    return _hubo_escritura.get()
+
+
+def iniciar_peticion():
+    '''
+    Parte cada petición leyendo de la primaria y sin escrituras; devuelve los tokens
+    para dejar el contexto como estaba con restaurar().
+    '''
+    return _replicas_permitidas.set(False), _hubo_escritura.set(False)
+
+
+def restaurar(tokens):
+    permitidas, escritura = tokens
+    _replicas_permitidas.reset(permitidas)
+    _hubo_escritura.reset(escritura)
+
+
+class RouterReplicas:
+    '''
+    Router de base de datos para los modelos de la app blog.
+
+    Las demás apps (auth, sesiones, admin) no pasan por aquí y usan la primaria.
+    '''
+
+    app_label = 'blog'
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label != self.app_label:
+            return None
+        replicas = settings.BLOG_REPLICAS
+        if replicas and _replicas_permitidas.get() and not _hubo_escritura.get():
+            return random.choice(replicas)
+        return PRIMARIA
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label != self.app_label:
+            return None
+        return PRIMARIA
+
+    def allow_relation(self, obj1, obj2, **hints):
+        bases = {PRIMARIA, *settings.BLOG_REPLICAS}
+        if obj1._state.db in bases and obj2._state.db in bases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Las réplicas son copias de la primaria: el esquema les llega por replicación.
+        if db in settings.BLOG_REPLICAS:
+            return False
+        return None
@@ -0,0 +1,40 @@
+'''
+URL de artículos y categorías sin pasar por reverse() en cada enlace. reverse() busca
+el patrón y vuelve a comprobar los argumentos en cada llamada; aquí se resuelve una
+sola vez por ruta con un slug de marca y después solo se sustituye el slug.
+'''
+import re
+from functools import lru_cache
+
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.urls import get_script_prefix, get_urlconf, reverse
+
+_MARCA = 'slugmarca0'
+# Lo que acepta el conversor <slug:>; cualquier otra cosa pasa por reverse().
+_SLUG = re.compile(r'[-a-zA-Z0-9_]+')
+
+
+@lru_cache(maxsize=64)
+def _plantilla(nombre, urlconf, prefijo):
+    # El prefijo (SCRIPT_NAME) forma parte de la clave aunque reverse() lo lea por su cuenta.
+    ruta = reverse(nombre, urlconf=urlconf, kwargs={'slug': _MARCA})
+    inicio, _, fin = ruta.partition(_MARCA)
+    return inicio, fin
+
+
+def ruta_slug(nombre, slug):
+    '''
+    Igual que reverse(nombre, kwargs={'slug': slug}) para las rutas con un único
+    argumento <slug:slug>.
+    '''
+    if not _SLUG.fullmatch(slug or ''):
+        return reverse(nombre, kwargs={'slug': slug})
+    inicio, fin = _plantilla(nombre, get_urlconf(), get_script_prefix())
+    return f'{inicio}{slug}{fin}'
+
+
+@receiver(setting_changed)
+def _olvidar_rutas(*, setting, **kwargs):
+    if setting == 'ROOT_URLCONF':
+        _plantilla.cache_clear()
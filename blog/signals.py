@@ -0,0 +1,193 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import cache, contadores, relacionados, replicas, tareas
+from .busqueda import obtener_backend
+from .models import Articulo, Categoria
+from .registro import registro_categorias
+
+
+# --- Réplicas de lectura ---
+
+@receiver(pre_save, sender=Articulo)
+@receiver(pre_delete, sender=Articulo)
+@receiver(pre_save, sender=Categoria)
+@receiver(pre_delete, sender=Categoria)
+@receiver(m2m_changed, sender=Articulo.categorias.through)
+def leer_de_la_primaria(sender, **kwargs):
+    # Va primero y antes de escribir: las lecturas de las demás señales (slug anterior,
+    # índice de búsqueda) y lo que queda de la petición deben ver la primaria.
+    replicas.marcar_escritura()
+
+
+# --- Índice de búsqueda ---
+# El trabajo caro pasa por blog/tareas.py: en los POST del admin solo se encola.
+
+@receiver(post_save, sender=Articulo)
+def indexar_articulo(sender, instance, raw=False, **kwargs):
+    '''
+    Mantiene el índice de búsqueda al día cada vez que se guarda un artículo.
+    '''
+    if not raw:
+        tareas.encolar('indexar', [instance.pk])
+
+
+@receiver(post_delete, sender=Articulo)
+def desindexar_articulo(sender, instance, **kwargs):
+    obtener_backend().eliminar([instance.pk])
+
+
+@receiver(m2m_changed, sender=Articulo.categorias.through)
+def reindexar_categorias_articulo(sender, instance, action, reverse, pk_set, **kwargs):
+    '''
+    Las categorías forman parte del índice, así que un cambio en la relación
+    obliga a reindexar los artículos afectados.
+    '''
+    if action == 'pre_clear' and reverse:
+        # Al vaciar desde la categoría, pk_set llega vacío: se guardan los artículos antes.
+        instance._articulos_previos = list(instance.articulos.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        tareas.encolar('indexar', [instance.pk])
+        return
+    ids = pk_set if action != 'post_clear' else getattr(instance, '_articulos_previos', [])
+    tareas.encolar('indexar', ids)
+
+
+@receiver(post_save, sender=Categoria)
+def reindexar_articulos_categoria(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        tareas.encolar('indexar', instance.articulos.values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=Categoria)
+def recordar_articulos_categoria(sender, instance, **kwargs):
+    # El borrado en cascada de la tabla intermedia no envía m2m_changed.
+    instance._articulos_previos = list(instance.articulos.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Categoria)
+def reindexar_tras_borrar_categoria(sender, instance, **kwargs):
+    tareas.encolar('indexar', instance._articulos_previos)
+
+
+# --- Caché de la página de detalle ---
+
+@receiver(pre_save, sender=Articulo)
+def recordar_slug_anterior(sender, instance, raw=False, **kwargs):
+    # Si el slug cambia hay que invalidar también la entrada guardada con el slug viejo.
+    instance._slug_anterior = None
+    if instance.pk and not raw:
+        instance._slug_anterior = (
+            Articulo.objects.filter(pk=instance.pk).values_list('slug', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Articulo)
+@receiver(post_delete, sender=Articulo)
+def invalidar_detalle_articulo(sender, instance, **kwargs):
+    cache.invalidar_detalle(instance.slug, getattr(instance, '_slug_anterior', None))
+
+
+@receiver(m2m_changed, sender=Articulo.categorias.through)
+def invalidar_detalle_por_categorias(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        cache.invalidar_detalle(instance.slug)
+        return
+    ids = pk_set if action != 'post_clear' else getattr(instance, '_articulos_previos', [])
+    cache.invalidar_detalle(*Articulo.objects.filter(pk__in=ids).values_list('slug', flat=True))
+
+
+# --- Registro de categorías ---
+
+@receiver(post_save, sender=Categoria)
+@receiver(post_delete, sender=Categoria)
+@receiver(post_delete, sender=Articulo)
+def invalidar_registro_categorias(sender, **kwargs):
+    registro_categorias.invalidar()
+
+
+@receiver(m2m_changed, sender=Articulo.categorias.through)
+def invalidar_conteos_categorias(sender, action, **kwargs):
+    # El número de artículos por categoría cambia con cada alta o baja en la relación.
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        registro_categorias.invalidar()
+
+
+# --- Contadores por categoría y archivo mensual ---
+
+@receiver(post_save, sender=Articulo)
+def contar_articulo_guardado(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    mes = contadores.mes_de(instance.fecha_creacion)
+    if created:
+        contadores.ajustar_meses({mes: 1})
+        return
+    contadores.ajustar_meses({mes: 0})
+    contadores.tocar_categorias(instance)
+
+
+@receiver(pre_delete, sender=Articulo)
+def recordar_categorias_articulo(sender, instance, **kwargs):
+    # El borrado en cascada de la tabla intermedia no envía m2m_changed.
+    instance._categorias_previas = list(instance.categorias.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Articulo)
+def descontar_articulo_borrado(sender, instance, **kwargs):
+    contadores.ajustar_meses({contadores.mes_de(instance.fecha_creacion): -1})
+    contadores.ajustar_categorias({pk: -1 for pk in getattr(instance, '_categorias_previas', [])})
+
+
+@receiver(m2m_changed, sender=Articulo.categorias.through)
+def contar_enlaces_categorias(sender, instance, action, reverse, pk_set, **kwargs):
+    '''
+    Ajusta num_articulos con los enlaces que realmente se crean o se quitan: en remove,
+    pk_set trae también ids que no estaban enlazados, así que se consultan antes.
+    '''
+    propio, otro = ('categoria_id', 'articulo_id') if reverse else ('articulo_id', 'categoria_id')
+    if action in ('pre_remove', 'pre_clear'):
+        enlaces = sender.objects.filter(**{propio: instance.pk})
+        if action == 'pre_remove':
+            enlaces = enlaces.filter(**{f'{otro}__in': pk_set})
+        instance._enlaces_quitados = list(enlaces.values_list(otro, flat=True))
+        return
+    if action == 'post_add':
+        ids, delta = pk_set, 1
+    elif action in ('post_remove', 'post_clear'):
+        ids, delta = instance._enlaces_quitados, -1
+    else:
+        return
+    if reverse:
+        contadores.ajustar_categorias({instance.pk: delta * len(ids)})
+    else:
+        contadores.ajustar_categorias({pk: delta for pk in ids})
+
+
+# --- Artículos relacionados ---
+
+@receiver(post_save, sender=Articulo)
+def actualizar_relacionados(sender, instance, raw=False, **kwargs):
+    if not raw:
+        tareas.encolar('relacionados', [instance.pk])
+
+
+@receiver(m2m_changed, sender=Articulo.categorias.through)
+def relacionar_por_categorias(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        tareas.encolar('relacionar', [instance.pk])
+        return
+    ids = pk_set if action != 'post_clear' else getattr(instance, '_articulos_previos', [])
+    tareas.encolar('relacionar', ids)
+
+
+@receiver(pre_delete, sender=Articulo)
+def olvidar_relacionado(sender, instance, **kwargs):
+    relacionados.olvidar(instance)
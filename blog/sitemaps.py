@@ -0,0 +1,121 @@
+'''
+Sitemaps de los artículos, repartidos en shards por rangos fijos de id.
+
+El shard k contiene los artículos con id entre k*N + 1 y (k+1)*N, con N =
+BLOG_SITEMAP_URLS (50.000, el máximo del protocolo). Cada shard se genera recorriendo
+su rango por keyset sobre id y se guarda en la caché junto con la versión con la que
+se generó. La versión sale de la base de datos (total y última fecha_actualizacion
+del rango), no de la caché: todos los workers la ven igual aunque la caché sea de
+cada proceso, y solo se regenera el shard del artículo que cambió. Mientras haya un
+único shard, /sitemap.xml es el propio urlset; después pasa a ser un índice de shards.
+'''
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import BigIntegerField, Count, ExpressionWrapper, F, Max, Sum
+from django.urls import reverse
+
+from .models import ArchivoMensual, Articulo
+
+PREFIJO = 'blog:sitemap'
+LOTE = 2000
+
+CABECERA_URLSET = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+)
+CABECERA_INDICE = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+)
+
+
+def shard_de(articulo_id):
+    return (articulo_id - 1) // settings.BLOG_SITEMAP_URLS
+
+
+def _rango(shard):
+    n = settings.BLOG_SITEMAP_URLS
+    return shard * n, (shard + 1) * n
+
+
+def version(shard):
+    '''
+    Versión actual del shard (o del índice, con shard='indice'). La del shard es el
+    total y la fecha más reciente de su rango, que el índice (id, fecha_actualizacion)
+    resuelve sin leer las filas; la del índice sale de los contadores de ArchivoMensual,
+    que cambian con cada alta, edición o baja.
+    '''
+    if shard == 'indice':
+        datos = ArchivoMensual.objects.aggregate(total=Sum('num_articulos'), ultima=Max('ultima_modificacion'))
+    else:
+        desde, hasta = _rango(shard)
+        datos = Articulo.objects.filter(id__gt=desde, id__lte=hasta).aggregate(
+            total=Count('id'), ultima=Max('fecha_actualizacion'),
+        )
+    return f"{datos['total'] or 0}:{datos['ultima'].isoformat() if datos['ultima'] else ''}"
+
+
+def _obtener(clave, version_actual, generar):
+    entrada = cache.get(clave)
+    if entrada is None or entrada['version'] != version_actual:
+        entrada = {'version': version_actual, **generar()}
+        cache.set(clave, entrada, timeout=settings.BLOG_SITEMAP_SEGUNDOS)
+    return entrada
+
+
+def obtener_shard(shard, base, version_actual=None):
+    '''
+    Devuelve {'version', 'xml', 'lastmod'} del shard; xml es None si el rango está vacío.
+    `base` es el esquema y host ('https://ejemplo.cl') de las URL absolutas; si ya se
+    calculó la versión (para el ETag) se pasa en version_actual.
+    '''
+    return _obtener(
+        f'{PREFIJO}:shard:{shard}:{base}', version_actual or version(shard), lambda: generar_shard(shard, base),
+    )
+
+
+def obtener_indice(base, version_actual=None):
+    '''
+    Devuelve {'version', 'xml', 'shards'}, con shards = [(shard, lastmod), ...].
+    '''
+    return _obtener(f'{PREFIJO}:indice:{base}', version_actual or version('indice'), lambda: generar_indice(base))
+
+
+def generar_shard(shard, base):
+    ultimo_id, fin = _rango(shard)
+    partes = [CABECERA_URLSET]
+    lastmod = None
+    queryset = Articulo.objects.order_by('id').values_list('id', 'slug', 'fecha_actualizacion')
+    while True:
+        filas = list(queryset.filter(id__gt=ultimo_id, id__lte=fin)[:LOTE])
+        for id_, slug, actualizacion in filas:
+            url = base + Articulo(slug=slug).get_absolute_url()
+            partes.append(f'<url><loc>{escape(url)}</loc><lastmod>{actualizacion.isoformat()}</lastmod></url>\n')
+            lastmod = max(lastmod, actualizacion) if lastmod else actualizacion
+        # Un lote incompleto es el último: se evita la consulta vacía del final.
+        if len(filas) < LOTE:
+            break
+        ultimo_id = filas[-1][0]
+    if lastmod is None:
+        return {'xml': None, 'lastmod': None}
+    partes.append('</urlset>\n')
+    return {'xml': ''.join(partes).encode(), 'lastmod': lastmod}
+
+
+def generar_indice(base):
+    '''
+    Una consulta agrupada por shard da los shards con artículos y su lastmod.
+    '''
+    shard = ExpressionWrapper((F('id') - 1) / settings.BLOG_SITEMAP_URLS, output_field=BigIntegerField())
+    shards = list(
+        Articulo.objects.annotate(shard=shard).values('shard').order_by('shard')
+        .annotate(lastmod=Max('fecha_actualizacion')).values_list('shard', 'lastmod')
+    )
+    partes = [CABECERA_INDICE]
+    for numero, lastmod in shards:
+        url = base + reverse('blog:sitemap_shard', kwargs={'shard': numero})
+        partes.append(f'<sitemap><loc>{escape(url)}</loc><lastmod>{lastmod.isoformat()}</lastmod></sitemap>\n')
+    partes.append('</sitemapindex>\n')
+    return {'xml': ''.join(partes).encode(), 'shards': shards}
@@ -0,0 +1,124 @@
+'''
+Generación del sitio estático: cada página pública se renderiza con su vista y se
+guarda como index.html bajo BLOG_SITIO_DIR, junto a un manifiesto con la huella de
+lo que se usó para generarla.
+'''
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.test import RequestFactory
+from django.urls import reverse
+
+from . import relacionados
+from .models import Articulo, ArticuloRelacionado, Categoria
+from .views import VistaDetalleArticulo, VistaListaArticulos, contadores
+
+MANIFIESTO = 'manifiesto.json'
+
+
+def _huella(*partes):
+    return hashlib.sha1('|'.join(map(str, [settings.BLOG_ETAG_VERSION, *partes])).encode()).hexdigest()
+
+
+def inventario():
+    '''
+    Devuelve {ruta_archivo: (tipo, argumento, huella)} de todas las páginas del sitio.
+
+    La huella de un artículo depende de su fecha_actualizacion, su renderizador, sus
+    categorías y su lista de relacionados (ids, fechas y renderizadores); la de las
+    páginas de lista, de los mismos contadores que sus validadores en línea (ver
+    contadores() en blog/views.py) y de la barra de categorías, que aparece en todas.
+    '''
+    categorias = list(
+        Categoria.objects.order_by('id').values_list('id', 'slug', 'nombre', 'ultima_modificacion', 'num_articulos')
+    )
+    barra = _huella(*[(id_, slug, nombre, total) for id_, slug, nombre, _, total in categorias])
+
+    membresia = {}
+    relaciones = Articulo.categorias.through.objects.order_by('categoria_id')
+    for articulo_id, categoria_id in relaciones.values_list('articulo_id', 'categoria_id').iterator():
+        membresia.setdefault(articulo_id, []).append(categoria_id)
+
+    lista_relacionados = {}
+    filas = ArticuloRelacionado.objects.order_by('articulo_id', 'posicion').values_list(
+        'articulo_id', 'relacionado_id', 'relacionado__fecha_actualizacion', 'relacionado__contenido_renderizador',
+    )
+    for articulo_id, *relacionado in filas.iterator():
+        lista_relacionados.setdefault(articulo_id, []).append(relacionado)
+
+    total, ultima = contadores()
+    paginas = {'index.html': ('lista', None, _huella(ultima, total, barra))}
+    for _, slug, _, ultima, total in categorias:
+        paginas[f'categoria/{slug}/index.html'] = ('categoria', slug, _huella(ultima, total, barra))
+    articulos = Articulo.objects.values_list(
+        'id', 'slug', 'fecha_actualizacion', 'contenido_renderizador',
+    ).iterator(chunk_size=2000)
+    for id_, slug, actualizacion, renderizador in articulos:
+        paginas[f'articulo/{slug}/index.html'] = ('articulo', slug, _huella(
+            actualizacion, renderizador, membresia.get(id_, []),
+            relacionados.huella(lista_relacionados.get(id_, [])),
+        ))
+    return paginas
+
+
+def renderizar(tipo, argumento):
+    '''
+    Renderiza una página con la misma vista que la sirve en línea y devuelve los bytes.
+    '''
+    fabrica = RequestFactory()
+    if tipo == 'articulo':
+        url = reverse('blog:detalle_articulo', kwargs={'slug': argumento})
+        # HEAD se renderiza igual que un GET, pero no cuenta como visita.
+        respuesta = VistaDetalleArticulo.as_view()(fabrica.head(url), slug=argumento)
+    else:
+        parametros = {'categoria': argumento} if tipo == 'categoria' else {}
+        respuesta = VistaListaArticulos.as_view()(fabrica.get(reverse('blog:lista_articulos'), parametros))
+    if hasattr(respuesta, 'render'):
+        respuesta.render()
+    return respuesta.content
+
+
+def escribir(directorio, ruta, contenido):
+    destino = Path(directorio) / ruta
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    temporal = destino.with_name(destino.name + '.tmp')
+    temporal.write_bytes(contenido)
+    os.replace(temporal, destino)
+
+
+def renderizar_lote(directorio, paginas):
+    '''
+    Renderiza y escribe una lista de (ruta, tipo, argumento). Se ejecuta tanto en el
+    proceso principal como en los procesos del pool.
+    '''
+    for ruta, tipo, argumento in paginas:
+        escribir(directorio, ruta, renderizar(tipo, argumento))
+    return len(paginas)
+
+
+def leer_manifiesto(directorio):
+    try:
+        return json.loads((Path(directorio) / MANIFIESTO).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def guardar_manifiesto(directorio, manifiesto):
+    escribir(directorio, MANIFIESTO, json.dumps(manifiesto, sort_keys=True).encode())
+
+
+def eliminar(directorio, rutas):
+    '''
+    Borra las páginas que ya no existen y las carpetas que queden vacías.
+    '''
+    raiz = Path(directorio)
+    for ruta in rutas:
+        archivo = raiz / ruta
+        archivo.unlink(missing_ok=True)
+        carpeta = archivo.parent
+        while carpeta != raiz and carpeta.exists() and not any(carpeta.iterdir()):
+            carpeta.rmdir()
+            carpeta = carpeta.parent
@@ -0,0 +1,94 @@
+import re
+import zlib
+from functools import reduce
+from operator import or_
+
+from django.db import connections, router
+from django.db.models import Q
+from django.utils.text import slugify
+
+# Espacio reservado para el sufijo numérico ('-99999').
+RESERVA_SUFIJO = 6
+# Bases por consulta: cada una suma un OR al WHERE y SQLite no admite expresiones de
+# más de 1000 niveles (falla a partir de unas 500 bases en la misma consulta).
+BASES_POR_CONSULTA = 200
+
+
+def base_slug(modelo, texto, campo='slug'):
+    '''
+    Slug base para el texto, recortado para que siempre quepa un sufijo.
+    '''
+    max_length = modelo._meta.get_field(campo).max_length
+    return slugify(texto)[:max_length - RESERVA_SUFIJO].strip('-') or modelo._meta.model_name
+
+
+def _bloquear(modelo, bases, using):
+    '''
+    Serializa a los escritores que reservan slugs con las mismas bases hasta el final
+    de la transacción en curso, sin reintentos ante IntegrityError.
+
+    En PostgreSQL usa un advisory lock por base (en orden, para no provocar interbloqueos).
+    En SQLite basta con tomar el bloqueo de escritura de la base de datos: un UPDATE
+    que no afecta filas ya lo adquiere y lo mantiene hasta el COMMIT.
+    '''
+    conexion = connections[using]
+    if not conexion.in_atomic_block:
+        raise RuntimeError('La reserva de slugs debe hacerse dentro de transaction.atomic().')
+    tabla = conexion.ops.quote_name(modelo._meta.db_table)
+    with conexion.cursor() as cursor:
+        if conexion.vendor == 'postgresql':
+            for base in sorted(bases):
+                cursor.execute('SELECT pg_advisory_xact_lock(%s)', [zlib.crc32(f'{tabla}:{base}'.encode())])
+        elif conexion.vendor == 'sqlite':
+            cursor.execute(f'UPDATE {tabla} SET id = id WHERE 0')
+
+
+def _ocupados(modelo, bases, campo, using):
+    '''
+    Consultas por rango sobre el índice único del slug, una por cada BASES_POR_CONSULTA
+    bases: traen la base y las variantes base-<dígitos> de todas las bases pedidas.
+    '''
+    bases = sorted(bases)
+    ocupados = set()
+    for inicio in range(0, len(bases), BASES_POR_CONSULTA):
+        filtro = reduce(or_, [
+            Q(**{campo: base}) | Q(**{f'{campo}__gte': f'{base}-0', f'{campo}__lt': f'{base}-:'})
+            for base in bases[inicio:inicio + BASES_POR_CONSULTA]
+        ])
+        ocupados.update(modelo._default_manager.using(using).filter(filtro).values_list(campo, flat=True))
+    return ocupados
+
+
+def _siguiente(base, ocupados):
+    if base not in ocupados:
+        return base
+    patron = re.compile(rf'^{re.escape(base)}-(\d+)$')
+    sufijos = [int(m.group(1)) for m in map(patron.match, ocupados) if m]
+    return f'{base}-{max(sufijos, default=1) + 1}'
+
+
+def asignar_slugs(modelo, textos, campo='slug', using=None):
+    '''
+    Modo por lotes: devuelve un slug libre para cada texto, también distintos entre sí,
+    con una consulta por cada BASES_POR_CONSULTA bases distintas. Debe llamarse dentro de transaction.atomic() y los objetos
+    deben guardarse antes de que termine la transacción.
+    '''
+    using = using or router.db_for_write(modelo)
+    bases = [base_slug(modelo, texto, campo) for texto in textos]
+    if not bases:
+        return []
+    _bloquear(modelo, set(bases), using)
+    ocupados = _ocupados(modelo, set(bases), campo, using)
+    resultado = []
+    for base in bases:
+        slug = _siguiente(base, ocupados)
+        ocupados.add(slug)
+        resultado.append(slug)
+    return resultado
+
+
+def asignar_slug(modelo, texto, campo='slug', using=None):
+    '''
+    Devuelve slugify(texto) o, si ya está usado, la variante con el siguiente sufijo libre.
+    '''
+    return asignar_slugs(modelo, [texto], campo=campo, using=using)[0]
@@ -0,0 +1,76 @@
+'''
+Ajustes de SQLite para servir con varios workers de gunicorn sobre el mismo archivo.
+
+configurar_conexion() aplica BLOG_SQLITE['PRAGMAS'] a cada conexión nueva (WAL para
+que los lectores no esperen a los escritores, busy_timeout para que un escritor espere
+al otro en vez de fallar, etc.). escritura() abre las transacciones de Articulo y
+Categoria: con ESCRITOR_UNICO, antes del BEGIN hace fila en un candado de archivo
+compartido por todos los procesos, de modo que los escritores se turnan en orden en
+vez de reintentar a ciegas dentro de busy_timeout hasta dar "database is locked".
+'''
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+try:
+    import fcntl
+except ImportError:  # Windows: solo se serializan los hilos del propio proceso.
+    fcntl = None
+
+_candados_hilos = {}
+_candados_lock = threading.Lock()
+
+
+@receiver(connection_created)
+def configurar_conexion(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for nombre, valor in settings.BLOG_SQLITE['PRAGMAS'].items():
+            cursor.execute(f'PRAGMA {nombre} = {valor}')
+
+
+def ruta_candado(conexion):
+    return f"{conexion.settings_dict['NAME']}.escritura.lock"
+
+
+@contextmanager
+def _candado(ruta):
+    with _candados_lock:
+        candado_hilos = _candados_hilos.setdefault(ruta, threading.Lock())
+    with candado_hilos:
+        if fcntl is None:
+            yield
+            return
+        with open(ruta, 'a') as archivo:
+            fcntl.flock(archivo, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(archivo, fcntl.LOCK_UN)
+
+
+@contextmanager
+def escritura(using):
+    '''
+    Igual que transaction.atomic(using=using), pero si abre la transacción más externa
+    sobre un archivo SQLite la serializa con los demás escritores. Dentro de un atomic
+    ya abierto no toma el candado: la transacción ya empezó y esperar ahí podría
+    bloquear a quien tiene el candado y espera a SQLite.
+    '''
+    conexion = connections[using]
+    if (
+        not settings.BLOG_SQLITE['ESCRITOR_UNICO']
+        or conexion.vendor != 'sqlite'
+        or conexion.in_atomic_block
+        or conexion.is_in_memory_db()
+    ):
+        with transaction.atomic(using=using):
+            yield
+        return
+    with _candado(ruta_candado(conexion)), transaction.atomic(using=using):
+        yield
@@ -0,0 +1,174 @@
+'''
+Cola de tareas en la propia base de datos, sin broker. Las señales de Articulo y
+Categoria llaman a encolar(); dentro de diferidas() (los POST del admin) solo se
+inserta una fila por tipo y artículo, y el comando procesar_tareas las ejecuta por
+lotes. Fuera de diferidas() el trabajo se hace en el momento, como antes.
+
+Una tarea que falla se reintenta con espera exponencial hasta REINTENTOS veces y
+después queda como fallida, con el error, para revisarla en el admin.
+'''
+import contextvars
+import logging
+import traceback
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, router, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import relacionados
+from .busqueda import obtener_backend
+from .models import Articulo, Tarea
+from .sqlite import escritura
+
+logger = logging.getLogger(__name__)
+
+_diferir = contextvars.ContextVar('blog_tareas_diferidas', default=False)
+_manejadores = {}
+
+
+def tarea(tipo):
+    '''
+    Registra la función que procesa las tareas de un tipo; recibe una lista de ids.
+    '''
+    def registrar(funcion):
+        _manejadores[tipo] = funcion
+        return funcion
+    return registrar
+
+
+@contextmanager
+def diferidas(activas=True):
+    '''
+    Mientras dura, encolar() guarda las tareas en vez de ejecutarlas.
+    '''
+    token = _diferir.set(activas)
+    try:
+        yield
+    finally:
+        _diferir.reset(token)
+
+
+def encolar(tipo, ids):
+    ids = [id_ for id_ in dict.fromkeys(ids) if id_ is not None]
+    if not ids:
+        return
+    if not _diferir.get():
+        _manejadores[tipo](ids)
+        return
+    # El índice único parcial descarta las que ya están pendientes para el mismo artículo.
+    Tarea.objects.bulk_create([Tarea(tipo=tipo, objeto_id=id_) for id_ in ids], ignore_conflicts=True)
+
+
+def tomar(lote, plazo):
+    '''
+    Marca como en curso hasta `lote` tareas disponibles (o abandonadas por un proceso
+    que murió) y las devuelve. skip_locked deja que varios procesos tomen lotes
+    distintos en PostgreSQL; en SQLite ya se turnan con el candado de escritura.
+    '''
+    ahora = timezone.now()
+    alias = router.db_for_write(Tarea)
+    with escritura(alias):
+        disponibles = (
+            Tarea.objects.using(alias)
+            .filter(Q(estado=Tarea.PENDIENTE, disponible_desde__lte=ahora) | Q(estado=Tarea.EN_CURSO, tomada_hasta__lt=ahora))
+            .order_by('disponible_desde', 'id')
+            .select_for_update(skip_locked=True)
+        )
+        ids = list(disponibles.values_list('id', flat=True)[:lote])
+        Tarea.objects.using(alias).filter(id__in=ids).update(
+            estado=Tarea.EN_CURSO, tomada_hasta=ahora + timedelta(seconds=plazo),
+        )
+        return list(Tarea.objects.using(alias).filter(id__in=ids).order_by('id'))
+
+
+def _ejecutar(manejador, ids):
+    # Cada grupo en su transacción: si falla no deja el trabajo a medias.
+    with escritura(router.db_for_write(Articulo)):
+        manejador(ids)
+
+
+def procesar(lote=None):
+    '''
+    Toma un lote, ejecuta sus tareas agrupadas por tipo (una llamada por grupo) y
+    devuelve (hechas, fallidas). Si un grupo falla se repite tarea a tarea, para que
+    una sola rota no haga reintentar a las demás.
+    '''
+    config = settings.BLOG_TAREAS
+    por_tipo = defaultdict(list)
+    for tarea_ in tomar(lote or config['LOTE'], config['PLAZO']):
+        por_tipo[tarea_.tipo].append(tarea_)
+
+    hechas, fallidas = [], []
+    for tipo, grupo in por_tipo.items():
+        manejador = _manejadores.get(tipo)
+        if manejador is None:
+            fallidas += [(tarea_, f'Tipo de tarea desconocido: {tipo}') for tarea_ in grupo]
+            continue
+        try:
+            _ejecutar(manejador, [tarea_.objeto_id for tarea_ in grupo])
+            hechas += grupo
+            continue
+        except Exception:
+            if len(grupo) == 1:
+                fallidas.append((grupo[0], traceback.format_exc()))
+                continue
+        for tarea_ in grupo:
+            try:
+                _ejecutar(manejador, [tarea_.objeto_id])
+                hechas.append(tarea_)
+            except Exception:
+                fallidas.append((tarea_, traceback.format_exc()))
+
+    Tarea.objects.filter(id__in=[tarea_.id for tarea_ in hechas], estado=Tarea.EN_CURSO).delete()
+    for tarea_, error in fallidas:
+        logger.error('Falló la tarea %s:\n%s', tarea_, error)
+        reintentar(tarea_, error)
+    return len(hechas), len(fallidas)
+
+
+def reintentar(tarea_, error):
+    '''
+    Vuelve a dejar la tarea pendiente tras ESPERA_BASE * 2^(intentos-1) segundos (como
+    mucho ESPERA_MAXIMA), o la marca como fallida al agotar los REINTENTOS.
+    '''
+    config = settings.BLOG_TAREAS
+    intentos = tarea_.intentos + 1
+    if intentos >= config['REINTENTOS']:
+        cambios = {'estado': Tarea.FALLIDA}
+    else:
+        espera = min(config['ESPERA_MAXIMA'], config['ESPERA_BASE'] * 2 ** (intentos - 1))
+        cambios = {'estado': Tarea.PENDIENTE, 'disponible_desde': timezone.now() + timedelta(seconds=espera)}
+    alias = router.db_for_write(Tarea)
+    try:
+        with transaction.atomic(using=alias):
+            Tarea.objects.using(alias).filter(pk=tarea_.pk).update(
+                intentos=intentos, error=error, tomada_hasta=None, **cambios,
+            )
+    except IntegrityError:
+        # Mientras tanto se encoló otra para el mismo artículo: esa repetirá el trabajo.
+        Tarea.objects.using(alias).filter(pk=tarea_.pk).delete()
+
+
+# --- Tipos de tarea ---
+
+@tarea('indexar')
+def indexar(ids):
+    obtener_backend().indexar(Articulo.objects.filter(pk__in=ids))
+
+
+@tarea('relacionados')
+def actualizar_relacionados(ids):
+    # Vector y lista de cada artículo guardado; los borrados ya no están.
+    for articulo in Articulo.objects.filter(pk__in=ids).only('id', 'titulo', 'contenido'):
+        relacionados.actualizar(articulo)
+
+
+@tarea('relacionar')
+def relacionar(ids):
+    # Cambiaron sus categorías: basta rehacer la lista con el vector guardado.
+    for articulo_id in Articulo.objects.filter(pk__in=ids).values_list('pk', flat=True):
+        relacionados.relacionar(articulo_id)
@@ -1,9 +1,42 @@
-from django.test import TestCase, Client 
-from django.urls import reverse
-from .models import Articulo, Categoria
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from importlib import import_module
+from io import StringIO
+from unittest import skipUnless
+from unittest.mock import patch
+from xml.etree import ElementTree
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache as cache_django
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import call_command
+from django.test.utils import CaptureQueriesContext
+from django.http import HttpResponse
+from django.test import TestCase, TransactionTestCase, Client, RequestFactory, override_settings
+from django.urls import resolve, reverse
+from django.utils import timezone
+from . import compresion, relacionados, renderizado, replicas, tareas, visitas
+from .benchmark import medir, sembrar, urlconf_blog
+from .middleware import MiddlewareEstaticos, MiddlewareReplicas
+from .cache import EstadisticasCache, estadisticas, reiniciar_estadisticas
+from .contadores import mes_de, reconciliar
+from .metricas import AgregadorMetricas, leer_volcados, percentil
+from .models import (
+    ArchivoMensual, Articulo, ArticuloRelacionado, Categoria, Tarea, TerminoArticulo, VisitasArticulo,
+)
+from .registro import RegistroCategorias, registro_categorias
+from .slugs import asignar_slug, asignar_slugs
+from .views import VistaListaArticulos
+from .visitas import contador_visitas
 from django.db.utils import IntegrityError 
 from django.shortcuts import get_object_or_404 
-from django.db import models
+from django.db import connection, models, router, transaction
 
 class PruebasModeloArticulo(TestCase):
     """Pruebas para el modelo Articulo."""
@@ -139,13 +172,12 @@ class PruebasVistasBlog(TestCase):
         self.assertContains(respuesta, self.articulo1.titulo)
         self.assertContains(respuesta, self.articulo1.contenido)
 
-        # Verifica que el contenido de los OTROS artículos NO está presente
-        self.assertNotContains(respuesta, self.articulo2.titulo)
-        self.assertNotContains(respuesta, self.articulo2.contenido)
-        self.assertNotContains(respuesta, self.articulo3.titulo)
-        self.assertNotContains(respuesta, self.articulo3.contenido)
-        self.assertNotContains(respuesta, self.articulo4.titulo)
-        self.assertNotContains(respuesta, self.articulo4.contenido)
+        # Verifica que el contenido de los OTROS artículos NO está en el artículo
+        # (sí pueden aparecer después, en la lista de relacionados)
+        articulo = respuesta.content.decode().split('</article>')[0]
+        for otro in (self.articulo2, self.articulo3, self.articulo4):
+            self.assertNotIn(otro.titulo, articulo)
+            self.assertNotIn(otro.contenido, articulo)
     
     def test_vista_lista_articulos_busqueda_sin_termino(self):
         """Verifica que sin término de búsqueda ni filtro de categoría se muestran todos los artículos (los 4)."""
@@ -288,4 +320,1523 @@ class PruebasVistasBlog(TestCase):
         self.assertContains(respuesta, f'No hay artículos en la categoría "{self.categoria_tecnologia.nombre}".') 
         self.assertEqual(len(respuesta.context['articulos']), 0)
         self.assertEqual(respuesta.context['categoria_actual'], self.categoria_tecnologia)
-        self.assertEqual(respuesta.context['query'], 'Inexistente') 
\ No newline at end of file
+        self.assertEqual(respuesta.context['query'], 'Inexistente') 
+
+class PruebasPaginacionCursor(TestCase):
+    """Pruebas para la paginación por cursor de la lista de artículos."""
+
+    def setUp(self):
+        """Crea más artículos de los que caben en una página."""
+        self.url_lista = reverse('blog:lista_articulos')
+        self.por_pagina = VistaListaArticulos.paginate_by
+        self.categoria = Categoria.objects.create(nombre="Python")
+        for i in range(self.por_pagina + 5):
+            articulo = Articulo.objects.create(titulo=f"Artículo número {i}", contenido="Contenido")
+            if i % 2 == 0:
+                articulo.categorias.add(self.categoria)
+
+    def _recorrer(self, parametros):
+        """Sigue los cursores 'siguiente' y devuelve las páginas visitadas."""
+        paginas = []
+        respuesta = self.client.get(self.url_lista, parametros)
+        while True:
+            self.assertEqual(respuesta.status_code, 200)
+            paginas.append(respuesta.context['articulos'])
+            pagina = respuesta.context['page_obj']
+            if not pagina.has_next():
+                return paginas, respuesta
+            respuesta = self.client.get(self.url_lista, {**parametros, 'cursor': pagina.cursor_siguiente})
+
+    def test_primera_pagina_limitada(self):
+        """Verifica que la primera página solo trae paginate_by artículos y ofrece cursor siguiente."""
+        respuesta = self.client.get(self.url_lista)
+        self.assertEqual(len(respuesta.context['articulos']), self.por_pagina)
+        self.assertTrue(respuesta.context['is_paginated'])
+        self.assertFalse(respuesta.context['page_obj'].has_previous())
+        self.assertContains(respuesta, 'cursor=')
+
+    def test_recorrido_completo_sin_repetidos(self):
+        """Verifica que recorrer todas las páginas devuelve cada artículo exactamente una vez y en orden."""
+        paginas, _ = self._recorrer({})
+        ids = [a.id for pagina in paginas for a in pagina]
+        esperados = list(Articulo.objects.order_by('-fecha_creacion', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, esperados)
+
+    def test_cursor_anterior_vuelve_a_la_pagina_previa(self):
+        """Verifica que el cursor 'anterior' de la segunda página devuelve la primera."""
+        primera = self.client.get(self.url_lista)
+        segunda = self.client.get(self.url_lista, {'cursor': primera.context['page_obj'].cursor_siguiente})
+        anterior = self.client.get(self.url_lista, {'cursor': segunda.context['page_obj'].cursor_anterior})
+        self.assertEqual(list(anterior.context['articulos']), list(primera.context['articulos']))
+        self.assertFalse(anterior.context['page_obj'].has_previous())
+
+    def test_cursor_conserva_filtro_categoria(self):
+        """Verifica que la paginación funciona junto con el filtro de categoría."""
+        paginas, _ = self._recorrer({'categoria': self.categoria.slug})
+        ids = [a.id for pagina in paginas for a in pagina]
+        self.assertEqual(len(ids), self.categoria.articulos.count())
+        self.assertEqual(len(set(ids)), len(ids))
+
+    def test_cursor_invalido_devuelve_404(self):
+        """Verifica que un cursor manipulado devuelve 404."""
+        respuesta = self.client.get(self.url_lista, {'cursor': 'no-es-un-cursor'})
+        self.assertEqual(respuesta.status_code, 404)
+
+
+class PruebasBusqueda(TestCase):
+    """Pruebas para el motor de búsqueda de texto completo."""
+
+    def setUp(self):
+        """Crea artículos donde el término aparece en distintos campos."""
+        self.url_lista = reverse('blog:lista_articulos')
+        self.en_contenido = Articulo.objects.create(
+            titulo="Notas de la semana", contenido="Hoy probamos Kubernetes en producción"
+        )
+        self.en_titulo = Articulo.objects.create(
+            titulo="Guía de Kubernetes", contenido="Despliegues con contenedores"
+        )
+
+    def _ids(self, termino):
+        respuesta = self.client.get(self.url_lista, {'q': termino})
+        self.assertEqual(respuesta.status_code, 200)
+        return [a.id for a in respuesta.context['articulos']]
+
+    def test_busca_en_contenido_y_ordena_por_relevancia(self):
+        """Verifica que se busca también en el contenido y que el título pesa más."""
+        self.assertEqual(self._ids('kubernetes'), [self.en_titulo.id, self.en_contenido.id])
+
+    def test_ignora_acentos_y_acepta_prefijos(self):
+        """Verifica que la búsqueda no distingue acentos y admite prefijos."""
+        self.assertEqual(self._ids('produccion'), [self.en_contenido.id])
+        self.assertEqual(self._ids('contened'), [self.en_titulo.id])
+
+    def test_indice_sigue_cambios_de_categorias_y_borrados(self):
+        """Verifica que el índice se actualiza con las señales de categorías y de borrado."""
+        categoria = Categoria.objects.create(nombre="Infraestructura")
+        self.en_contenido.categorias.add(categoria)
+        self.assertEqual(self._ids('infraestructura'), [self.en_contenido.id])
+        categoria.articulos.clear()
+        self.assertEqual(self._ids('infraestructura'), [])
+        self.en_titulo.delete()
+        self.assertEqual(self._ids('kubernetes'), [self.en_contenido.id])
+
+    def test_no_recorta_resultados_y_filtra_en_sql(self):
+        """Verifica que la búsqueda devuelve todas las coincidencias, también con categoría."""
+        categoria = Categoria.objects.create(nombre="Contenedores")
+        Articulo.objects.bulk_create([
+            Articulo(titulo=f"Kubernetes {i}", slug=f"kubernetes-{i}", contenido="Pods") for i in range(600)
+        ])
+        Articulo.categorias.through.objects.bulk_create([
+            Articulo.categorias.through(articulo_id=id_, categoria_id=categoria.pk)
+            for id_ in Articulo.objects.filter(slug__startswith='kubernetes-').values_list('id', flat=True)[:550]
+        ])
+        call_command('reconstruir_indice_busqueda', stdout=StringIO())
+        self.assertEqual(VistaListaArticulos.filtrar('kubernetes', None).count(), 602)
+        self.assertEqual(VistaListaArticulos.filtrar('kubernetes', categoria).count(), 550)
+        self.assertEqual(VistaListaArticulos.filtrar('kubernetes', categoria, relevancia=False).count(), 550)
+
+    def test_comando_reconstruir_indice(self):
+        """Verifica que el comando reconstruye el índice a partir de la tabla de artículos."""
+        Articulo.objects.filter(pk=self.en_titulo.pk).update(titulo="Guía de Docker")
+        self.assertEqual(self._ids('docker'), [])
+        call_command('reconstruir_indice_busqueda', stdout=StringIO())
+        self.assertEqual(self._ids('docker'), [self.en_titulo.id])
+
+
+class PruebasCacheDetalle(TestCase):
+    """Pruebas para la caché de la página de detalle."""
+
+    def setUp(self):
+        """Crea un artículo y parte de contadores en cero y sin visitas pendientes por volcar."""
+        reiniciar_estadisticas()
+        contador_visitas.descartar()
+        self.articulo = Articulo.objects.create(titulo="Artículo en caché", contenido="Versión uno")
+        self.url = self.articulo.get_absolute_url()
+
+    def test_segunda_visita_sale_de_la_cache(self):
+        """Verifica que la segunda visita se sirve desde la caché con solo la consulta de versión."""
+        primera = self.client.get(self.url)
+        self.assertEqual(primera['X-Cache'], 'MISS')
+        with self.assertNumQueries(1):
+            segunda = self.client.get(self.url)
+        self.assertEqual(segunda['X-Cache'], 'HIT')
+        self.assertEqual(segunda.content, primera.content)
+
+    def test_guardar_invalida_la_entrada(self):
+        """Verifica que al guardar el artículo se ve el contenido nuevo."""
+        self.client.get(self.url)
+        self.articulo.contenido = "Versión dos"
+        self.articulo.save()
+        respuesta = self.client.get(self.url)
+        self.assertEqual(respuesta['X-Cache'], 'MISS')
+        self.assertContains(respuesta, "Versión dos")
+
+    def test_cambio_de_slug_y_borrado_invalidan(self):
+        """Verifica que cambiar el slug o borrar el artículo no deja páginas huérfanas en caché."""
+        self.client.get(self.url)
+        self.articulo.slug = "slug-nuevo"
+        self.articulo.save()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        url_nueva = self.articulo.get_absolute_url()
+        self.client.get(url_nueva)
+        self.articulo.delete()
+        self.assertEqual(self.client.get(url_nueva).status_code, 404)
+
+    def test_contadores_de_aciertos(self):
+        """Verifica que se cuentan aciertos y fallos."""
+        self.client.get(self.url)
+        self.client.get(self.url)
+        self.client.get(self.url)
+        datos = estadisticas()['detalle']
+        self.assertEqual((datos['aciertos'], datos['fallos']), (2, 1))
+        salida = StringIO()
+        call_command('estadisticas_cache', stdout=salida)
+        self.assertIn('2 aciertos, 1 fallos', salida.getvalue())
+
+    def test_contadores_compartidos_entre_procesos(self):
+        """Verifica que el comando ve lo contado por otro worker aunque cada uno tenga su propia caché."""
+        otro_worker = EstadisticasCache()
+        otro_worker.contar('detalle', 'aciertos')
+        otro_worker.contar('detalle', 'fallos')
+        with override_settings(BLOG_CACHE_ESTADISTICAS_VOLCAR=3):
+            otro_worker.contar('detalle', 'aciertos')
+        self.assertEqual(otro_worker._pendientes, {})
+        cache_django.clear()
+        salida = StringIO()
+        call_command('estadisticas_cache', stdout=salida)
+        self.assertIn('2 aciertos, 1 fallos', salida.getvalue())
+
+
+class PruebasRespuestaCondicional(TestCase):
+    """Pruebas para ETag, Last-Modified y las respuestas 304."""
+
+    def setUp(self):
+        """Crea dos artículos, uno de ellos en una categoría, sin visitas pendientes por volcar."""
+        contador_visitas.descartar()
+        self.categoria = Categoria.objects.create(nombre="General")
+        self.articulo = Articulo.objects.create(titulo="Artículo condicional", contenido="Texto")
+        self.otro = Articulo.objects.create(titulo="Otro artículo", contenido="Más texto")
+        self.articulo.categorias.add(self.categoria)
+        self.url_lista = reverse('blog:lista_articulos')
+        self.url_detalle = self.articulo.get_absolute_url()
+
+    def test_detalle_devuelve_304_con_etag(self):
+        """Verifica que el detalle responde 304 a If-None-Match con una sola consulta."""
+        respuesta = self.client.get(self.url_detalle)
+        self.assertIn('ETag', respuesta)
+        self.assertIn('Last-Modified', respuesta)
+        with self.assertNumQueries(1):
+            respuesta = self.client.get(self.url_detalle, HTTP_IF_NONE_MATCH=respuesta['ETag'])
+        self.assertEqual(respuesta.status_code, 304)
+        self.assertEqual(respuesta.content, b'')
+
+    def test_detalle_devuelve_304_con_if_modified_since(self):
+        """Verifica que el detalle responde 304 a If-Modified-Since."""
+        respuesta = self.client.get(self.url_detalle)
+        respuesta = self.client.get(self.url_detalle, HTTP_IF_MODIFIED_SINCE=respuesta['Last-Modified'])
+        self.assertEqual(respuesta.status_code, 304)
+
+    def test_lista_304_con_una_consulta_agregada(self):
+        """Verifica que la lista responde 304 sin renderizar y con una sola consulta."""
+        respuesta = self.client.get(self.url_lista, {'categoria': self.categoria.slug})
+        with self.assertNumQueries(1):
+            respuesta = self.client.get(
+                self.url_lista, {'categoria': self.categoria.slug}, HTTP_IF_NONE_MATCH=respuesta['ETag']
+            )
+        self.assertEqual(respuesta.status_code, 304)
+
+    def test_lista_sin_busqueda_no_agrega_articulos(self):
+        """Verifica que sin búsqueda los validadores salen de los contadores y no de blog_articulo."""
+        for parametros in ({}, {'categoria': self.categoria.slug}):
+            etag = self.client.get(self.url_lista, parametros)['ETag']
+            with CaptureQueriesContext(connection) as consultas:
+                respuesta = self.client.get(self.url_lista, parametros, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(respuesta.status_code, 304)
+            self.assertEqual(len(consultas), 1)
+            self.assertNotIn('"blog_articulo"', consultas[0]['sql'])
+        self.articulo.categorias.remove(self.categoria)
+        respuesta = self.client.get(self.url_lista, {'categoria': self.categoria.slug}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+
+    def test_etag_cambia_con_el_contenido_y_los_filtros(self):
+        """Verifica que el ETag cambia al editar, al borrar o al cambiar los parámetros."""
+        etag = self.client.get(self.url_lista)['ETag']
+        self.assertNotEqual(etag, self.client.get(self.url_lista, {'q': 'otro'})['ETag'])
+        self.otro.delete()
+        etag_tras_borrar = self.client.get(self.url_lista)['ETag']
+        self.assertNotEqual(etag, etag_tras_borrar)
+        self.articulo.contenido = "Texto editado"
+        self.articulo.save()
+        respuesta = self.client.get(self.url_lista, HTTP_IF_NONE_MATCH=etag_tras_borrar)
+        self.assertEqual(respuesta.status_code, 200)
+
+
+class PruebasAdminArticulos(TestCase):
+    """Pruebas de rendimiento del listado de artículos en el admin."""
+
+    def setUp(self):
+        """Crea un superusuario con sesión iniciada y algunas categorías."""
+        usuario = User.objects.create_superuser('admin', 'admin@example.com', 'clave-segura')
+        self.client.force_login(usuario)
+        self.url = reverse('admin:blog_articulo_changelist')
+        self.categorias = [Categoria.objects.create(nombre=f"Categoría {i}") for i in range(3)]
+
+    def _crear_articulos(self, cantidad):
+        for i in range(cantidad):
+            articulo = Articulo.objects.create(titulo=f"Admin {Articulo.objects.count()}", contenido="Texto")
+            articulo.categorias.add(*self.categorias[:i % 3 + 1])
+
+    def _consultas_listado(self):
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get(self.url)
+        self.assertEqual(respuesta.status_code, 200)
+        return len(consultas)
+
+    def test_listado_con_numero_constante_de_consultas(self):
+        """Verifica que el listado hace las mismas consultas con 3 o con 30 artículos."""
+        self._crear_articulos(3)
+        pocas = self._consultas_listado()
+        self._crear_articulos(27)
+        self.assertEqual(self._consultas_listado(), pocas)
+
+    def test_listado_muestra_categorias(self):
+        """Verifica que la columna de categorías sigue mostrando los nombres."""
+        self._crear_articulos(3)
+        respuesta = self.client.get(self.url)
+        self.assertContains(respuesta, "Categoría 0, Categoría 1, Categoría 2")
+
+
+class PruebasExtracto(TestCase):
+    """Pruebas para el extracto guardado de los artículos."""
+
+    def test_extracto_se_calcula_al_guardar(self):
+        """Verifica que save() guarda las primeras 25 palabras sin etiquetas HTML."""
+        palabras = [f"palabra{i}" for i in range(40)]
+        articulo = Articulo.objects.create(titulo="Largo", contenido="<p>" + " ".join(palabras) + "</p>")
+        self.assertEqual(articulo.extracto, " ".join(palabras[:25]) + " …")
+        articulo.contenido = "Corto"
+        articulo.save(update_fields=['contenido'])
+        articulo.refresh_from_db()
+        self.assertEqual(articulo.extracto, "Corto")
+
+    def test_lista_no_carga_el_contenido(self):
+        """Verifica que la lista muestra el extracto sin seleccionar la columna contenido."""
+        Articulo.objects.create(titulo="Con extracto", contenido="Primera línea del artículo")
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get(reverse('blog:lista_articulos'))
+        self.assertContains(respuesta, "Primera línea del artículo")
+        for consulta in consultas:
+            self.assertNotIn('"blog_articulo"."contenido"', consulta['sql'])
+
+    def test_comando_rellena_extractos_vacios(self):
+        """Verifica que el comando completa los extractos que faltan."""
+        articulo = Articulo.objects.create(titulo="Sin extracto", contenido="Texto del artículo")
+        Articulo.objects.filter(pk=articulo.pk).update(extracto='')
+        call_command('rellenar_extractos', stdout=StringIO())
+        articulo.refresh_from_db()
+        self.assertEqual(articulo.extracto, "Texto del artículo")
+
+
+class PruebasRegistroCategorias(TestCase):
+    """Pruebas para el registro en memoria de categorías."""
+
+    def setUp(self):
+        """Crea categorías con distinto número de artículos."""
+        self.url_lista = reverse('blog:lista_articulos')
+        self.vacia = Categoria.objects.create(nombre="Vacía")
+        self.llena = Categoria.objects.create(nombre="Llena")
+        for i in range(3):
+            Articulo.objects.create(titulo=f"Artículo lleno {i}", contenido="Texto").categorias.add(self.llena)
+
+    def test_conteos_precalculados(self):
+        """Verifica que el registro trae el número de artículos de cada categoría."""
+        self.assertEqual(registro_categorias.por_slug(self.llena.slug).num_articulos, 3)
+        self.assertEqual(registro_categorias.por_slug(self.vacia.slug).num_articulos, 0)
+        self.assertIsNone(registro_categorias.por_slug('no-existe'))
+
+    def test_lista_no_consulta_categorias_con_registro_cargado(self):
+        """Verifica que con el registro cargado la lista filtrada no une blog_categoria.
+
+        Solo los validadores leen la fila de la categoría, por clave primaria.
+        """
+        registro_categorias.todas()
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get(self.url_lista, {'categoria': self.llena.slug})
+        self.assertEqual(len(respuesta.context['articulos']), 3)
+        for consulta in consultas:
+            self.assertNotIn('JOIN "blog_categoria"', consulta['sql'])
+        self.assertEqual(sum('FROM "blog_categoria"' in consulta['sql'] for consulta in consultas), 1)
+
+    def test_senales_invalidan_el_registro(self):
+        """Verifica que crear, renombrar o cambiar artículos de una categoría se refleja de inmediato."""
+        registro_categorias.todas()
+        nueva = Categoria.objects.create(nombre="Nueva")
+        self.assertIsNotNone(registro_categorias.por_slug(nueva.slug))
+        Articulo.objects.first().categorias.add(nueva)
+        self.assertEqual(registro_categorias.por_slug(nueva.slug).num_articulos, 1)
+        nueva.delete()
+        self.assertIsNone(registro_categorias.por_slug(nueva.slug))
+        respuesta = self.client.get(self.url_lista)
+        self.assertNotIn(nueva.nombre, [c.nombre for c in respuesta.context['categorias']])
+
+
+    def test_version_es_la_huella_de_las_categorias(self):
+        """Verifica que procesos con las mismas categorías dan la misma versión y que recargar la cambia."""
+        version = registro_categorias.version()
+        # Otro worker, con su propia caché locmem: otra marca, mismas categorías.
+        cache_django.clear()
+        otro = RegistroCategorias()
+        self.assertEqual(otro.version(), version)
+        # Un cambio que este proceso no ve por señales llega al recargar tras el TTL.
+        Categoria.objects.filter(pk=self.llena.pk).update(nombre="Renombrada")
+        with override_settings(BLOG_CATEGORIAS_TTL=0):
+            self.assertNotEqual(otro.version(), version)
+
+
+class PruebasInstrumentacion(TestCase):
+    """Pruebas para el middleware de instrumentación."""
+
+    def setUp(self):
+        """Prepara una carpeta temporal para los volcados."""
+        self.directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directorio, ignore_errors=True)
+        Articulo.objects.create(titulo="Artículo medido", contenido="Texto")
+        self.config = {
+            'ACTIVA': True, 'MUESTREO': 1.0, 'MUESTRAS_POR_VISTA': 10,
+            'VOLCAR_CADA': 1, 'DIRECTORIO': self.directorio, 'RETENCION': 3600,
+        }
+
+    def test_desactivado_por_defecto(self):
+        """Verifica que sin activarlo no se añade la cabecera Server-Timing."""
+        respuesta = self.client.get(reverse('blog:lista_articulos'))
+        self.assertNotIn('Server-Timing', respuesta)
+
+    def test_cabecera_y_reporte_por_vista(self):
+        """Verifica la cabecera Server-Timing y que el reporte agrupa por nombre de URL."""
+        with self.settings(BLOG_INSTRUMENTACION=self.config):
+            respuesta = self.client.get(reverse('blog:lista_articulos'))
+            self.assertRegex(respuesta['Server-Timing'], r'db;dur=[\d.]+;desc="\d+ consultas", tpl;dur=[\d.]+, total;dur=')
+            self.client.get(reverse('blog:lista_articulos'))
+            salida = StringIO()
+            call_command('reporte_rendimiento', '--json', stdout=salida)
+        resumen = json.loads(salida.getvalue())
+        self.assertEqual(resumen['blog:lista_articulos']['n'], 2)
+        self.assertGreater(resumen['blog:lista_articulos']['consultas']['p50'], 0)
+        self.assertGreater(resumen['blog:lista_articulos']['plantilla']['p99'], 0)
+
+    def test_vuelca_al_salir_y_descarta_procesos_terminados(self):
+        """Verifica el volcado al salir y que el reporte borra los volcados viejos de procesos muertos."""
+        agregador = AgregadorMetricas(self.directorio, volcar_cada=100)
+        self.addCleanup(agregador.cerrar)
+        agregador.registrar('blog:lista_articulos', dict.fromkeys(('consultas', 'db', 'plantilla', 'total'), 1))
+        agregador.al_salir()
+        propio = os.path.join(self.directorio, f'{os.getpid()}.json')
+        self.assertTrue(os.path.exists(propio))
+
+        # Un worker que ya no existe (ningún pid llega a 999999999) y escribió hace dos horas.
+        muerto = os.path.join(self.directorio, '999999999.json')
+        shutil.copy(propio, muerto)
+        hace_dos_horas = time.time() - 7200
+        for archivo in (propio, muerto):
+            os.utime(archivo, (hace_dos_horas, hace_dos_horas))
+        self.assertEqual(len(leer_volcados(self.directorio)['blog:lista_articulos']), 2)
+        self.assertEqual(len(leer_volcados(self.directorio, retencion=3600)['blog:lista_articulos']), 1)
+        self.assertFalse(os.path.exists(muerto))
+        self.assertTrue(os.path.exists(propio))
+
+    def test_percentiles(self):
+        """Verifica el cálculo de percentiles con interpolación."""
+        valores = list(range(1, 101))
+        self.assertEqual(percentil(valores, 50), 50.5)
+        self.assertAlmostEqual(percentil(valores, 99), 99.01)
+        self.assertEqual(percentil([], 95), 0.0)
+
+
+class PruebasBenchmark(TestCase):
+    """Pruebas de humo para las utilidades de benchmark."""
+
+    def test_sembrar_y_medir(self):
+        """Verifica que se siembran datos buscables y que la medición devuelve percentiles."""
+        sembrar(30, 4, lote=7)
+        self.assertEqual(Articulo.objects.count(), 30)
+        self.assertEqual(Articulo.categorias.through.objects.count(), 90)
+        self.assertEqual(len(registro_categorias.todas()), 4)
+        resultado = medir(self.client, [reverse('blog:lista_articulos'), reverse('blog:lista_articulos') + '?q=django'], 4)
+        self.assertEqual(resultado['estados'], {'200': 4})
+        self.assertLessEqual(resultado['latencia_ms']['p50'], resultado['latencia_ms']['p99'])
+
+
+class PruebasImportarExportar(TestCase):
+    """Pruebas para los comandos de importación y exportación de artículos."""
+
+    def setUp(self):
+        """Crea artículos con categorías y una carpeta temporal para los archivos."""
+        self.directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directorio, ignore_errors=True)
+        self.ciencia = Categoria.objects.create(nombre="Ciencia")
+        self.arte = Categoria.objects.create(nombre="Arte")
+        for i in range(5):
+            articulo = Articulo.objects.create(titulo=f"Exportado {i}", contenido=f"Cuerpo del artículo {i}")
+            articulo.categorias.add(self.ciencia if i % 2 else self.arte)
+
+    def _exportar(self, nombre):
+        ruta = os.path.join(self.directorio, nombre)
+        call_command('exportar_articulos', ruta, '--lote', '2', stderr=StringIO())
+        return ruta
+
+    def _estado(self):
+        return sorted(
+            (a.titulo, a.contenido, a.fecha_creacion, tuple(c.nombre for c in a.categorias.all()))
+            for a in Articulo.objects.prefetch_related('categorias')
+        )
+
+    def test_ida_y_vuelta(self):
+        """Verifica que exportar, borrar e importar deja los mismos artículos, fechas y categorías."""
+        for nombre in ('articulos.ndjson', 'articulos.csv'):
+            with self.subTest(formato=nombre):
+                esperado = self._estado()
+                ruta = self._exportar(nombre)
+                Articulo.objects.all().delete()
+                Categoria.objects.all().delete()
+                call_command('importar_articulos', ruta, '--lote', '2', stdout=StringIO(), stderr=StringIO())
+                self.assertEqual(self._estado(), esperado)
+                self.assertEqual(Articulo.objects.get(titulo="Exportado 3").extracto, "Cuerpo del artículo 3")
+
+    def test_importar_resuelve_slugs_repetidos(self):
+        """Verifica que importar de nuevo los mismos artículos genera slugs con sufijo."""
+        ruta = self._exportar('articulos.ndjson')
+        call_command('importar_articulos', ruta, stdout=StringIO(), stderr=StringIO())
+        slugs = sorted(Articulo.objects.filter(titulo="Exportado 0").values_list('slug', flat=True))
+        self.assertEqual(slugs, ['exportado-0', 'exportado-0-2'])
+        self.assertEqual(Categoria.objects.count(), 2)
+
+    def test_importados_son_buscables(self):
+        """Verifica que los artículos importados quedan en el índice de búsqueda."""
+        ruta = os.path.join(self.directorio, 'nuevo.ndjson')
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            archivo.write(json.dumps({'titulo': 'Astronomía amateur', 'contenido': 'Telescopios', 'categorias': ['Ciencia']}) + '\n')
+        call_command('importar_articulos', ruta, stdout=StringIO(), stderr=StringIO())
+        respuesta = self.client.get(reverse('blog:lista_articulos'), {'q': 'telescopios'})
+        self.assertEqual([a.titulo for a in respuesta.context['articulos']], ['Astronomía amateur'])
+
+
+class PruebasAsignacionSlugs(TestCase):
+    """Pruebas para la reserva de slugs sin colisiones."""
+
+    def test_titulos_repetidos_reciben_sufijo(self):
+        """Verifica que artículos con el mismo título no chocan en el slug."""
+        slugs = [Articulo.objects.create(titulo="Mismo título", contenido="x").slug for _ in range(3)]
+        self.assertEqual(slugs, ['mismo-titulo', 'mismo-titulo-2', 'mismo-titulo-3'])
+
+    def test_una_sola_consulta_de_rango(self):
+        """Verifica que el siguiente sufijo se encuentra con una consulta aunque haya muchos ocupados."""
+        for i in range(2, 12):
+            Articulo.objects.create(titulo="Repetido", contenido="x", slug=f"repetido-{i}")
+        Articulo.objects.create(titulo="Repetido", contenido="x", slug="repetido")
+        Articulo.objects.create(titulo="Repetido con más palabras", contenido="x")
+        with transaction.atomic(), CaptureQueriesContext(connection) as consultas:
+            slug = asignar_slug(Articulo, "Repetido")
+        self.assertEqual(slug, 'repetido-12')
+        selects = [c['sql'] for c in consultas if c['sql'].startswith('SELECT')]
+        self.assertEqual(len(selects), 1)
+
+    def test_modo_por_lotes(self):
+        """Verifica que el modo por lotes reparte sufijos distintos dentro del mismo lote."""
+        Categoria.objects.create(nombre="C")
+        with transaction.atomic():
+            slugs = asignar_slugs(Categoria, ["C++", "C#", "Go", "Go!"])
+        self.assertEqual(slugs, ['c-2', 'c-3', 'go', 'go-2'])
+
+    def test_lote_con_muchas_bases_distintas(self):
+        """Verifica que más de 500 títulos distintos no exceden la profundidad de expresión de SQLite."""
+        Articulo.objects.create(titulo="Título 7", contenido="x")
+        titulos = [f"Título {i}" for i in range(600)]
+        with transaction.atomic(), CaptureQueriesContext(connection) as consultas:
+            slugs = asignar_slugs(Articulo, titulos)
+        self.assertEqual(len(set(slugs)), 600)
+        self.assertEqual(slugs[7], 'titulo-7-2')
+        selects = [c['sql'] for c in consultas if c['sql'].startswith('SELECT')]
+        self.assertEqual(len(selects), 3)
+
+    def test_fuera_de_transaccion_falla(self):
+        """Verifica que reservar fuera de una transacción es un error, porque el bloqueo no duraría."""
+        with self.assertRaises(RuntimeError):
+            with patch.object(connection, 'in_atomic_block', False):
+                asignar_slug(Articulo, "Sin transacción")
+
+    def test_titulo_sin_caracteres_validos(self):
+        """Verifica que un título sin caracteres válidos usa el nombre del modelo como slug."""
+        self.assertEqual(Articulo.objects.create(titulo="¿¡!?", contenido="x").slug, 'articulo')
+
+
+class PruebasSitioEstatico(TestCase):
+    """Pruebas para la generación incremental del sitio estático."""
+
+    def setUp(self):
+        """Crea artículos y categorías y una carpeta temporal de destino."""
+        self.directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directorio, ignore_errors=True)
+        self.python = Categoria.objects.create(nombre="Python")
+        self.otros = Categoria.objects.create(nombre="Otros")
+        self.articulo = Articulo.objects.create(titulo="Estático uno", contenido="Contenido uno")
+        self.articulo.categorias.add(self.python)
+        self.otro = Articulo.objects.create(titulo="Estático dos", contenido="Contenido dos")
+        self.otro.categorias.add(self.otros)
+
+    def _generar(self):
+        salida = StringIO()
+        call_command('generar_sitio', '--directorio', self.directorio, stdout=salida, stderr=StringIO())
+        return int(salida.getvalue().split()[0])
+
+    def _archivo(self, ruta):
+        return os.path.join(self.directorio, ruta)
+
+    def test_genera_todas_las_paginas(self):
+        """Verifica que se escriben la lista, las categorías y los artículos."""
+        self.assertEqual(self._generar(), 5)
+        with open(self._archivo('articulo/estatico-uno/index.html'), encoding='utf-8') as archivo:
+            self.assertIn("Contenido uno", archivo.read())
+        with open(self._archivo('categoria/python/index.html'), encoding='utf-8') as archivo:
+            html = archivo.read()
+        self.assertIn("Estático uno", html)
+        self.assertNotIn("Estático dos", html)
+        self.assertTrue(os.path.exists(self._archivo('index.html')))
+
+    def test_generar_no_cuenta_visitas(self):
+        """Verifica que renderizar las páginas de los artículos no suma visitas."""
+        contador_visitas.descartar()
+        self.addCleanup(contador_visitas.descartar)
+        self._generar()
+        self.assertEqual(contador_visitas.pendientes(), {})
+
+    def test_regenera_solo_lo_que_cambio(self):
+        """Verifica que una segunda pasada sin cambios no renderiza nada y que editar toca solo lo afectado."""
+        self._generar()
+        self.assertEqual(self._generar(), 0)
+        self.articulo.contenido = "Contenido editado"
+        self.articulo.save()
+        # el artículo, el que lo muestra como relacionado, la lista principal y la página de su categoría
+        self.assertIn(self.articulo.pk, [a.pk for a in relacionados.relacionados_de(self.otro.pk)])
+        self.assertEqual(self._generar(), 4)
+
+    def test_paginacion_y_busqueda_van_a_las_vistas_dinamicas(self):
+        """Verifica que la copia estática enlaza la página siguiente y la búsqueda con la vista dinámica."""
+        for i in range(VistaListaArticulos.paginate_by):
+            Articulo.objects.create(titulo=f"Relleno {i}", contenido="x")
+        errores = StringIO()
+        call_command('generar_sitio', '--directorio', self.directorio, stdout=StringIO(), stderr=errores)
+        with open(self._archivo('index.html'), encoding='utf-8') as archivo:
+            html = archivo.read()
+        lista = reverse('blog:lista_articulos')
+        self.assertIn(f'action="{lista}"', html)
+        self.assertIn(f'href="{lista}?cursor=', html)
+        self.assertIn('reinicie los workers', errores.getvalue())
+
+    def test_borrar_articulo_elimina_su_pagina(self):
+        """Verifica que los artículos borrados desaparecen del sitio."""
+        self._generar()
+        self.otro.delete()
+        self._generar()
+        self.assertFalse(os.path.exists(self._archivo('articulo/estatico-dos')))
+
+
+@override_settings(ROOT_URLCONF=urlconf_blog(asincronas=True))
+class PruebasVistasAsincronas(TestCase):
+    """Pruebas para las vistas asíncronas de lista y detalle."""
+
+    def setUp(self):
+        """Crea artículos en dos categorías, más que los de una página."""
+        self.python = Categoria.objects.create(nombre="Python")
+        self.otros = Categoria.objects.create(nombre="Otros")
+        for i in range(14):
+            articulo = Articulo.objects.create(titulo=f"Asíncrono {i}", contenido=f"Texto número {i}")
+            articulo.categorias.add(self.python if i % 2 else self.otros)
+        self.articulo = Articulo.objects.create(titulo="Django asíncrono", contenido="Con uvicorn")
+        self.articulo.categorias.add(self.python)
+        self.url_lista = reverse('blog:lista_articulos')
+        self.url_detalle = self.articulo.get_absolute_url()
+
+    async def test_lista_paginada_con_categorias(self):
+        """Verifica la primera página, el cursor siguiente y los conteos de la barra de categorías."""
+        respuesta = await self.async_client.get(self.url_lista)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertTemplateUsed(respuesta, 'blog/lista_articulos.html')
+        self.assertEqual(len(respuesta.context['articulos']), 12)
+        self.assertEqual(respuesta.context['articulos'][0], self.articulo)
+        self.assertEqual({c.slug: c.num_articulos for c in respuesta.context['categorias']}, {'python': 8, 'otros': 7})
+        cursor = respuesta.context['page_obj'].cursor_siguiente
+        respuesta = await self.async_client.get(self.url_lista, {'cursor': cursor})
+        self.assertEqual(len(respuesta.context['articulos']), 3)
+        self.assertTrue(respuesta.context['page_obj'].has_previous())
+
+    async def test_filtros_y_errores(self):
+        """Verifica la búsqueda, el filtro por categoría y los 404 de categoría o cursor inválidos."""
+        respuesta = await self.async_client.get(self.url_lista, {'q': 'uvicorn'})
+        self.assertEqual(list(respuesta.context['articulos']), [self.articulo])
+        respuesta = await self.async_client.get(self.url_lista, {'categoria': 'otros'})
+        self.assertEqual(len(respuesta.context['articulos']), 7)
+        self.assertEqual(respuesta.context['categoria_actual'], self.otros)
+        respuesta = await self.async_client.get(self.url_lista, {'categoria': 'no-existe'})
+        self.assertEqual(respuesta.status_code, 404)
+        respuesta = await self.async_client.get(self.url_lista, {'cursor': 'basura'})
+        self.assertEqual(respuesta.status_code, 404)
+
+    async def test_detalle_cache_y_304(self):
+        """Verifica que el detalle usa la caché, responde 304 a su ETag y 404 a un slug inexistente."""
+        primera = await self.async_client.get(self.url_detalle)
+        self.assertEqual(primera['X-Cache'], 'MISS')
+        self.assertContains(primera, "Con uvicorn")
+        segunda = await self.async_client.get(self.url_detalle)
+        self.assertEqual(segunda['X-Cache'], 'HIT')
+        self.assertEqual(segunda.content, primera.content)
+        respuesta = await self.async_client.get(self.url_detalle, headers={'if-none-match': primera['ETag']})
+        self.assertEqual(respuesta.status_code, 304)
+        respuesta = await self.async_client.get(reverse('blog:detalle_articulo', kwargs={'slug': 'no-existe'}))
+        self.assertEqual(respuesta.status_code, 404)
+
+    def test_cadena_de_middlewares_asincrona(self):
+        """Verifica que bajo ASGI ningún middleware obliga a adaptar la cadena con un hilo."""
+        instrumentacion = {**settings.BLOG_INSTRUMENTACION, 'ACTIVA': True}
+        with self.settings(DEBUG=True, BLOG_INSTRUMENTACION=instrumentacion, BLOG_REPLICAS=['replica_1']), \
+                self.assertNoLogs('django.request', 'DEBUG'):
+            # Con DEBUG, Django registra cada middleware al que tuvo que adaptar la cadena.
+            ASGIHandler()
+
+    async def test_middlewares_en_la_cadena_asincrona(self):
+        """Verifica la instrumentación, la compresión y los estáticos con las vistas asíncronas."""
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio, ignore_errors=True)
+        instrumentacion = {**settings.BLOG_INSTRUMENTACION, 'ACTIVA': True, 'MUESTREO': 1.0, 'DIRECTORIO': directorio}
+        with self.settings(BLOG_INSTRUMENTACION=instrumentacion):
+            respuesta = await self.async_client.get(self.url_lista, headers={'accept-encoding': 'gzip'})
+        self.assertIn('Server-Timing', respuesta)
+        self.assertEqual(respuesta['Content-Encoding'], 'gzip')
+        self.assertIn(b'Django as', gzip.decompress(respuesta.content))
+
+        with open(os.path.join(directorio, 'estilo.css'), 'w') as archivo:
+            archivo.write('body { color: red; }')
+        async def siguiente(request):
+            return HttpResponse('vista')
+        with self.settings(STATIC_ROOT=directorio):
+            estaticos = MiddlewareEstaticos(siguiente)
+        respuesta = await estaticos(RequestFactory().get('/static/estilo.css'))
+        self.assertTrue(respuesta.is_async)
+        self.assertEqual(b''.join([trozo async for trozo in respuesta.streaming_content]), b'body { color: red; }')
+        respuesta.close()
+        respuesta = await estaticos(RequestFactory().get('/static/otro.css'))
+        self.assertEqual(respuesta.content, b'vista')
+
+    def test_mismo_html_que_la_vista_sincrona(self):
+        """Verifica que ambas variantes renderizan la misma lista."""
+        asincrona = self.client.get(self.url_lista, {'categoria': 'python'})
+        with override_settings(ROOT_URLCONF=urlconf_blog(asincronas=False)):
+            sincrona = self.client.get(self.url_lista, {'categoria': 'python'})
+        self.assertEqual(asincrona.content, sincrona.content)
+
+
+@override_settings(BLOG_REPLICAS=['replica_1'])
+class PruebasReplicas(TestCase):
+    """Pruebas para el reparto de lecturas entre la primaria y las réplicas."""
+
+    def _peticion(self, ruta, cookies=None, escribir=False):
+        """Pasa una petición por MiddlewareReplicas y devuelve la respuesta y la base usada al leer."""
+        def vista(request):
+            middleware.process_view(request, None, (), {})
+            if escribir:
+                Articulo.objects.create(titulo="Escrito en la primaria", contenido="x")
+            return HttpResponse(router.db_for_read(Articulo))
+
+        middleware = MiddlewareReplicas(vista)
+        request = RequestFactory().get(ruta)
+        request.COOKIES.update(cookies or {})
+        request.resolver_match = resolve(ruta)
+        respuesta = middleware(request)
+        return respuesta, respuesta.content.decode()
+
+    def test_vistas_publicas_leen_de_la_replica(self):
+        """Verifica que la lista lee de la réplica y el admin y el código fuera de peticiones, de la primaria."""
+        self.assertEqual(self._peticion(reverse('blog:lista_articulos'))[1], 'replica_1')
+        self.assertEqual(self._peticion(reverse('admin:index'))[1], 'default')
+        self.assertEqual(router.db_for_read(Articulo), 'default')
+        self.assertEqual(router.db_for_write(Articulo), 'default')
+        self.assertEqual(router.db_for_read(User), 'default')
+
+    def test_lee_sus_propias_escrituras(self):
+        """Verifica que tras escribir se lee de la primaria en la misma petición y, con la cookie, en las siguientes."""
+        respuesta, base = self._peticion(reverse('admin:index'), escribir=True)
+        self.assertEqual(base, 'default')
+        self.assertIn(replicas.COOKIE, respuesta.cookies)
+        self.assertEqual(self._peticion(reverse('blog:lista_articulos'), escribir=True)[1], 'default')
+        respuesta, base = self._peticion(reverse('blog:lista_articulos'), cookies={replicas.COOKIE: '1'})
+        self.assertEqual(base, 'default')
+        self.assertNotIn(replicas.COOKIE, respuesta.cookies)
+
+    def test_no_migra_las_replicas(self):
+        """Verifica que las migraciones no se aplican en las réplicas."""
+        self.assertFalse(router.allow_migrate('replica_1', 'blog'))
+        self.assertTrue(router.allow_migrate('default', 'blog'))
+
+
+class PruebasContadores(TestCase):
+    """Pruebas para los contadores por categoría y el archivo mensual."""
+
+    def setUp(self):
+        """Crea dos categorías y tres artículos enlazados de distintas formas."""
+        self.python = Categoria.objects.create(nombre="Python")
+        self.django = Categoria.objects.create(nombre="Django")
+        self.uno = Articulo.objects.create(titulo="Contado uno", contenido="Uno")
+        self.dos = Articulo.objects.create(titulo="Contado dos", contenido="Dos")
+        self.tres = Articulo.objects.create(titulo="Contado tres", contenido="Tres")
+        self.uno.categorias.add(self.python, self.django)
+        self.python.articulos.add(self.dos, self.tres)
+        self.mes = mes_de(self.uno.fecha_creacion)
+
+    def _conteos(self):
+        return dict(Categoria.objects.values_list('slug', 'num_articulos'))
+
+    def test_senales_mantienen_los_contadores(self):
+        """Verifica altas, bajas (incluidas las de enlaces inexistentes), vaciados y borrados en ambos sentidos."""
+        self.assertEqual(self._conteos(), {'python': 3, 'django': 1})
+        self.dos.categorias.remove(self.python, self.django)
+        self.assertEqual(self._conteos(), {'python': 2, 'django': 1})
+        self.uno.categorias.clear()
+        self.assertEqual(self._conteos(), {'python': 1, 'django': 0})
+        self.django.articulos.add(self.dos, self.tres)
+        self.tres.delete()
+        self.assertEqual(self._conteos(), {'python': 0, 'django': 1})
+        self.django.articulos.clear()
+        self.assertEqual(self._conteos(), {'python': 0, 'django': 0})
+        self.assertEqual(ArchivoMensual.objects.get(anio=self.mes[0], mes=self.mes[1]).num_articulos, 2)
+        self.assertEqual(reconciliar(), (0, 0))
+
+    def test_guardar_categoria_no_pisa_los_contadores(self):
+        """Verifica que guardar una copia en memoria atrasada no sobrescribe num_articulos."""
+        atrasada = Categoria.objects.get(pk=self.django.pk)
+        self.dos.categorias.add(self.django)
+        atrasada.nombre = "Django 5"
+        atrasada.save()
+        self.assertEqual(Categoria.objects.get(pk=self.django.pk).num_articulos, 2)
+
+    def test_comando_reconciliar(self):
+        """Verifica que el comando corrige contadores desajustados."""
+        Categoria.objects.update(num_articulos=99)
+        ArchivoMensual.objects.all().delete()
+        salida = StringIO()
+        call_command('reconciliar_contadores', stdout=salida)
+        self.assertIn('2 categorías y 1 meses corregidos', salida.getvalue())
+        self.assertEqual(self._conteos(), {'python': 3, 'django': 1})
+        self.assertEqual(ArchivoMensual.objects.get().num_articulos, 3)
+
+    def test_pagina_de_categoria(self):
+        """Verifica la ruta blog:categoria, su 304 con una sola consulta y el 404."""
+        url = self.python.get_absolute_url()
+        respuesta = self.client.get(url)
+        self.assertEqual(len(respuesta.context['articulos']), 3)
+        self.assertContains(respuesta, 'Artículos en la categoría: "Python"')
+        with self.assertNumQueries(1):
+            respuesta = self.client.get(url, HTTP_IF_NONE_MATCH=respuesta['ETag'])
+        self.assertEqual(respuesta.status_code, 304)
+        self.uno.contenido = "Uno editado"
+        self.uno.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=respuesta['ETag']).status_code, 200)
+        self.assertEqual(self.client.get(reverse('blog:categoria', kwargs={'slug': 'no-existe'})).status_code, 404)
+
+    def test_archivo(self):
+        """Verifica el índice del archivo, la página de un mes y el 404 de un mes sin artículos."""
+        respuesta = self.client.get(reverse('blog:archivo'))
+        self.assertEqual([(m.anio, m.mes, m.num_articulos) for m in respuesta.context['meses']], [(*self.mes, 3)])
+        url = reverse('blog:archivo_mes', kwargs={'anio': self.mes[0], 'mes': self.mes[1]})
+        self.assertContains(respuesta, url)
+        respuesta = self.client.get(url)
+        self.assertEqual(len(respuesta.context['articulos']), 3)
+        with self.assertNumQueries(1):
+            respuesta = self.client.get(url, HTTP_IF_NONE_MATCH=respuesta['ETag'])
+        self.assertEqual(respuesta.status_code, 304)
+        vacio = reverse('blog:archivo_mes', kwargs={'anio': self.mes[0] - 1, 'mes': self.mes[1]})
+        self.assertEqual(self.client.get(vacio).status_code, 404)
+
+
+class PruebasFeeds(TestCase):
+    """Pruebas para los feeds Atom y JSON."""
+
+    def setUp(self):
+        """Crea dos artículos, uno en una categoría."""
+        self.python = Categoria.objects.create(nombre="Python")
+        self.viejo = Articulo.objects.create(titulo="Feed viejo", contenido="Texto <viejo> & más\x0b")
+        self.nuevo = Articulo.objects.create(titulo="Feed nuevo", contenido="Texto nuevo")
+        self.nuevo.categorias.add(self.python)
+
+    def _contenido(self, respuesta):
+        return b''.join(respuesta.streaming_content).decode()
+
+    def test_atom_global_bien_formado(self):
+        """Verifica que el feed Atom se envía por trozos, es XML válido y trae los artículos en orden."""
+        respuesta = self.client.get(reverse('blog:feed_atom'))
+        self.assertTrue(respuesta.streaming)
+        self.assertEqual(respuesta['Content-Type'], 'application/atom+xml; charset=utf-8')
+        raiz = ElementTree.fromstring(self._contenido(respuesta))
+        atom = '{http://www.w3.org/2005/Atom}'
+        titulos = [entrada.find(f'{atom}title').text for entrada in raiz.iter(f'{atom}entry')]
+        self.assertEqual(titulos, ["Feed nuevo", "Feed viejo"])
+        self.assertIn('http://testserver/articulo/feed-viejo', self._contenido(self.client.get(reverse('blog:feed_atom'))))
+
+    def test_json_por_categoria(self):
+        """Verifica que el JSON Feed de una categoría solo trae sus artículos."""
+        respuesta = self.client.get(reverse('blog:feed_json_categoria', kwargs={'slug': 'python'}))
+        datos = json.loads(self._contenido(respuesta))
+        self.assertEqual(datos['version'], 'https://jsonfeed.org/version/1.1')
+        self.assertEqual([item['title'] for item in datos['items']], ["Feed nuevo"])
+        self.assertEqual(datos['title'], 'Mi Rincón: Python')
+        url = reverse('blog:feed_json_categoria', kwargs={'slug': 'no-existe'})
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_contenido_es_el_html_saneado(self):
+        """Verifica que ambos feeds publican el HTML saneado del artículo y no su Markdown."""
+        self.nuevo.contenido = "**negrita** <script>alert(1)</script>"
+        self.nuevo.save()
+        raiz = ElementTree.fromstring(self._contenido(self.client.get(reverse('blog:feed_atom'))))
+        contenido = raiz.find('{http://www.w3.org/2005/Atom}entry/{http://www.w3.org/2005/Atom}content')
+        self.assertEqual(contenido.get('type'), 'html')
+        self.assertEqual(contenido.text, self.nuevo.contenido_html)
+        self.assertIn('<strong>negrita</strong>', contenido.text)
+        self.assertNotIn('<script>', contenido.text)
+        item = json.loads(self._contenido(self.client.get(reverse('blog:feed_json'))))['items'][0]
+        self.assertEqual(item['content_html'], self.nuevo.contenido_html)
+        self.assertNotIn('content_text', item)
+
+    def test_sondeo_sin_cambios_cuesta_una_consulta(self):
+        """Verifica el 304 con una consulta y que editar o borrar un artículo cambia el ETag."""
+        for url in (reverse('blog:feed_atom'), reverse('blog:feed_atom_categoria', kwargs={'slug': 'python'})):
+            etag = self.client.get(url)['ETag']
+            with self.assertNumQueries(1):
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        url = reverse('blog:feed_json')
+        etag = self.client.get(url)['ETag']
+        self.viejo.delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+@override_settings(BLOG_SITEMAP_URLS=2)
+class PruebasSitemap(TestCase):
+    """Pruebas para el sitemap por shards."""
+
+    def setUp(self):
+        """Crea cinco artículos, que con dos URL por shard ocupan tres shards."""
+        self.articulos = [Articulo.objects.create(titulo=f"Mapa {i}", contenido="x") for i in range(5)]
+        self.primer_shard = (self.articulos[0].pk - 1) // 2
+
+    def _locs(self, respuesta):
+        sitemap = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+        return [loc.text for loc in ElementTree.fromstring(respuesta.content).iter(f'{sitemap}loc')]
+
+    def test_indice_y_shards(self):
+        """Verifica que el índice enumera los shards y que entre todos tienen cada artículo una vez."""
+        locs = self._locs(self.client.get(reverse('blog:sitemap')))
+        self.assertEqual(len(locs), 3)
+        urls = []
+        for loc in locs:
+            urls += self._locs(self.client.get(loc.replace('http://testserver', '')))
+        self.assertEqual(urls, ['http://testserver' + a.get_absolute_url() for a in self.articulos])
+        shard_vacio = reverse('blog:sitemap_shard', kwargs={'shard': self.primer_shard + 10})
+        self.assertEqual(self.client.get(shard_vacio).status_code, 404)
+
+    def test_un_solo_shard_sirve_el_urlset(self):
+        """Verifica que con pocos artículos sitemap.xml es directamente el urlset."""
+        with self.settings(BLOG_SITEMAP_URLS=50000):
+            respuesta = self.client.get(reverse('blog:sitemap'))
+        self.assertIn(b'<urlset', respuesta.content)
+        self.assertEqual(len(self._locs(respuesta)), 5)
+
+    def test_solo_se_regenera_el_shard_afectado(self):
+        """Verifica el 304 con una consulta y que editar un artículo invalida solo su shard."""
+        urls = [reverse('blog:sitemap_shard', kwargs={'shard': self.primer_shard + i}) for i in range(3)]
+        etags = [self.client.get(url)['ETag'] for url in urls]
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(urls[0], HTTP_IF_NONE_MATCH=etags[0]).status_code, 304)
+        ultimo = self.articulos[-1]
+        ultimo.slug = "mapa-renombrado"
+        ultimo.save()
+        self.assertEqual(self.client.get(urls[0], HTTP_IF_NONE_MATCH=etags[0]).status_code, 304)
+        with self.assertNumQueries(2):
+            respuesta = self.client.get(urls[2], HTTP_IF_NONE_MATCH=etags[2])
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIn(b'mapa-renombrado', respuesta.content)
+
+    def test_version_no_depende_de_la_cache_del_proceso(self):
+        """Verifica que un cambio hecho por otro proceso (sin señales aquí) regenera el shard."""
+        url = reverse('blog:sitemap_shard', kwargs={'shard': self.primer_shard})
+        etag = self.client.get(url)['ETag']
+        Articulo.objects.filter(pk=self.articulos[0].pk).update(slug="mapa-de-otro-worker", fecha_actualizacion=timezone.now())
+        respuesta = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIn(b'mapa-de-otro-worker', respuesta.content)
+
+
+class PruebasEntrega(TestCase):
+    """Pruebas de la compresión y de las políticas Cache-Control de MiddlewareEntrega."""
+
+    def setUp(self):
+        """Crea un artículo con contenido suficiente para superar el umbral de compresión."""
+        self.articulo = Articulo.objects.create(titulo="Comprimido", contenido="palabra repetida " * 400)
+        self.url = self.articulo.get_absolute_url()
+
+    def test_negociacion(self):
+        """Verifica que se prefiere Brotli, que se respeta q=0 y el comodín."""
+        self.assertEqual(compresion.negociar('gzip, deflate, br', ('br', 'gzip')), 'br')
+        self.assertEqual(compresion.negociar('gzip, br;q=0', ('br', 'gzip')), 'gzip')
+        self.assertEqual(compresion.negociar('*', ('br', 'gzip')), 'br')
+        self.assertIsNone(compresion.negociar('identity', ('br', 'gzip')))
+        self.assertIsNone(compresion.negociar('', ('gzip',)))
+
+    def test_comprime_con_gzip_y_debilita_el_etag(self):
+        """Verifica el cuerpo gzip, Vary, el ETag débil y que el 304 sigue funcionando con Vary."""
+        sin_comprimir = self.client.get(self.url)
+        respuesta = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(respuesta['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', respuesta['Vary'])
+        self.assertEqual(gzip.decompress(respuesta.content), sin_comprimir.content)
+        self.assertEqual(respuesta['ETag'], 'W/' + sin_comprimir['ETag'])
+        condicional = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=respuesta['ETag'])
+        self.assertEqual(condicional.status_code, 304)
+        self.assertIn('Accept-Encoding', condicional['Vary'])
+
+    @skipUnless('br' in compresion.CODIFICACIONES, "El paquete Brotli no está instalado.")
+    def test_comprime_con_brotli_en_streaming(self):
+        """Verifica que el feed, que se envía en streaming, se comprime con Brotli."""
+        import brotli
+        sin_comprimir = b''.join(self.client.get(reverse('blog:feed_atom')).streaming_content)
+        respuesta = self.client.get(reverse('blog:feed_atom'), HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(respuesta['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(b''.join(respuesta.streaming_content)), sin_comprimir)
+
+    def test_no_comprime_cuerpos_pequenos(self):
+        """Verifica que un cuerpo bajo MINIMO_BYTES sale tal cual, pero con Vary."""
+        with self.settings(BLOG_COMPRESION={**settings.BLOG_COMPRESION, 'MINIMO_BYTES': 10 ** 6}):
+            respuesta = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertFalse(respuesta.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', respuesta['Vary'])
+
+    def test_no_comprime_vistas_sin_politica(self):
+        """Verifica que el admin, con su token CSRF, y las vistas sin política salen sin comprimir."""
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'clave-segura'))
+        respuesta = self.client.get(reverse('admin:blog_articulo_add'), HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertContains(respuesta, 'csrfmiddlewaretoken')
+        self.assertGreater(len(respuesta.content), settings.BLOG_COMPRESION['MINIMO_BYTES'])
+        self.assertFalse(respuesta.has_header('Content-Encoding'))
+        with self.settings(BLOG_CACHE_CONTROL={}):
+            respuesta = Client().get(self.url, HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertFalse(respuesta.has_header('Content-Encoding'))
+
+    def test_politica_cache_control_por_vista(self):
+        """Verifica la política de la vista, también en el 304, y que otras vistas no la reciben."""
+        politica = {'public': True, 'max_age': 30, 'stale_while_revalidate': 120}
+        with self.settings(BLOG_CACHE_CONTROL={'blog:detalle_articulo': politica}):
+            respuesta = self.client.get(self.url)
+            condicional = self.client.get(self.url, HTTP_IF_NONE_MATCH=respuesta['ETag'])
+            lista = self.client.get(reverse('blog:lista_articulos'))
+        for r in (respuesta, condicional):
+            self.assertEqual(
+                sorted(r['Cache-Control'].split(', ')),
+                ['max-age=30', 'public', 'stale-while-revalidate=120'],
+            )
+        self.assertEqual(condicional.status_code, 304)
+        self.assertFalse(lista.has_header('Cache-Control'))
+
+
+class PruebasRelacionados(TestCase):
+    """Pruebas del índice de artículos relacionados."""
+
+    def setUp(self):
+        """Crea dos artículos sobre Django, uno sobre cocina y uno sin texto en común con categoría compartida."""
+        self.cocina = Categoria.objects.create(nombre="Cocina")
+        self.django1 = Articulo.objects.create(titulo="Consultas con el ORM de Django", contenido="django orm consultas queryset índices")
+        self.django2 = Articulo.objects.create(titulo="Optimizar el ORM de Django", contenido="django orm queryset select_related índices")
+        self.receta = Articulo.objects.create(titulo="Receta de empanadas", contenido="horno masa pino cebolla")
+        self.pan = Articulo.objects.create(titulo="Pan amasado", contenido="harina levadura manteca")
+        self.receta.categorias.add(self.cocina)
+        self.pan.categorias.add(self.cocina)
+
+    def _relacionados(self, articulo):
+        return [a.pk for a in relacionados.relacionados_de(articulo.pk)]
+
+    def test_calculo_completo(self):
+        """Verifica que el texto y las categorías en común relacionan los artículos."""
+        ArticuloRelacionado.objects.all().delete()
+        call_command('calcular_relacionados', procesos=1, stdout=StringIO())
+        self.assertEqual(self._relacionados(self.django1)[0], self.django2.pk)
+        self.assertEqual(self._relacionados(self.receta), [self.pan.pk])
+        self.assertNotIn(self.receta.pk, self._relacionados(self.django1))
+
+    def test_pool_de_procesos_da_el_mismo_resultado(self):
+        """Verifica que repartir los lotes entre procesos no cambia las listas."""
+        relacionados.calcular(procesos=1, lote=2)
+        esperado = list(ArticuloRelacionado.objects.values_list('articulo_id', 'relacionado_id', 'posicion'))
+        ArticuloRelacionado.objects.all().delete()
+        self.assertEqual(relacionados.calcular(procesos=2, lote=2), (4, 4))
+        self.assertEqual(list(ArticuloRelacionado.objects.values_list('articulo_id', 'relacionado_id', 'posicion')), esperado)
+
+    def test_actualizacion_incremental(self):
+        """Verifica que un artículo nuevo entra en su lista y en la de los parecidos."""
+        relacionados.calcular()
+        nuevo = Articulo.objects.create(titulo="Índices del ORM de Django", contenido="django orm índices queryset")
+        self.assertIn(self.django1.pk, self._relacionados(nuevo))
+        self.assertIn(nuevo.pk, self._relacionados(self.django1))
+
+    def test_editar_o_borrar_un_relacionado_cambia_el_detalle(self):
+        """Verifica que renombrar o borrar un relacionado cambia el ETag y no sirve el HTML guardado."""
+        relacionados.calcular()
+        url = self.receta.get_absolute_url()
+        etag = self.client.get(url)['ETag']
+        self.pan.titulo = "Pan amasado de campo"
+        self.pan.save()
+        respuesta = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta['X-Cache'], 'MISS')
+        self.assertContains(respuesta, "Pan amasado de campo")
+        etag = respuesta['ETag']
+        self.pan.delete()
+        respuesta = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertNotContains(respuesta, "Pan amasado de campo")
+
+    def test_detalle_lee_los_relacionados_en_una_consulta(self):
+        """Verifica que la página de detalle muestra los relacionados con una sola consulta extra."""
+        relacionados.calcular()
+        with self.assertNumQueries(1):
+            lista = list(relacionados.relacionados_de(self.receta.pk))
+        self.assertEqual(lista, [self.pan])
+        respuesta = self.client.get(self.receta.get_absolute_url())
+        self.assertContains(respuesta, "Artículos relacionados")
+        self.assertContains(respuesta, self.pan.get_absolute_url())
+
+
+class PruebasVisitas(TestCase):
+    """Pruebas del contador de visitas por lotes y de la lista de los más leídos."""
+
+    def setUp(self):
+        """Crea tres artículos y parte sin visitas pendientes."""
+        contador_visitas.descartar()
+        self.addCleanup(contador_visitas.descartar)
+        self.articulos = [Articulo.objects.create(titulo=f"Leído {i}", contenido="Texto") for i in range(3)]
+
+    def test_las_visitas_se_acumulan_en_memoria(self):
+        """Verifica que cada GET y cada 304 cuentan sin escribir en la base de datos."""
+        url = self.articulos[0].get_absolute_url()
+        respuesta = self.client.get(url)
+        self.client.get(url)
+        self.client.get(url, HTTP_IF_NONE_MATCH=respuesta['ETag'])
+        self.client.head(url)
+        self.assertEqual(contador_visitas.pendientes(), {self.articulos[0].pk: 3})
+        self.assertFalse(VisitasArticulo.objects.exists())
+
+    def test_volcado_con_un_update_por_lote(self):
+        """Verifica los totales, que basta un UPDATE y que un artículo borrado se ignora."""
+        borrado = Articulo.objects.create(titulo="Borrado", contenido="Texto")
+        for articulo, n in zip([*self.articulos, borrado], (3, 1, 2, 5)):
+            for _ in range(n):
+                contador_visitas.registrar(articulo.pk)
+        borrado.delete()
+        with CaptureQueriesContext(connection) as consultas:
+            self.assertEqual(contador_visitas.volcar(), 11)
+        updates = [c['sql'] for c in consultas if c['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        contador_visitas.registrar(self.articulos[0].pk)
+        contador_visitas.volcar()
+        self.assertEqual(
+            dict(VisitasArticulo.objects.values_list('articulo_id', 'total')),
+            {self.articulos[0].pk: 4, self.articulos[1].pk: 1, self.articulos[2].pk: 2},
+        )
+
+    def test_vuelca_al_llegar_a_pendientes(self):
+        """Verifica que la visita número PENDIENTES dispara el volcado."""
+        url = self.articulos[1].get_absolute_url()
+        with self.settings(BLOG_VISITAS={**settings.BLOG_VISITAS, 'PENDIENTES': 2}):
+            self.client.get(url)
+            self.assertFalse(VisitasArticulo.objects.exists())
+            self.client.get(url)
+        self.assertEqual(VisitasArticulo.objects.get().total, 2)
+        self.assertEqual(contador_visitas.pendientes(), {})
+
+    def test_mas_leidos(self):
+        """Verifica el orden por visitas y que el ETag cambia con cada volcado."""
+        for articulo, n in zip(self.articulos, (1, 3, 2)):
+            for _ in range(n):
+                contador_visitas.registrar(articulo.pk)
+        contador_visitas.volcar()
+        respuesta = self.client.get(reverse('blog:mas_leidos'))
+        self.assertEqual(
+            [fila.articulo for fila in respuesta.context['filas']],
+            [self.articulos[1], self.articulos[2], self.articulos[0]],
+        )
+        url = reverse('blog:mas_leidos')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=respuesta['ETag']).status_code, 304)
+        contador_visitas.registrar(self.articulos[0].pk)
+        contador_visitas.volcar()
+        respuesta = self.client.get(url, HTTP_IF_NONE_MATCH=respuesta['ETag'])
+        self.assertEqual(respuesta.status_code, 200)
+
+    def test_version_de_mas_leidos_compartida(self):
+        """Verifica que el ETag sale de la base de datos: lo ven igual otros workers, sin caché común."""
+        url = reverse('blog:mas_leidos')
+        etag = self.client.get(url)['ETag']
+        cache_django.clear()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # otro worker vuelca sus visitas: aquí no se entera ninguna señal ni caché
+        visitas.escribir({self.articulos[2].pk: 4})
+        respuesta = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.articulos[2].titulo = "Título nuevo"
+        self.articulos[2].save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=respuesta['ETag']).status_code, 200)
+
+
+class PruebasSQLite(TransactionTestCase):
+    """Pruebas de los ajustes de SQLite (blog/sqlite.py), fuera de la transacción de TestCase."""
+
+    def setUp(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('Solo aplica a SQLite.')
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio)
+        self.ruta = os.path.join(directorio, 'escritura.lock')
+
+    def test_pragmas_en_cada_conexion(self):
+        """Verifica que las conexiones nuevas reciben los PRAGMAS configurados."""
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], settings.BLOG_SQLITE['PRAGMAS']['busy_timeout'])
+            cursor.execute('PRAGMA temp_store')
+            self.assertEqual(cursor.fetchone()[0], 2)
+
+    def test_escritura_toma_el_candado_fuera_de_transaccion(self):
+        """Verifica que solo la transacción más externa hace fila en el candado."""
+        from . import sqlite
+        tomados = []
+        original = sqlite._candado
+
+        def candado(ruta):
+            tomados.append(ruta)
+            return original(ruta)
+
+        with patch.object(sqlite, 'ruta_candado', return_value=self.ruta), \
+                patch.object(sqlite, '_candado', candado), \
+                patch.object(connection, 'is_in_memory_db', return_value=False):
+            with sqlite.escritura('default'):
+                Articulo.objects.create(titulo='Uno', contenido='texto')
+                # ya dentro de la transacción: no vuelve a esperar su propio candado
+                with sqlite.escritura('default'):
+                    Articulo.objects.create(titulo='Dos', contenido='texto')
+        self.assertEqual(tomados, [self.ruta])
+        self.assertTrue(os.path.exists(self.ruta))
+        self.assertEqual(Articulo.objects.count(), 2)
+
+    def test_sin_escritor_unico_no_hay_candado(self):
+        """Verifica que ESCRITOR_UNICO=False deja escritura() en un atomic normal."""
+        from . import sqlite
+        ajustes = {**settings.BLOG_SQLITE, 'ESCRITOR_UNICO': False}
+        with self.settings(BLOG_SQLITE=ajustes), \
+                patch.object(sqlite, '_candado') as candado, \
+                patch.object(connection, 'is_in_memory_db', return_value=False):
+            Articulo.objects.create(titulo='Uno', contenido='texto')
+        candado.assert_not_called()
+
+
+class PruebasCalentarCache(TransactionTestCase):
+    """Pruebas del comando calentar_cache (los hilos necesitan datos ya confirmados)."""
+
+    def setUp(self):
+        categoria = Categoria.objects.create(nombre='Python')
+        self.articulos = [
+            Articulo.objects.create(titulo=f'Artículo {i}', contenido='texto de prueba') for i in range(14)
+        ]
+        self.articulos[0].categorias.add(categoria)
+        contador_visitas.descartar()
+
+    def test_inventario(self):
+        """Verifica las páginas de la lista por cursor, las categorías y los artículos más recientes."""
+        from .management.commands.calentar_cache import inventario
+        urls = inventario(paginas=3, articulos=2)
+        lista = reverse('blog:lista_articulos')
+        # 14 artículos caben en dos páginas de 12
+        self.assertEqual(urls[0], lista)
+        self.assertTrue(urls[1].startswith(f'{lista}?cursor='))
+        self.assertEqual(urls[2:], [
+            reverse('blog:categoria', kwargs={'slug': 'python'}),
+            self.articulos[13].get_absolute_url(),
+            self.articulos[12].get_absolute_url(),
+        ])
+        self.assertEqual(self.client.get(urls[1]).status_code, 200)
+
+    def test_llena_la_cache_sin_contar_visitas(self):
+        """Verifica que los detalles quedan en caché y que las peticiones no son visitas."""
+        from .cache import obtener_detalle
+        salida = StringIO()
+        call_command('calentar_cache', hilos=2, stdout=salida, stderr=StringIO())
+        self.assertIn('17 URL calentadas', salida.getvalue())
+        for articulo in self.articulos:
+            self.assertIsNotNone(obtener_detalle(articulo.slug))
+        self.assertEqual(contador_visitas.pendientes(), {})
+
+
+class PruebasRenderizado(TestCase):
+    """Pruebas del HTML del contenido generado al guardar (blog/renderizado.py)."""
+
+    def test_texto_escapa_y_respeta_saltos(self):
+        """Verifica que el renderizador de texto hace lo mismo que linebreaksbr."""
+        html = renderizado.RenderizadorTexto().renderizar('<b>uno</b>\ndos')
+        self.assertEqual(html, '&lt;b&gt;uno&lt;/b&gt;<br>dos')
+
+    @skipUnless(renderizado.markdown and renderizado.nh3, 'Requiere markdown y nh3.')
+    def test_markdown_saneado(self):
+        """Verifica que el Markdown se convierte y que el HTML peligroso se elimina."""
+        html = renderizado.RenderizadorMarkdown().renderizar(
+            '# Título\n\n**negrita** [enlace](javascript:alert(1))\n\n'
+            '<script>alert(1)</script><img src="x.png" onerror="alert(1)">'
+        )
+        self.assertIn('<h1>Título</h1>', html)
+        self.assertIn('<strong>negrita</strong>', html)
+        self.assertNotIn('javascript:', html)
+        self.assertNotIn('<script', html)
+        self.assertNotIn('onerror', html)
+
+    @skipUnless(renderizado.markdown and renderizado.nh3, 'Requiere markdown y nh3.')
+    def test_extracto_sale_del_html(self):
+        """Verifica que el extracto es el texto del HTML, sin el marcado de Markdown."""
+        articulo = Articulo.objects.create(titulo='Uno', contenido='# Título\n\n*uno* dos & **tres**\n\n- cuatro')
+        self.assertEqual(articulo.extracto, 'Título uno dos & tres cuatro')
+
+    def test_texto_plano_sigue_como_texto(self):
+        """Verifica que los artículos en texto plano conservan sus saltos de línea al editarse."""
+        migracion = import_module('blog.migrations.0011_articulo_contenido_html')
+        texto = 'Línea uno\r\nLínea *dos* <b>'
+        self.assertEqual(migracion.renderizar_texto(texto), renderizado.RenderizadorTexto().renderizar(texto))
+        articulo = Articulo.objects.create(titulo='Uno', contenido='x')
+        Articulo.objects.filter(pk=articulo.pk).update(contenido_renderizador=migracion.VERSION_TEXTO)
+        articulo.refresh_from_db()
+        articulo.contenido = 'Línea uno\nLínea # dos'
+        articulo.save()
+        self.assertEqual(articulo.contenido_html, 'Línea uno<br>Línea # dos')
+        self.assertEqual(articulo.extracto, 'Línea uno Línea # dos')
+        call_command('renderizar_contenido', procesos=1, stdout=StringIO())
+        articulo.refresh_from_db()
+        self.assertEqual(articulo.contenido_renderizador, renderizado.RenderizadorTexto.version)
+        call_command('renderizar_contenido', procesos=1, convertir=True, stdout=StringIO())
+        articulo.refresh_from_db()
+        self.assertEqual(articulo.contenido_renderizador, renderizado.obtener_renderizador().version)
+
+    def test_solo_renderiza_si_cambia_el_contenido(self):
+        """Verifica que guardar sin cambiar el contenido no vuelve a renderizar."""
+        articulo = Articulo.objects.create(titulo='Uno', contenido='hola\nmundo')
+        self.assertEqual(articulo.contenido_hash, renderizado.huella('hola\nmundo'))
+        self.assertEqual(articulo.contenido_renderizador, renderizado.obtener_renderizador().version)
+        with patch.object(type(renderizado.obtener_renderizador()), 'renderizar', return_value='<p>x</p>') as renderizar:
+            articulo.titulo = 'Otro título'
+            articulo.save()
+            articulo.save(update_fields=['titulo'])
+            renderizar.assert_not_called()
+            articulo.contenido = 'nuevo'
+            articulo.save(update_fields=['contenido'])
+            renderizar.assert_called_once_with('nuevo')
+        articulo.refresh_from_db()
+        self.assertEqual(articulo.contenido_html, '<p>x</p>')
+        self.assertEqual(articulo.contenido_hash, renderizado.huella('nuevo'))
+
+    def test_detalle_muestra_el_html_guardado(self):
+        """Verifica que el detalle usa contenido_html y no el texto original."""
+        articulo = Articulo.objects.create(titulo='Uno', contenido='texto')
+        Articulo.objects.filter(pk=articulo.pk).update(contenido_html='<p class="marca">guardado</p>')
+        respuesta = self.client.get(articulo.get_absolute_url())
+        self.assertContains(respuesta, '<p class="marca">guardado</p>', html=True)
+
+    def test_comando_regenera_los_desactualizados(self):
+        """Verifica que renderizar_contenido solo toca los artículos de otra versión y no su fecha."""
+        articulos = [Articulo.objects.create(titulo=f'A{i}', contenido=f'texto {i}') for i in range(3)]
+        Articulo.objects.filter(pk=articulos[0].pk).update(
+            contenido_html='', contenido_renderizador='viejo', extracto='viejo',
+        )
+        etag = self.client.get(articulos[0].get_absolute_url())['ETag']
+        etag_lista = self.client.get(reverse('blog:lista_articulos'))['ETag']
+        salida = StringIO()
+        call_command('renderizar_contenido', procesos=1, stdout=salida)
+        self.assertIn('1 artículos renderizados', salida.getvalue())
+        primero = Articulo.objects.get(pk=articulos[0].pk)
+        self.assertIn('texto 0', primero.contenido_html)
+        self.assertEqual(primero.extracto, 'texto 0')
+        self.assertEqual(primero.contenido_renderizador, renderizado.obtener_renderizador().version)
+        self.assertEqual(primero.fecha_actualizacion, articulos[0].fecha_actualizacion)
+        # el HTML y el extracto cambiaron: cambian los validadores, no la fecha de edición
+        respuesta = self.client.get(articulos[0].get_absolute_url(), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertContains(respuesta, 'texto 0')
+        respuesta = self.client.get(reverse('blog:lista_articulos'), HTTP_IF_NONE_MATCH=etag_lista)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertContains(respuesta, 'texto 0')
+
+        salida = StringIO()
+        call_command('renderizar_contenido', procesos=2, lote=1, todos=True, stdout=salida)
+        self.assertIn('3 artículos renderizados', salida.getvalue())
+
+
+class PruebasPlantillas(TestCase):
+    """Pruebas de las rutas memorizadas y de las tarjetas de la lista en caché."""
+
+    def setUp(self):
+        cache_django.clear()
+        self.articulos = [Articulo.objects.create(titulo=f'Artículo {i}', contenido='texto') for i in range(3)]
+
+    def test_ruta_slug_igual_que_reverse(self):
+        """Verifica la ruta memorizada, también con prefijo y con slugs que no son slug."""
+        from django.urls import NoReverseMatch, set_script_prefix
+        from .rutas import ruta_slug
+        self.assertEqual(
+            ruta_slug('blog:detalle_articulo', 'hola-mundo'),
+            reverse('blog:detalle_articulo', kwargs={'slug': 'hola-mundo'}),
+        )
+        self.assertEqual(ruta_slug('blog:categoria', 'python'), '/categoria/python')
+        set_script_prefix('/blog/')
+        try:
+            self.assertEqual(ruta_slug('blog:categoria', 'python'), '/blog/categoria/python')
+        finally:
+            set_script_prefix('/')
+        with self.assertRaises(NoReverseMatch):
+            ruta_slug('blog:categoria', 'no es un slug')
+
+    def test_cargador_de_plantillas_en_cache(self):
+        """Verifica que las plantillas se compilan una sola vez por proceso."""
+        from django.template import engines
+        from django.template.loaders.cached import Loader
+        self.assertIsInstance(engines['django'].engine.template_loaders[0], Loader)
+
+    def test_tarjetas_en_cache(self):
+        """Verifica que la segunda lista no renderiza tarjetas y que guardar invalida la del artículo."""
+        from django.template.loader import get_template
+        from .cache import PLANTILLA_TARJETA, tarjetas
+        primera = tarjetas(self.articulos)
+        self.assertIn(self.articulos[0].get_absolute_url(), primera[0])
+        with patch('blog.cache.get_template') as plantilla:
+            self.assertEqual(tarjetas(self.articulos), primera)
+            plantilla.return_value.render.assert_not_called()
+        self.articulos[1].titulo = 'Título nuevo'
+        self.articulos[1].save()
+        with patch('blog.cache.get_template', wraps=get_template) as plantilla:
+            nuevas = tarjetas(self.articulos)
+        plantilla.assert_called_once_with(PLANTILLA_TARJETA)
+        self.assertIn('Título nuevo', nuevas[1])
+        self.assertEqual([nuevas[0], nuevas[2]], [primera[0], primera[2]])
+
+    def test_lista_muestra_las_tarjetas(self):
+        """Verifica que la lista (síncrona y asíncrona) incluye las tarjetas con sus enlaces."""
+        for asincronas in (False, True):
+            with self.settings(ROOT_URLCONF=urlconf_blog(asincronas)):
+                respuesta = self.client.get(reverse('blog:lista_articulos'))
+                for articulo in self.articulos:
+                    self.assertContains(respuesta, f'href="{articulo.get_absolute_url()}"', count=2)
+
+
+class PruebasTareas(TestCase):
+    """Pruebas de la cola de tareas en la base de datos (blog/tareas.py)."""
+
+    def setUp(self):
+        # Con un solo artículo todos los términos tienen IDF cero y no se guarda ninguno.
+        Articulo.objects.create(titulo='Jardín', contenido='plantas flores riego')
+        self.articulo = Articulo.objects.create(titulo='Python rápido', contenido='perfilar código python')
+
+    def terminos(self):
+        return TerminoArticulo.objects.filter(articulo=self.articulo).exists()
+
+    def test_fuera_del_admin_se_ejecutan_en_el_momento(self):
+        """Verifica que sin diferidas() el trabajo se hace al guardar y no se encola."""
+        self.assertTrue(self.terminos())
+        self.assertFalse(Tarea.objects.exists())
+
+    def test_diferidas_encola_sin_duplicados(self):
+        """Verifica que guardar dos veces deja una sola tarea de cada tipo y que procesar() las hace."""
+        TerminoArticulo.objects.all().delete()
+        categoria = Categoria.objects.create(nombre='Rendimiento')
+        with tareas.diferidas():
+            self.articulo.save()
+            self.articulo.categorias.add(categoria)
+            self.articulo.save()
+        self.assertEqual(
+            sorted(Tarea.objects.values_list('tipo', 'objeto_id')),
+            [('indexar', self.articulo.pk), ('relacionados', self.articulo.pk), ('relacionar', self.articulo.pk)],
+        )
+        self.assertFalse(self.terminos())
+        self.assertEqual(tareas.procesar(), (3, 0))
+        self.assertTrue(self.terminos())
+        self.assertFalse(Tarea.objects.exists())
+
+    def test_reintentos_con_espera(self):
+        """Verifica la espera exponencial entre intentos y el estado fallida al agotarlos."""
+        def fallar(ids):
+            raise RuntimeError('sin índice')
+
+        with tareas.diferidas():
+            tareas.encolar('indexar', [self.articulo.pk])
+        config = {**settings.BLOG_TAREAS, 'REINTENTOS': 3, 'ESPERA_BASE': 10}
+        with self.settings(BLOG_TAREAS=config), patch.dict(tareas._manejadores, {'indexar': fallar}), \
+                self.assertLogs('blog.tareas', 'ERROR'):
+            self.assertEqual(tareas.procesar(), (0, 1))
+            tarea = Tarea.objects.get()
+            self.assertEqual((tarea.estado, tarea.intentos), (Tarea.PENDIENTE, 1))
+            self.assertIn('sin índice', tarea.error)
+            espera = tarea.disponible_desde - timezone.now()
+            self.assertTrue(timedelta(seconds=8) < espera <= timedelta(seconds=10))
+            # todavía no está disponible
+            self.assertEqual(tareas.procesar(), (0, 0))
+
+            Tarea.objects.update(disponible_desde=timezone.now())
+            tareas.procesar()
+            tarea = Tarea.objects.get()
+            self.assertEqual(tarea.intentos, 2)
+            self.assertTrue(timedelta(seconds=18) < tarea.disponible_desde - timezone.now() <= timedelta(seconds=20))
+
+            Tarea.objects.update(disponible_desde=timezone.now())
+            tareas.procesar()
+            self.assertEqual(Tarea.objects.get().estado, Tarea.FALLIDA)
+            self.assertEqual(tareas.procesar(), (0, 0))
+
+    def test_una_tarea_rota_no_arrastra_al_lote(self):
+        """Verifica que si falla el lote se repite tarea a tarea y solo reintenta la rota."""
+        otros = [Articulo.objects.create(titulo=f'Otro {i}', contenido='texto') for i in range(2)]
+        hechos = []
+
+        def indexar(ids):
+            if self.articulo.pk in ids:
+                raise RuntimeError('rota')
+            hechos.extend(ids)
+
+        with tareas.diferidas():
+            tareas.encolar('indexar', [self.articulo.pk, *[a.pk for a in otros]])
+        with patch.dict(tareas._manejadores, {'indexar': indexar}), self.assertLogs('blog.tareas', 'ERROR'):
+            self.assertEqual(tareas.procesar(), (2, 1))
+        self.assertEqual(sorted(hechos), sorted(a.pk for a in otros))
+        self.assertEqual(list(Tarea.objects.values_list('objeto_id', flat=True)), [self.articulo.pk])
+
+    def test_admin_sin_worker_no_encola(self):
+        """Verifica que, con DIFERIR_ADMIN apagado, el admin hace el trabajo en el momento."""
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'clave-segura'))
+        with self.settings(BLOG_TAREAS={**settings.BLOG_TAREAS, 'DIFERIR_ADMIN': False}):
+            self.client.post(reverse('admin:blog_articulo_add'), {
+                'titulo': 'Desde el admin', 'contenido': 'contenido con python', 'slug': '',
+            })
+        nuevo = Articulo.objects.get(titulo='Desde el admin')
+        self.assertTrue(TerminoArticulo.objects.filter(articulo=nuevo).exists())
+        self.assertFalse(Tarea.objects.exists())
+
+    def test_admin_solo_encola_y_el_comando_procesa(self):
+        """Verifica que, por defecto, un guardado desde el admin encola y que procesar_tareas lo completa."""
+        self.assertTrue(settings.BLOG_TAREAS['DIFERIR_ADMIN'])
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'clave-segura'))
+        respuesta = self.client.post(reverse('admin:blog_articulo_add'), {
+            'titulo': 'Desde el admin', 'contenido': 'contenido con python', 'slug': '',
+        })
+        self.assertEqual(respuesta.status_code, 302)
+        nuevo = Articulo.objects.get(titulo='Desde el admin')
+        self.assertFalse(TerminoArticulo.objects.filter(articulo=nuevo).exists())
+        self.assertTrue(Tarea.objects.filter(objeto_id=nuevo.pk, tipo='relacionados').exists())
+
+        salida = StringIO()
+        call_command('procesar_tareas', una_vez=True, stdout=salida)
+        self.assertIn('2 tareas hechas', salida.getvalue())
+        self.assertTrue(TerminoArticulo.objects.filter(articulo=nuevo).exists())
@@ -0,0 +1,20 @@
+import re
+from html import unescape
+
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+# Palabras del extracto que se muestra en las tarjetas de la lista.
+PALABRAS_EXTRACTO = 25
+
+# Saltos de línea y etiquetas de bloque: separan palabras aunque no haya espacio entre ellas.
+_BLOQUES = re.compile(r'<(?:br|/?(?:p|h[1-6]|li|dt|dd|tr|td|th|pre|blockquote|div|hr))\b', re.IGNORECASE)
+
+
+def generar_extracto(html):
+    '''
+    Devuelve las primeras PALABRAS_EXTRACTO palabras del texto de un HTML: el contenido
+    ya renderizado, para que del Markdown no queden * ni #.
+    '''
+    texto = unescape(strip_tags(_BLOQUES.sub(r' \g<0>', html or '')))
+    return Truncator(texto).words(PALABRAS_EXTRACTO, truncate=' …')
@@ -1,9 +1,35 @@
+from django.conf import settings
 from django.urls import path
-from .views import VistaDetalleArticulo, VistaListaArticulos
+from .views import (
+    VistaArchivo, VistaArchivoMes, VistaCategoria, VistaDetalleArticulo, VistaDetalleArticuloAsincrona,
+    VistaFeed, VistaListaArticulos, VistaListaArticulosAsincrona, VistaMasLeidos, VistaSitemap, VistaSitemapShard,
+)
 
 app_name = 'blog'
 
-urlpatterns = [
-    path('', VistaListaArticulos.as_view(), name= 'lista_articulos'),
-    path('articulo/<slug:slug>', VistaDetalleArticulo.as_view(), name= 'detalle_articulo')
-]
\ No newline at end of file
+
+def patrones(asincronas=False):
+    '''
+    Rutas del blog con las vistas síncronas (WSGI) o con las asíncronas (ASGI).
+    '''
+    if asincronas:
+        lista, detalle = VistaListaArticulosAsincrona, VistaDetalleArticuloAsincrona
+    else:
+        lista, detalle = VistaListaArticulos, VistaDetalleArticulo
+    return [
+        path('', lista.as_view(), name= 'lista_articulos'),
+        path('articulo/<slug:slug>', detalle.as_view(), name= 'detalle_articulo'),
+        path('categoria/<slug:slug>', VistaCategoria.as_view(), name='categoria'),
+        path('archivo', VistaArchivo.as_view(), name='archivo'),
+        path('archivo/<int:anio>/<int:mes>', VistaArchivoMes.as_view(), name='archivo_mes'),
+        path('mas-leidos', VistaMasLeidos.as_view(), name='mas_leidos'),
+        path('feed.atom', VistaFeed.as_view(formato='atom'), name='feed_atom'),
+        path('feed.json', VistaFeed.as_view(formato='json'), name='feed_json'),
+        path('categoria/<slug:slug>/feed.atom', VistaFeed.as_view(formato='atom'), name='feed_atom_categoria'),
+        path('categoria/<slug:slug>/feed.json', VistaFeed.as_view(formato='json'), name='feed_json_categoria'),
+        path('sitemap.xml', VistaSitemap.as_view(), name='sitemap'),
+        path('sitemap-<int:shard>.xml', VistaSitemapShard.as_view(), name='sitemap_shard'),
+    ]
+
+
+urlpatterns = patrones(settings.BLOG_VISTAS_ASINCRONAS)
@@ -1,8 +1,118 @@
-from django.shortcuts import render, get_object_or_404
-from django.views.generic import ListView, DetailView
-from .models import Articulo, Categoria
+import hashlib
+from datetime import datetime
 
-class VistaListaArticulos(ListView):
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Count, Max, Sum
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.shortcuts import render
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.generic import ListView, DetailView, View
+from . import cache, feeds, relacionados, sitemaps
+from .busqueda import obtener_backend
+from .models import ArchivoMensual, Articulo, Categoria, VisitasArticulo
+from .paginacion import CursorInvalido, PaginadorCursor
+from .registro import registro_categorias
+from .visitas import contador_visitas
+
+
+def validadores_http(partes, ultima_modificacion):
+    '''
+    Convierte las partes que identifican una versión de la página en un ETag fuerte
+    y la fecha de última modificación en una marca de tiempo para Last-Modified.
+    '''
+    partes = [settings.BLOG_ETAG_VERSION, *partes]
+    etag = quote_etag(hashlib.sha1('|'.join(map(str, partes)).encode()).hexdigest())
+    marca = int(ultima_modificacion.timestamp()) if ultima_modificacion else None
+    return etag, marca
+
+
+def contadores(categoria=None):
+    '''
+    (total, última modificación) de todos los artículos o de una categoría, leídos de
+    los contadores que ajustan las señales (ArchivoMensual o la fila de la categoría):
+    su costo no crece con el número de artículos.
+    '''
+    if categoria is None:
+        datos = ArchivoMensual.objects.aggregate(total=Sum('num_articulos'), ultima=Max('ultima_modificacion'))
+        return datos['total'] or 0, datos['ultima']
+    fila = Categoria.objects.filter(pk=categoria.pk).values_list('num_articulos', 'ultima_modificacion').first()
+    if fila is None:
+        raise Http404('No existe una categoría con ese slug.')
+    return fila
+
+
+async def acontadores(categoria=None):
+    if categoria is None:
+        datos = await ArchivoMensual.objects.aaggregate(total=Sum('num_articulos'), ultima=Max('ultima_modificacion'))
+        return datos['total'] or 0, datos['ultima']
+    fila = await Categoria.objects.filter(pk=categoria.pk).values_list('num_articulos', 'ultima_modificacion').afirst()
+    if fila is None:
+        raise Http404('No existe una categoría con ese slug.')
+    return fila
+
+
+def consulta_detalle(slug):
+    '''
+    La fila del artículo unida a su lista de relacionados, en orden: una sola consulta
+    para los validadores del detalle, que muestra el título y el extracto de cada
+    relacionado. El renderizador entra porque renderizar_contenido cambia el HTML (y el
+    extracto) sin tocar fecha_actualizacion.
+    '''
+    return Articulo.objects.filter(slug=slug).order_by('relaciones__posicion').values_list(
+        'pk', 'fecha_actualizacion', 'contenido_renderizador', 'relaciones__relacionado_id',
+        'relaciones__relacionado__fecha_actualizacion', 'relaciones__relacionado__contenido_renderizador',
+    )
+
+
+def validadores_detalle(slug, filas):
+    '''
+    Devuelve (articulo_id, partes_del_etag, ultima_modificacion) a partir de las filas
+    de consulta_detalle(). Las partes son también la versión de la entrada en caché.
+    '''
+    if not filas:
+        raise Http404('No existe un artículo con ese slug.')
+    articulo_id, actualizacion, renderizador = filas[0][:3]
+    lista = [fila[3:] for fila in filas if fila[3] is not None]
+    ultima = max([actualizacion, *(fecha for _, fecha, _ in lista)])
+    return articulo_id, (slug, actualizacion, renderizador, relacionados.huella(lista)), ultima
+
+
+def aplicar_validadores(respuesta, etag, marca):
+    if respuesta.status_code in (200, 304):
+        respuesta.headers.setdefault('ETag', etag)
+        if marca is not None:
+            respuesta.headers.setdefault('Last-Modified', http_date(marca))
+    return respuesta
+
+
+class RespuestaCondicionalMixin:
+    '''
+    Responde 304 Not Modified sin renderizar cuando el cliente ya tiene la versión actual.
+
+    Las vistas implementan get_validadores() y devuelven (partes_del_etag, ultima_modificacion),
+    que deben salir de una consulta barata y no de evaluar el queryset completo.
+    '''
+
+    def get_validadores(self):
+        raise NotImplementedError
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+
+        partes, self.ultima_modificacion = self.get_validadores()
+        etag, marca = validadores_http(partes, self.ultima_modificacion)
+        respuesta = get_conditional_response(request, etag=etag, last_modified=marca)
+        if respuesta is None:
+            respuesta = super().dispatch(request, *args, **kwargs)
+        return aplicar_validadores(respuesta, etag, marca)
+
+
+class VistaListaArticulos(RespuestaCondicionalMixin, ListView):
     '''
     Vista para listar los articulos publicados.
     '''
@@ -10,31 +120,285 @@ class VistaListaArticulos(ListView):
     model = Articulo
     template_name = 'blog/lista_articulos.html'
     context_object_name = 'articulos'
-    ordering = ['-fecha_creacion']
+    ordering = ['-fecha_creacion', '-id']
+    paginate_by = 12
+    page_kwarg = 'cursor'
+    campos_tarjeta = ('titulo', 'slug', 'extracto', 'fecha_creacion', 'fecha_actualizacion', 'contenido_renderizador')
 
-    def get_queryset(self):
-        queryset = super().get_queryset()
-        query = self.request.GET.get('q')
-        categoria_slug = self.request.GET.get('categoria')
+    @classmethod
+    def orden(cls, query):
+        '''
+        Con búsqueda, los resultados se ordenan primero por relevancia.
+        '''
+        if query:
+            return ['-relevancia', *cls.ordering]
+        return cls.ordering
 
+    @classmethod
+    def filtrar(cls, query, categoria, relevancia=True):
+        '''
+        Queryset de la lista para un texto de búsqueda y una categoría (o None).
+        Lo comparten esta vista y su versión asíncrona. Con relevancia=False solo
+        filtra, sin ordenar ni calcular la relevancia: es lo que agregan los validadores.
+        '''
+        # Las tarjetas usan el extracto guardado: ni el contenido ni su HTML hacen falta.
+        queryset = cls.model._default_manager.only(*cls.campos_tarjeta)
         if query:
-            queryset = queryset.filter(titulo__icontains=query)
-        if categoria_slug:
-            queryset = queryset.filter(categorias__slug=categoria_slug)
+            backend = obtener_backend()
+            queryset = backend.buscar(queryset, query) if relevancia else backend.filtrar(queryset, query)
+        if categoria:
+            # El id sale del registro: basta la tabla intermedia, sin unir blog_categoria.
+            queryset = queryset.filter(categorias=categoria.pk)
+        return queryset.order_by(*cls.orden(query)) if relevancia else queryset
+
+    def get_ordering(self):
+        return self.orden(self.request.GET.get('q'))
 
+    def get_validadores(self):
+        '''
+        Sin búsqueda bastan los contadores de la lista o de la categoría. Con búsqueda
+        no hay contadores: una consulta agregada con la fecha de actualización más
+        reciente y el total de coincidencias (el total cambia si se borra alguna).
+        '''
+        query = self.request.GET.get('q')
+        if query:
+            queryset = self.acotar(self.filtrar(query, self.get_categoria_actual(), relevancia=False))
+            datos = queryset.aggregate(ultima=Max('fecha_actualizacion'), total=Count('id'))
+            total, ultima = datos['total'], datos['ultima']
+        else:
+            total, ultima = contadores(self.get_categoria_actual())
+        return [ultima, total, registro_categorias.version(), self.request.GET.urlencode()], ultima
+
+    def acotar(self, queryset):
+        '''
+        Restricción propia de la página (el mes del archivo); la lista no tiene ninguna.
+        '''
         return queryset
 
+    def get_queryset(self):
+        if getattr(self, '_queryset', None) is None:
+            self._queryset = self.acotar(self.filtrar(self.request.GET.get('q'), self.get_categoria_actual()))
+        return self._queryset
+
+    def paginate_queryset(self, queryset, page_size):
+        '''
+        Pagina por cursor sobre (fecha_creacion, id) en lugar de usar OFFSET.
+        '''
+        paginador = PaginadorCursor(queryset, self.get_ordering(), page_size)
+        try:
+            pagina = paginador.pagina(self.request.GET.get(self.page_kwarg))
+        except CursorInvalido:
+            raise Http404('Cursor de paginación inválido.')
+        return paginador, pagina, pagina.object_list, pagina.has_other_pages()
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        parametros = self.request.GET.copy()
+        parametros.pop(self.page_kwarg, None)
+        context['parametros'] = parametros.urlencode()
         context['query'] = self.request.GET.get('q', '')
-        context['categorias'] = Categoria.objects.all()
+        context['tarjetas'] = cache.tarjetas(context['articulos'])
+        context['categorias'] = registro_categorias.todas()
+        context['categoria_actual'] = self.get_categoria_actual()
+        return context
+
+    def get_categoria_actual(self):
+        '''
+        Categoría del filtro ?categoria=, resuelta desde el registro en memoria.
+        '''
         categoria_slug = self.request.GET.get('categoria')
-        context['categoria_actual'] = None
-        if categoria_slug:
-            context['categoria_actual'] = get_object_or_404(Categoria, slug=categoria_slug)
+        if not categoria_slug:
+            return None
+        categoria = registro_categorias.por_slug(categoria_slug)
+        if categoria is None:
+            raise Http404('No existe una categoría con ese slug.')
+        return categoria
+
+class VistaCategoria(VistaListaArticulos):
+    '''
+    Artículos de una categoría en /categoria/<slug>; la misma lista que ?categoria=.
+    '''
+
+    def get_categoria_actual(self):
+        categoria = registro_categorias.por_slug(self.kwargs['slug'])
+        if categoria is None:
+            raise Http404('No existe una categoría con ese slug.')
+        return categoria
+
+
+class VistaArchivo(RespuestaCondicionalMixin, ListView):
+    '''
+    Índice del archivo: los meses con artículos y cuántos tiene cada uno.
+    '''
+
+    model = ArchivoMensual
+    template_name = 'blog/archivo.html'
+    context_object_name = 'meses'
+
+    def get_queryset(self):
+        return ArchivoMensual.objects.filter(num_articulos__gt=0)
+
+    def get_validadores(self):
+        datos = ArchivoMensual.objects.aggregate(ultima=Max('ultima_modificacion'), total=Count('id'))
+        return [datos['ultima'], datos['total']], datos['ultima']
+
+
+class VistaArchivoMes(VistaListaArticulos):
+    '''
+    Artículos creados en un mes, en /archivo/<anio>/<mes>. La fila de ArchivoMensual
+    da los validadores y decide el 404 sin contar artículos.
+    '''
+
+    def get_mes_actual(self):
+        if getattr(self, '_mes', None) is None:
+            self._mes = ArchivoMensual.objects.filter(
+                anio=self.kwargs['anio'], mes=self.kwargs['mes'], num_articulos__gt=0,
+            ).first()
+            if self._mes is None:
+                raise Http404('No hay artículos en ese mes.')
+        return self._mes
+
+    def acotar(self, queryset):
+        mes = self.get_mes_actual()
+        inicio = timezone.make_aware(datetime(mes.anio, mes.mes, 1))
+        fin = timezone.make_aware(datetime(mes.anio + mes.mes // 12, mes.mes % 12 + 1, 1))
+        return queryset.filter(fecha_creacion__gte=inicio, fecha_creacion__lt=fin)
+
+    def get_validadores(self):
+        if self.request.GET.get('q'):
+            return super().get_validadores()
+        mes = self.get_mes_actual()
+        partes = [
+            mes.num_articulos, mes.ultima_modificacion, registro_categorias.version(), self.request.GET.urlencode(),
+        ]
+        ultima = mes.ultima_modificacion
+        categoria = self.get_categoria_actual()
+        if categoria:
+            # Mes y categoría: cualquier cambio en uno de los dos contadores cambia el ETag.
+            total, ultima_categoria = contadores(categoria)
+            partes += [total, ultima_categoria]
+            ultima = max(filter(None, [ultima, ultima_categoria]), default=None)
+        return partes, ultima
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['mes_actual'] = self.get_mes_actual()
         return context
 
-class VistaDetalleArticulo(DetailView):
+
+class VistaFeed(RespuestaCondicionalMixin, View):
+    '''
+    Feed Atom o JSON de los últimos artículos, global o de una categoría.
+
+    Los validadores salen de los contadores (ArchivoMensual para el global, la fila de
+    la categoría para los demás), que cambian con cada alta, edición o baja: un lector
+    que no encuentra nada nuevo cuesta una consulta y un 304.
+    '''
+
+    formato = 'atom'
+
+    def get_categoria(self):
+        slug = self.kwargs.get('slug')
+        if slug is None:
+            return None
+        categoria = registro_categorias.por_slug(slug)
+        if categoria is None:
+            raise Http404('No existe una categoría con ese slug.')
+        return categoria
+
+    def get_validadores(self):
+        categoria = self.get_categoria()
+        total, ultima = contadores(categoria)
+        if categoria is None:
+            return [self.formato, total, ultima], ultima
+        # La versión del registro cambia si se renombra la categoría (el título del feed).
+        return [self.formato, categoria.slug, total, ultima, registro_categorias.version()], ultima
+
+    def get(self, request, *args, **kwargs):
+        categoria = self.get_categoria()
+        queryset = Articulo.objects.only(*feeds.CAMPOS).order_by('-fecha_creacion', '-id')
+        if categoria is None:
+            titulo, url_html = feeds.TITULO, reverse('blog:lista_articulos')
+        else:
+            queryset = queryset.filter(categorias=categoria.pk)
+            titulo, url_html = f'{feeds.TITULO}: {categoria.nombre}', categoria.get_absolute_url()
+        # Se leen aquí, dentro de la petición; solo la serialización se hace por trozos.
+        articulos = list(queryset[:settings.BLOG_FEED_ARTICULOS])
+        entradas = [(request.build_absolute_uri(articulo.get_absolute_url()), articulo) for articulo in articulos]
+
+        generar, content_type = feeds.FORMATOS[self.formato]
+        return StreamingHttpResponse(
+            generar(
+                titulo, request.build_absolute_uri(url_html), request.build_absolute_uri(),
+                self.ultima_modificacion or timezone.now(), entradas,
+            ),
+            content_type=content_type,
+        )
+
+
+class VistaSitemap(RespuestaCondicionalMixin, View):
+    '''
+    /sitemap.xml: el urlset de los artículos mientras quepan en un shard y, después,
+    el índice de shards. Sale de la caché; el ETag es la versión del índice, así que
+    un 304 cuesta una consulta a los contadores.
+    '''
+
+    content_type = 'application/xml; charset=utf-8'
+
+    def get_validadores(self):
+        self.version = sitemaps.version('indice')
+        return [self.version, self._base()], None
+
+    def _base(self):
+        return f'{self.request.scheme}://{self.request.get_host()}'
+
+    def get(self, request, *args, **kwargs):
+        indice = sitemaps.obtener_indice(self._base(), self.version)
+        if len(indice['shards']) > 1:
+            xml = indice['xml']
+        elif indice['shards']:
+            xml = sitemaps.obtener_shard(indice['shards'][0][0], self._base())['xml']
+        else:
+            xml = (sitemaps.CABECERA_URLSET + '</urlset>\n').encode()
+        return HttpResponse(xml, content_type=self.content_type)
+
+
+class VistaSitemapShard(VistaSitemap):
+    '''
+    Un shard del sitemap; se regenera solo cuando cambia un artículo de su rango de ids.
+    '''
+
+    def get_validadores(self):
+        self.version = sitemaps.version(self.kwargs['shard'])
+        return [self.version, self._base()], None
+
+    def get(self, request, *args, **kwargs):
+        entrada = sitemaps.obtener_shard(self.kwargs['shard'], self._base(), self.version)
+        if entrada['xml'] is None:
+            raise Http404('Shard de sitemap vacío.')
+        return HttpResponse(entrada['xml'], content_type=self.content_type)
+
+
+class VistaMasLeidos(RespuestaCondicionalMixin, ListView):
+    '''
+    Los artículos más leídos según las visitas ya volcadas (ver blog/visitas.py).
+    '''
+    template_name = 'blog/mas_leidos.html'
+    context_object_name = 'filas'
+
+    def get_queryset(self):
+        return (
+            VisitasArticulo.objects.select_related('articulo')
+            .only('total', 'articulo__titulo', 'articulo__slug', 'articulo__extracto')
+            .order_by('-total')[:settings.BLOG_VISITAS['MAS_LEIDOS']]
+        )
+
+    def get_validadores(self):
+        # Cambia en cada volcado de visitas y al crear, editar o borrar un artículo.
+        return [contador_visitas.version()], None
+
+
+class VistaDetalleArticulo(RespuestaCondicionalMixin, DetailView):
     '''
     Vista para mostras detalles de articulos especificos
     '''
@@ -44,4 +408,179 @@ class VistaDetalleArticulo(DetailView):
 
     #estos parametros de dicen a django que no busque por id sino por slug
     slug_field = 'slug'
-    slug_url_kwarg = 'slug'
\ No newline at end of file
+    slug_url_kwarg = 'slug'
+
+    def get_validadores(self):
+        slug = self.kwargs[self.slug_url_kwarg]
+        self.articulo_id, self.version, ultima = validadores_detalle(slug, list(consulta_detalle(slug)))
+        return self.version, ultima
+
+    def get_queryset(self):
+        # La plantilla usa el HTML ya renderizado: el texto original no hace falta.
+        return super().get_queryset().defer('contenido')
+
+    def dispatch(self, request, *args, **kwargs):
+        respuesta = super().dispatch(request, *args, **kwargs)
+        # Un 304 también es una lectura: el navegador vuelve a mostrar el artículo.
+        if request.method == 'GET' and respuesta.status_code in (200, 304):
+            contador_visitas.registrar(self.articulo_id)
+        return respuesta
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['relacionados'] = list(relacionados.relacionados_de(self.object.pk))
+        return context
+
+    def get(self, request, *args, **kwargs):
+        '''
+        Sirve el HTML desde la caché si está; si no, renderiza y lo guarda.
+        Las señales de Articulo borran la entrada cuando el artículo cambia, y la
+        versión guardada (la del ETag, que incluye la lista de relacionados) se
+        compara con la actual por si la cambió otro proceso.
+        '''
+        slug = kwargs[self.slug_url_kwarg]
+        entrada = cache.obtener_detalle(slug)
+        if entrada is not None and entrada['version'] == self.version:
+            respuesta = HttpResponse(entrada['html'])
+            respuesta['X-Cache'] = 'HIT'
+            return respuesta
+
+        respuesta = super().get(request, *args, **kwargs)
+        respuesta.add_post_render_callback(
+            lambda r: cache.guardar_detalle(slug, self.version, r.content)
+        )
+        respuesta['X-Cache'] = 'MISS'
+        return respuesta
+
+
+# --- Vistas asíncronas (ASGI) ---
+# Mismas páginas que las vistas de arriba, pero con el ORM asíncrono: bajo uvicorn o
+# daphne no ocupan un hilo por petición. Se montan con BLOG_VISTAS_ASINCRONAS.
+
+class RespuestaCondicionalAsincronaMixin:
+    '''
+    Versión asíncrona de RespuestaCondicionalMixin: las vistas implementan
+    aget_validadores() y el 304 se decide antes de llegar a get().
+    '''
+
+    async def aget_validadores(self):
+        raise NotImplementedError
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return await super().dispatch(request, *args, **kwargs)
+
+        partes, self.ultima_modificacion = await self.aget_validadores()
+        etag, marca = validadores_http(partes, self.ultima_modificacion)
+        respuesta = get_conditional_response(request, etag=etag, last_modified=marca)
+        if respuesta is None:
+            respuesta = await super().dispatch(request, *args, **kwargs)
+        return aplicar_validadores(respuesta, etag, marca)
+
+
+class VistaListaArticulosAsincrona(RespuestaCondicionalAsincronaMixin, View):
+    '''
+    Lista de artículos con búsqueda, filtro por categoría y paginación por cursor.
+    El HTML es el mismo que el de VistaListaArticulos.
+    '''
+
+    template_name = VistaListaArticulos.template_name
+    paginate_by = VistaListaArticulos.paginate_by
+    page_kwarg = VistaListaArticulos.page_kwarg
+
+    async def aget_categoria_actual(self):
+        categoria_slug = self.request.GET.get('categoria')
+        if not categoria_slug:
+            return None
+        categoria = await registro_categorias.apor_slug(categoria_slug)
+        if categoria is None:
+            raise Http404('No existe una categoría con ese slug.')
+        return categoria
+
+    async def aget_queryset(self):
+        if getattr(self, '_queryset', None) is None:
+            query = self.request.GET.get('q')
+            categoria = await self.aget_categoria_actual()
+            if query:
+                # El motor de búsqueda puede consultar su índice al construir el filtro.
+                self._queryset = await sync_to_async(VistaListaArticulos.filtrar)(query, categoria)
+            else:
+                self._queryset = VistaListaArticulos.filtrar(query, categoria)
+        return self._queryset
+
+    async def aget_validadores(self):
+        query = self.request.GET.get('q')
+        categoria = await self.aget_categoria_actual()
+        if query:
+            queryset = await sync_to_async(VistaListaArticulos.filtrar)(query, categoria, relevancia=False)
+            datos = await queryset.aaggregate(ultima=Max('fecha_actualizacion'), total=Count('id'))
+            total, ultima = datos['total'], datos['ultima']
+        else:
+            total, ultima = await acontadores(categoria)
+        return [ultima, total, await registro_categorias.aversion(), self.request.GET.urlencode()], ultima
+
+    async def get(self, request, *args, **kwargs):
+        query = request.GET.get('q', '')
+        paginador = PaginadorCursor(await self.aget_queryset(), VistaListaArticulos.orden(query), self.paginate_by)
+        try:
+            pagina = await paginador.apagina(request.GET.get(self.page_kwarg))
+        except CursorInvalido:
+            raise Http404('Cursor de paginación inválido.')
+
+        parametros = request.GET.copy()
+        parametros.pop(self.page_kwarg, None)
+        # Todo el contexto ya está evaluado: la plantilla no vuelve a tocar la base de datos.
+        return render(request, self.template_name, {
+            'view': self,
+            'paginator': paginador,
+            'page_obj': pagina,
+            'is_paginated': pagina.has_other_pages(),
+            'object_list': pagina.object_list,
+            'articulos': pagina.object_list,
+            'tarjetas': await cache.atarjetas(pagina.object_list),
+            'parametros': parametros.urlencode(),
+            'query': query,
+            'categorias': await registro_categorias.atodas(),
+            'categoria_actual': await self.aget_categoria_actual(),
+        })
+
+
+class VistaDetalleArticuloAsincrona(RespuestaCondicionalAsincronaMixin, View):
+    '''
+    Detalle de un artículo, servido desde la misma caché que VistaDetalleArticulo.
+    '''
+
+    template_name = VistaDetalleArticulo.template_name
+
+    async def aget_validadores(self):
+        slug = self.kwargs['slug']
+        filas = [fila async for fila in consulta_detalle(slug)]
+        self.articulo_id, self.version, ultima = validadores_detalle(slug, filas)
+        return self.version, ultima
+
+    async def dispatch(self, request, *args, **kwargs):
+        respuesta = await super().dispatch(request, *args, **kwargs)
+        if request.method == 'GET' and respuesta.status_code in (200, 304):
+            await contador_visitas.aregistrar(self.articulo_id)
+        return respuesta
+
+    async def get(self, request, slug):
+        entrada = await cache.aobtener_detalle(slug)
+        if entrada is not None and entrada['version'] == self.version:
+            respuesta = HttpResponse(entrada['html'])
+            respuesta['X-Cache'] = 'HIT'
+            return respuesta
+
+        try:
+            articulo = await Articulo.objects.defer('contenido').aget(slug=slug)
+        except Articulo.DoesNotExist:
+            raise Http404('No existe un artículo con ese slug.')
+        respuesta = render(request, self.template_name, {
+            'view': self,
+            'object': articulo,
+            'articulo': articulo,
+            'relacionados': [relacionado async for relacionado in relacionados.relacionados_de(articulo.pk)],
+        })
+        await cache.aguardar_detalle(slug, self.version, respuesta.content)
+        respuesta['X-Cache'] = 'MISS'
+        return respuesta
@@ -43,7 +43,10 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'blog.middleware.MiddlewareEstaticos',
+    'blog.middleware.MiddlewareInstrumentacion',
+    'blog.middleware.MiddlewareEntrega',
+    'blog.middleware.MiddlewareReplicas',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -54,17 +57,27 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'config.urls'
 
+# Las plantillas se compilan una vez por proceso con el cargador en caché, también con
+# DEBUG (el autorecargador de runserver vacía esa caché cuando cambia una plantilla).
+# BLOG_PLANTILLAS_CACHEADAS=0 vuelve a leerlas y compilarlas en cada render.
+CARGADORES_PLANTILLAS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+if os.environ.get('BLOG_PLANTILLAS_CACHEADAS', '1') != '0':
+    CARGADORES_PLANTILLAS = [('django.template.loaders.cached.Loader', CARGADORES_PLANTILLAS)]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            'loaders': CARGADORES_PLANTILLAS,
         },
     },
 ]
@@ -82,6 +95,223 @@ DATABASES = {
     }
 }
 
+# Con POSTGRES_DB definido se usa un PostgreSQL local (psycopg2 ya está en requirements.txt).
+if os.environ.get('POSTGRES_DB'):
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ['POSTGRES_DB'],
+        'USER': os.environ.get('POSTGRES_USER', 'postgres'),
+        'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+        'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+        'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+    }
+
+# Ajustes de SQLite para varios workers (blog/sqlite.py). Los PRAGMAS se aplican a cada
+# conexión nueva: WAL deja leer mientras alguien escribe, synchronous=NORMAL es seguro
+# con WAL, mmap_size y cache_size (KiB si es negativo) ahorran lecturas de disco y
+# busy_timeout (ms) es cuánto espera un escritor a otro antes de "database is locked".
+# Con ESCRITOR_UNICO las escrituras de Articulo/Categoria y los POST del admin hacen
+# fila en un candado de archivo; BEGIN IMMEDIATE evita que una transacción que empezó
+# leyendo falle al pasar a escribir. BLOG_SQLITE_AJUSTES=0 vuelve a lo de Django.
+BLOG_SQLITE = {
+    'PRAGMAS': {
+        'journal_mode': 'wal',
+        'synchronous': 'normal',
+        'mmap_size': int(os.environ.get('BLOG_SQLITE_MMAP', 256 * 1024 * 1024)),
+        'cache_size': int(os.environ.get('BLOG_SQLITE_CACHE_KIB', 64 * 1024)) * -1,
+        'busy_timeout': int(os.environ.get('BLOG_SQLITE_BUSY_MS', 5000)),
+        'temp_store': 'memory',
+    },
+    'ESCRITOR_UNICO': True,
+}
+if os.environ.get('BLOG_SQLITE_AJUSTES', '1') == '0':
+    BLOG_SQLITE = {'PRAGMAS': {}, 'ESCRITOR_UNICO': False}
+elif DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    DATABASES['default']['OPTIONS'] = {'transaction_mode': 'IMMEDIATE'}
+
+# Conexiones persistentes: se reutilizan entre peticiones durante CONN_MAX_AGE segundos
+# y se comprueban antes de usarlas, en vez de abrir una conexión por petición.
+DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get('BLOG_CONN_MAX_AGE', '60'))
+DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+
+# Réplicas de solo lectura para las vistas públicas del blog (ver blog/replicas.py).
+# BLOG_REPLICAS_SQLITE lista archivos SQLite copiados de la primaria y, con PostgreSQL,
+# POSTGRES_REPLICA_HOSTS lista hosts con la misma base y usuario. Ambas separadas por comas.
+BLOG_REPLICAS = []
+if os.environ.get('POSTGRES_DB'):
+    _replicas = [{'HOST': host} for host in os.environ.get('POSTGRES_REPLICA_HOSTS', '').split(',') if host]
+else:
+    _replicas = [{'NAME': ruta} for ruta in os.environ.get('BLOG_REPLICAS_SQLITE', '').split(',') if ruta]
+for _i, _replica in enumerate(_replicas, start=1):
+    _alias = f'replica_{_i}'
+    # En las pruebas la réplica apunta a la base de prueba de la primaria.
+    DATABASES[_alias] = {**DATABASES['default'], **_replica, 'TEST': {'MIRROR': 'default'}}
+    BLOG_REPLICAS.append(_alias)
+
+DATABASE_ROUTERS = ['blog.replicas.RouterReplicas']
+
+# Segundos que un navegador lee de la primaria después de escribir (cookie blog_primaria).
+BLOG_REPLICAS_PEGADO_SEGUNDOS = 10
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# BLOG_CACHE elige el backend: 'locmem' (por proceso), 'archivo' (compartido entre
+# workers en el mismo disco) o 'redis' (servidor local en REDIS_URL).
+
+BLOG_CACHE = os.environ.get('BLOG_CACHE', 'locmem')
+
+CACHES_DISPONIBLES = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'blog',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    'archivo': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('BLOG_CACHE_DIR', BASE_DIR / 'cache'),
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/1'),
+    },
+}
+
+CACHES = {
+    'default': CACHES_DISPONIBLES[BLOG_CACHE],
+}
+
+# Aciertos y fallos de las cachés que cada worker suma en memoria antes de escribirlos
+# en la base de datos, donde los lee el comando estadisticas_cache.
+BLOG_CACHE_ESTADISTICAS_VOLCAR = 100
+
+# Segundos que vive en caché el HTML de la página de detalle de un artículo.
+BLOG_CACHE_DETALLE_SEGUNDOS = 60 * 60
+
+# Segundos que vive en caché cada tarjeta ya renderizada de la lista. La clave lleva
+# fecha_actualizacion y BLOG_ETAG_VERSION, así que no hace falta invalidarlas.
+BLOG_CACHE_TARJETA_SEGUNDOS = 24 * 60 * 60
+
+# Segundos máximos que un proceso usa su copia del registro de categorías sin
+# recargarla. Con una caché compartida (archivo/redis) las señales la invalidan antes.
+BLOG_CATEGORIAS_TTL = 60
+
+# Forma parte de todos los ETag: súbelo al desplegar cambios en las plantillas
+# para que navegadores y CDN no sigan recibiendo 304 con el HTML anterior.
+BLOG_ETAG_VERSION = os.environ.get('BLOG_ETAG_VERSION', '1')
+
+# Ruta de la clase que convierte el contenido en HTML al guardar (blog/renderizado.py).
+# Con None se usa Markdown si están instalados markdown y nh3, y texto plano si no.
+# Tras cambiarla, `python manage.py renderizar_contenido` regenera los artículos.
+BLOG_RENDERIZADOR = os.environ.get('BLOG_RENDERIZADOR') or None
+
+# Artículos más recientes que incluye cada feed Atom/JSON.
+BLOG_FEED_ARTICULOS = 20
+
+# URL por shard del sitemap (el protocolo admite hasta 50.000) y segundos que vive
+# cada shard en la caché; se regenera antes si cambia un artículo de su rango de ids.
+BLOG_SITEMAP_URLS = 50000
+BLOG_SITEMAP_SEGUNDOS = 60 * 60 * 24
+
+# Artículos relacionados (blog/relacionados.py): K por artículo, términos que se guardan
+# de cada vector TF-IDF y peso del solapamiento de categorías frente al del texto. Los
+# CANDIDATOS acotan cuántos artículos aporta cada término y cada categoría; LOTE es el
+# tamaño de los lotes que el comando calcular_relacionados reparte entre procesos.
+BLOG_RELACIONADOS = {
+    'K': 5,
+    'TERMINOS': 30,
+    'PESO_CATEGORIAS': 0.3,
+    'CANDIDATOS_TERMINO': 100,
+    'CANDIDATOS_CATEGORIA': 100,
+    'LOTE': 500,
+}
+
+# Visitas del detalle (blog/visitas.py): cada proceso las acumula en memoria y las vuelca
+# en lote cuando la más antigua lleva INTERVALO segundos o hay PENDIENTES, y al salir;
+# un worker que muere de golpe pierde a lo sumo eso. MAS_LEIDOS es el largo de la lista.
+BLOG_VISITAS = {
+    'INTERVALO': 30,
+    'PENDIENTES': 1000,
+    'MAS_LEIDOS': 10,
+}
+
+# Cola de tareas en la base de datos (blog/tareas.py). Con DIFERIR_ADMIN los POST del
+# admin solo encolan el trabajo caro de las señales (índice de búsqueda, relacionados)
+# y lo hace `python manage.py procesar_tareas`, LOTE tareas por vuelta, consultando la
+# cola cada INTERVALO segundos. Una tarea tomada vuelve a estar libre tras PLAZO
+# segundos si su proceso murió; si falla, se reintenta tras ESPERA_BASE * 2^n segundos
+# (máximo ESPERA_MAXIMA) y queda como fallida al llegar a REINTENTOS intentos.
+# DIFERIR_ADMIN viene encendido y docker-compose.yml levanta el servicio `tareas` con
+# procesar_tareas; si despliega sin ese worker, apáguelo (BLOG_TAREAS_DIFERIR_ADMIN=0) o
+# lo que se edite en el admin no se indexará nunca.
+BLOG_TAREAS = {
+    'DIFERIR_ADMIN': os.environ.get('BLOG_TAREAS_DIFERIR_ADMIN', '1') != '0',
+    'LOTE': 50,
+    'INTERVALO': 2,
+    'PLAZO': 300,
+    'REINTENTOS': 5,
+    'ESPERA_BASE': 10,
+    'ESPERA_MAXIMA': 15 * 60,
+}
+
+# Monta en blog/urls.py las vistas asíncronas de lista y detalle. Solo conviene bajo
+# un servidor ASGI (uvicorn/daphne con config.asgi); con gunicorn y config.wsgi cada
+# petición tendría que levantar un bucle de eventos. Los middlewares del blog (incluido
+# MiddlewareEstaticos en lugar del de WhiteNoise, que solo es síncrono) aceptan la cadena
+# asíncrona; los de Django siguen pasando process_request/process_response por un hilo,
+# así que bajo ASGI los estáticos conviene servirlos desde el proxy o una CDN.
+BLOG_VISTAS_ASINCRONAS = os.environ.get('BLOG_VISTAS_ASINCRONAS', '0') == '1'
+
+
+# Compresión de respuestas (blog.middleware.MiddlewareEntrega): Brotli si el cliente
+# lo acepta y el paquete Brotli está instalado, si no gzip. Los cuerpos de menos de
+# MINIMO_BYTES se envían sin comprimir: caben en un paquete y solo costarían CPU.
+# Solo se comprimen las vistas de BLOG_CACHE_CONTROL, que no llevan secretos (BREACH).
+BLOG_COMPRESION = {
+    'MINIMO_BYTES': 1024,
+    'NIVEL_BROTLI': 5,
+    'NIVEL_GZIP': 6,
+    'TIPOS': (
+        'text/html', 'application/atom+xml', 'application/feed+json',
+        'application/xml', 'application/json',
+    ),
+}
+
+# Cache-Control por nombre de URL (argumentos de django.utils.cache.patch_cache_control).
+# max_age es lo que navegadores y CDN reutilizan la página sin preguntar, y
+# stale_while_revalidate lo que pueden seguir sirviéndola mientras la revalidan con
+# ETag en segundo plano. Las vistas que no aparecen aquí no reciben la cabecera.
+BLOG_CACHE_CONTROL = {
+    'blog:lista_articulos': {'public': True, 'max_age': 60, 'stale_while_revalidate': 300},
+    'blog:categoria': {'public': True, 'max_age': 60, 'stale_while_revalidate': 300},
+    'blog:detalle_articulo': {'public': True, 'max_age': 300, 'stale_while_revalidate': 86400},
+    'blog:archivo': {'public': True, 'max_age': 300, 'stale_while_revalidate': 3600},
+    'blog:archivo_mes': {'public': True, 'max_age': 300, 'stale_while_revalidate': 3600},
+    'blog:mas_leidos': {'public': True, 'max_age': 60, 'stale_while_revalidate': 300},
+    'blog:feed_atom': {'public': True, 'max_age': 900, 'stale_while_revalidate': 3600},
+    'blog:feed_json': {'public': True, 'max_age': 900, 'stale_while_revalidate': 3600},
+    'blog:feed_atom_categoria': {'public': True, 'max_age': 900, 'stale_while_revalidate': 3600},
+    'blog:feed_json_categoria': {'public': True, 'max_age': 900, 'stale_while_revalidate': 3600},
+    'blog:sitemap': {'public': True, 'max_age': 3600, 'stale_while_revalidate': 86400},
+    'blog:sitemap_shard': {'public': True, 'max_age': 3600, 'stale_while_revalidate': 86400},
+}
+
+
+# Instrumentación de rendimiento (blog.middleware.MiddlewareInstrumentacion)
+# MUESTREO es la fracción de peticiones medidas; las muestras se vuelcan por proceso
+# en DIRECTORIO cada VOLCAR_CADA muestras y se leen con el comando reporte_rendimiento.
+
+BLOG_INSTRUMENTACION = {
+    'ACTIVA': os.environ.get('BLOG_INSTRUMENTACION', '0') == '1',
+    'MUESTREO': float(os.environ.get('BLOG_INSTRUMENTACION_MUESTREO', '0.1')),
+    'MUESTRAS_POR_VISTA': 1000,
+    'VOLCAR_CADA': 100,
+    'DIRECTORIO': BASE_DIR / 'instrumentacion',
+    # segundos que se conservan los volcados de procesos que ya terminaron
+    'RETENCION': 24 * 60 * 60,
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -126,4 +356,13 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 STATIC_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
-STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles_build')
\ No newline at end of file
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles_build')
+
+# Sitio pre-renderizado por el comando generar_sitio. Al estar dentro de STATIC_ROOT,
+# WhiteNoise lo sirve en STATIC_URL + 'sitio/'; INDEX_FILE hace que .../articulo/<slug>/
+# responda con su index.html. Sin WHITENOISE_AUTOREFRESH (producción) WhiteNoise lee la
+# lista de archivos al arrancar: tras generar_sitio hay que reiniciar los workers
+# (kill -HUP al master de gunicorn) para que sirvan las páginas nuevas o modificadas.
+BLOG_SITIO_DIR = os.path.join(STATIC_ROOT, 'sitio')
+
+WHITENOISE_INDEX_FILE = True